@@ -5,7 +5,6 @@ import pygame
 import time
 from geometry_msgs.msg import Point
 from coffee_expressions_msgs.msg import AffectiveState
-import json
 import os
 import sys
 
@@ -146,18 +145,15 @@ class PlaipinExpressiveEyes(Node):
     
     # SEE `face_data_callback` in `coffee_eyes.py` for details
     def handle_faces(self, msg):
-        """Process incoming face detection data"""
+        """Process incoming face detection data (coffee_vision_msgs/FaceArray)"""
         try:
-            # Parse the JSON data
-            data = json.loads(msg)
-            
             # Update frame dimensions if provided
-            if 'frame_width' in data and 'frame_height' in data:
-                self.frame_width = data['frame_width']
-                self.frame_height = data['frame_height']
+            if msg.frame_width > 0 and msg.frame_height > 0:
+                self.frame_width = msg.frame_width
+                self.frame_height = msg.frame_height
             
             # Update face positions
-            self.face_positions = data.get('faces', [])
+            self.face_positions = msg.faces
             self.last_face_update = time.time()
             
             # If no faces detected, just return
@@ -172,8 +168,8 @@ class PlaipinExpressiveEyes(Node):
             largest_face = None
             
             for face in self.face_positions:
-                width = face['x2'] - face['x1']
-                height = face['y2'] - face['y1']
+                width = face.x2 - face.x1
+                height = face.y2 - face.y1
                 area = width * height
                 
                 if area > largest_area:
@@ -182,8 +178,8 @@ class PlaipinExpressiveEyes(Node):
             
             if largest_face:
                 self.target_face_position = (
-                    largest_face['center_x'], 
-                    largest_face['center_y']
+                    largest_face.center_x,
+                    largest_face.center_y
                 )
                 
                 # Log face position before transformation
@@ -197,8 +193,8 @@ class PlaipinExpressiveEyes(Node):
                 self.get_logger().debug(f"Face detected at ({face_x:.1f}, {face_y:.1f}), offset from center: ({dx:.1f}, {dy:.1f})")
                 
                 # Get face dimensions for workspace scaling
-                face_width = largest_face['x2'] - largest_face['x1']
-                face_height = largest_face['y2'] - largest_face['y1']
+                face_width = largest_face.x2 - largest_face.x1
+                face_height = largest_face.y2 - largest_face.y1
                 
                 # Transform camera coordinates to eye controller coordinates
                 eye_position = self.transform_camera_to_eye_coords(
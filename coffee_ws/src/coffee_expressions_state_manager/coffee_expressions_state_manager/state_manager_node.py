@@ -5,6 +5,7 @@ from rclpy.node import Node
 from std_msgs.msg import String
 from geometry_msgs.msg import Point
 from coffee_expressions_msgs.msg import AffectiveState
+from coffee_vision_msgs.msg import FaceArray
 from rclpy.qos import QoSProfile, ReliabilityPolicy
 import time
 from typing import Dict, Optional, Set
@@ -47,7 +48,7 @@ class StateManagerNode(Node):
         self._base_expression = self.get_parameter('default_expression').value
         self._last_voice_intent = "None"
         self._last_face_position = Point(x=0.0, y=0.0, z=1.0)
-        self._last_face_position_v2 = String()
+        self._last_face_position_v2 = FaceArray()
         self._override_expression: Optional[str] = None
         self._override_reason: Optional[str] = None
         self._override_expire_time: Optional[float] = None
@@ -65,7 +66,7 @@ class StateManagerNode(Node):
         # self.create_subscription(
         #     Point, '/vision/face_position', self.face_position_callback, qos)
         self.create_subscription(
-            String, '/vision/face_position_v2', self.face_position_callback_v2, qos)
+            FaceArray, '/vision/face_position_v2', self.face_position_callback_v2, qos)
 
         self.create_subscription(
             String, '/system/event', self.event_callback, qos)
@@ -120,9 +121,9 @@ class StateManagerNode(Node):
         self._last_face_position = msg
         self._last_active_time = time.time()
     
-    def face_position_callback_v2(self, msg: String):
+    def face_position_callback_v2(self, msg: FaceArray):
         """Handle incoming face position updates."""
-        self._last_face_position_v2.data = msg.data
+        self._last_face_position_v2 = msg
         self._last_active_time = time.time()
 
     def event_callback(self, msg: String):
@@ -168,7 +169,7 @@ class StateManagerNode(Node):
         msg.expression = expression
         msg.trigger_source = trigger_source
         msg.gaze_target = self._last_face_position
-        msg.gaze_target_v2 = self._last_face_position_v2.data
+        msg.gaze_target_v2 = self._last_face_position_v2
         msg.is_idle = is_idle
 
         self.state_pub.publish(msg)
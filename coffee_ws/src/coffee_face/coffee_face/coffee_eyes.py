@@ -4,11 +4,10 @@ import rclpy
 from rclpy.node import Node
 import pygame
 import time
-import json
 from .bezier.bezier_viz import AnimatedEyes, EyeConfig
 from .controllers.eye_controller import EyeController
-from std_msgs.msg import String
 from geometry_msgs.msg import Vector3
+from coffee_vision_msgs.msg import FaceArray
 
 
 class CoffeeEyesNode(Node):
@@ -75,7 +74,7 @@ class CoffeeEyesNode(Node):
         # Subscribe to face detection data
         if self.face_tracking_enabled:
             self.face_subscription = self.create_subscription(
-                String,
+                FaceArray,
                 'face_detection_data',
                 self.face_data_callback,
                 10
@@ -97,16 +96,13 @@ class CoffeeEyesNode(Node):
     def face_data_callback(self, msg):
         """Process incoming face detection data"""
         try:
-            # Parse the JSON data
-            data = json.loads(msg.data)
-            
             # Update frame dimensions if provided
-            if 'frame_width' in data and 'frame_height' in data:
-                self.frame_width = data['frame_width']
-                self.frame_height = data['frame_height']
+            if msg.frame_width > 0 and msg.frame_height > 0:
+                self.frame_width = msg.frame_width
+                self.frame_height = msg.frame_height
             
             # Update face positions
-            self.face_positions = data.get('faces', [])
+            self.face_positions = msg.faces
             self.last_face_update = time.time()
             
             # If no faces detected, just return
@@ -119,8 +115,8 @@ class CoffeeEyesNode(Node):
             largest_face = None
             
             for face in self.face_positions:
-                width = face['x2'] - face['x1']
-                height = face['y2'] - face['y1']
+                width = face.x2 - face.x1
+                height = face.y2 - face.y1
                 area = width * height
                 
                 if area > largest_area:
@@ -129,8 +125,8 @@ class CoffeeEyesNode(Node):
             
             if largest_face:
                 self.target_face_position = (
-                    largest_face['center_x'], 
-                    largest_face['center_y']
+                    largest_face.center_x,
+                    largest_face.center_y
                 )
                 
                 # Log face position before transformation
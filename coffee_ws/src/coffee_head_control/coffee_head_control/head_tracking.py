@@ -6,7 +6,6 @@ import threading
 import time
 import sys
 import cv2
-import json
 import math
 from enum import Enum, auto
 from rclpy.node import Node
@@ -280,14 +279,15 @@ class HeadTrackingSystem(QObject):
     def face_data_callback(self, msg: AffectiveState):
         """Process face data received from camera_node.py"""
         try:
-            # Parse the JSON data
-            # data = json.loads(msg.data)
-            # self.node.get_logger().info(f"Face data received: {msg}")
-            data = json.loads(msg.gaze_target_v2)
+            face_array = msg.gaze_target_v2
+            
+            # No face data has reached the state manager yet
+            if face_array.frame_width == 0 or face_array.frame_height == 0:
+                return
             
             # Update frame dimensions
-            self.frame_width = data['frame_width']
-            self.frame_height = data['frame_height']
+            self.frame_width = face_array.frame_width
+            self.frame_height = face_array.frame_height
             self.center_x = self.frame_width // 2
             self.center_y = self.frame_height // 2
             
@@ -295,19 +295,26 @@ class HeadTrackingSystem(QObject):
             self.last_face_data_time = time.time()
             
             # Process the faces if tracking is enabled
-            if self.tracking_enabled and len(data['faces']) > 0:
-                faces = data['faces']
-                self.node.get_logger().debug(f"Received {len(faces)} faces from camera_node")
+            if self.tracking_enabled and len(face_array.faces) > 0:
+                self.node.get_logger().debug(f"Received {len(face_array.faces)} faces from camera_node")
                 
                 # Convert to format expected by process_faces
                 opencv_faces = []
-                for face in faces:
-                    opencv_face = face  # Already in the correct format from camera_node
-                    opencv_faces.append(opencv_face)
+                for face in face_array.faces:
+                    opencv_faces.append({
+                        'x1': face.x1,
+                        'y1': face.y1,
+                        'x2': face.x2,
+                        'y2': face.y2,
+                        'center_x': face.center_x,
+                        'center_y': face.center_y,
+                        'confidence': face.confidence,
+                        'id': face.identity or 'Unknown'
+                    })
                 
                 # Process the faces (without a frame)
                 self.process_faces_data(opencv_faces)
-            elif self.tracking_enabled and len(data['faces']) == 0:
+            elif self.tracking_enabled and len(face_array.faces) == 0:
                 # No faces detected
                 if not self.scanning:
                     self.start_scanning()
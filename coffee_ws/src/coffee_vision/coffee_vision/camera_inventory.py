@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+
+"""
+Camera device inventory for the camera nodes.
+
+Scanning for cameras by opening every /dev/videoN with cv2.VideoCapture
+takes a second or more per index on V4L2. CameraInventory instead lists
+/sys/class/video4linux, reads the device name and USB serial from sysfs and
+asks the driver for its capabilities with VIDIOC_QUERYCAP, which does not
+start a stream. Devices are probed in parallel, probe results are cached by
+device serial, and the cache is invalidated when the set of video devices
+changes (hotplug).
+
+Where sysfs is not available, a small number of indices are probed with
+cv2.VideoCapture, also in parallel.
+"""
+
+import os
+import fcntl
+import struct
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+
+logger = logging.getLogger("camera_inventory")
+
+SYSFS_VIDEO_DIR = "/sys/class/video4linux"
+
+# struct v4l2_capability: driver[16], card[32], bus_info[32], version,
+# capabilities, device_caps, reserved[3]
+_V4L2_CAPABILITY = struct.Struct("16s32s32sIII3I")
+VIDIOC_QUERYCAP = (2 << 30) | (_V4L2_CAPABILITY.size << 16) | (ord('V') << 8) | 0
+V4L2_CAP_VIDEO_CAPTURE = 0x00000001
+V4L2_CAP_VIDEO_CAPTURE_MPLANE = 0x00001000
+V4L2_CAP_DEVICE_CAPS = 0x80000000
+
+
+@dataclass(frozen=True)
+class CameraDevice:
+    """A video capture device found by the inventory"""
+    index: int
+    path: str
+    name: str
+    serial: str = ""
+    bus_info: str = ""
+    driver: str = ""
+
+    @property
+    def label(self) -> str:
+        """Display name for camera lists"""
+        return f"Camera {self.index}: {self.name} ({self.path})"
+
+
+def query_capabilities(path: str) -> Optional[Tuple[str, str, str, int]]:
+    """
+    Ask a V4L2 device node for its capabilities without starting a stream.
+
+    Args:
+        path: Device node path (e.g. /dev/video0)
+
+    Returns:
+        Tuple of (driver, card name, bus info, device capabilities), or None
+        if the node cannot be queried
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+    except OSError:
+        return None
+    try:
+        buffer = bytearray(_V4L2_CAPABILITY.size)
+        fcntl.ioctl(fd, VIDIOC_QUERYCAP, buffer)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+
+    driver, card, bus_info, _, capabilities, device_caps = _V4L2_CAPABILITY.unpack(buffer)[:6]
+    caps = device_caps if capabilities & V4L2_CAP_DEVICE_CAPS else capabilities
+
+    def decode(raw):
+        return raw.split(b'\0', 1)[0].decode(errors='replace')
+    return decode(driver), decode(card), decode(bus_info), caps
+
+
+def _read_sysfs(path: str) -> str:
+    """Read a sysfs attribute, or '' if it does not exist"""
+    try:
+        with open(path, 'r') as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+
+def _device_serial(entry_dir: str) -> str:
+    """Find the USB serial (or vendor:product) of a video4linux entry's device"""
+    device_dir = os.path.realpath(os.path.join(entry_dir, 'device'))
+    # The video node hangs off a USB interface; the serial lives on its parent device
+    for _ in range(4):
+        serial = _read_sysfs(os.path.join(device_dir, 'serial'))
+        if serial:
+            vendor = _read_sysfs(os.path.join(device_dir, 'idVendor'))
+            product = _read_sysfs(os.path.join(device_dir, 'idProduct'))
+            return f"{vendor}:{product}:{serial}" if vendor else serial
+        parent = os.path.dirname(device_dir)
+        if parent == device_dir:
+            break
+        device_dir = parent
+    return ""
+
+
+class CameraInventory:
+    """
+    Cached inventory of video capture devices.
+
+    Features:
+    - Device enumeration from /sys/class/video4linux (no streams opened)
+    - Capture capability check with VIDIOC_QUERYCAP, in parallel
+    - Probe results cached by device serial (USB port without a serial)
+    - Hotplug detection by fingerprinting the video4linux entries
+    - Parallel cv2.VideoCapture probing where sysfs is not available
+    """
+
+    def __init__(self, max_workers: int = 8, fallback_indices: int = 2):
+        """
+        Initialize the inventory.
+
+        Args:
+            max_workers: Maximum number of devices probed at once
+            fallback_indices: Indices probed with cv2.VideoCapture without sysfs
+        """
+        self.max_workers = max(1, max_workers)
+        self.fallback_indices = fallback_indices
+
+        self._cache = {}  # cache key -> (driver, card, bus info, is capture device)
+        self._devices = []
+        self._fingerprint = None
+        self._lock = threading.Lock()
+
+        # Statistics
+        self.scans = 0
+        self.probes = 0
+        self.cache_hits = 0
+
+    def fingerprint(self) -> Tuple:
+        """Cheap snapshot of the video devices present (changes on hotplug)"""
+        try:
+            entries = sorted(os.listdir(SYSFS_VIDEO_DIR))
+        except OSError:
+            return ()
+        return tuple(
+            (entry, os.path.realpath(os.path.join(SYSFS_VIDEO_DIR, entry, 'device')))
+            for entry in entries
+        )
+
+    def changed(self) -> bool:
+        """Whether devices were added or removed since the last scan"""
+        return self.fingerprint() != self._fingerprint
+
+    def invalidate(self):
+        """Drop all cached probe results"""
+        with self._lock:
+            self._cache.clear()
+            self._fingerprint = None
+
+    def get_cameras(self, refresh: bool = False) -> List[CameraDevice]:
+        """
+        Get the capture devices, scanning only if devices changed.
+
+        Args:
+            refresh: Rescan even if the device set looks unchanged (cached
+                probe results are still reused)
+
+        Returns:
+            List of CameraDevice, ordered by index
+        """
+        with self._lock:
+            fingerprint = self.fingerprint()
+            if not refresh and self._fingerprint is not None and fingerprint == self._fingerprint:
+                return list(self._devices)
+
+            if fingerprint:
+                devices = self._scan_sysfs(fingerprint)
+            else:
+                devices = self._scan_fallback()
+            self._devices = devices
+            self._fingerprint = fingerprint
+            self.scans += 1
+            return list(devices)
+
+    def get_stats(self) -> Dict:
+        """Get inventory statistics"""
+        return {
+            'devices': len(self._devices),
+            'cached': len(self._cache),
+            'scans': self.scans,
+            'probes': self.probes,
+            'cache_hits': self.cache_hits
+        }
+
+    def _scan_sysfs(self, fingerprint: Tuple) -> List[CameraDevice]:
+        """Build the device list from sysfs, probing uncached devices in parallel"""
+        candidates = []
+        for entry, device_path in fingerprint:
+            if not entry.startswith('video') or not entry[5:].isdigit():
+                continue
+            entry_dir = os.path.join(SYSFS_VIDEO_DIR, entry)
+            path = f"/dev/{entry}"
+            if not os.access(path, os.R_OK):
+                continue
+            serial = _device_serial(entry_dir)
+            name = _read_sysfs(os.path.join(entry_dir, 'name')) or entry
+            # One device exposes several nodes (e.g. capture + metadata); the
+            # per-device node index tells them apart. Without a serial the
+            # sysfs device path (stable for a USB port) identifies the device.
+            node_index = _read_sysfs(os.path.join(entry_dir, 'index'))
+            key = (serial or device_path, name, node_index)
+            candidates.append((int(entry[5:]), path, name, serial, key))
+
+        if fingerprint != self._fingerprint:
+            # Hotplug: forget devices that are gone, so they are probed afresh if they return
+            present = {candidate[4] for candidate in candidates}
+            self._cache = {key: value for key, value in self._cache.items() if key in present}
+
+        to_probe = [c for c in candidates if c[4] not in self._cache]
+        self.cache_hits += len(candidates) - len(to_probe)
+        if to_probe:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(to_probe))) as pool:
+                results = list(pool.map(lambda c: query_capabilities(c[1]), to_probe))
+            self.probes += len(to_probe)
+            for candidate, result in zip(to_probe, results):
+                if result is None:
+                    continue  # Not cached, so it is probed again on the next scan
+                driver, card, bus_info, caps = result
+                is_capture = bool(caps & (V4L2_CAP_VIDEO_CAPTURE | V4L2_CAP_VIDEO_CAPTURE_MPLANE))
+                self._cache[candidate[4]] = (driver, card, bus_info, is_capture)
+
+        devices = []
+        for index, path, name, serial, key in sorted(candidates):
+            cached = self._cache.get(key)
+            if cached is None or not cached[3]:
+                continue  # Not queryable, or a metadata / output node
+            driver, card, bus_info, _ = cached
+            devices.append(CameraDevice(index, path, card or name, serial, bus_info, driver))
+        logger.info(f"Camera inventory: {len(devices)} capture devices "
+                    f"({len(to_probe)} probed, {len(candidates) - len(to_probe)} cached)")
+        return devices
+
+    def _scan_fallback(self) -> List[CameraDevice]:
+        """Probe the first indices with cv2.VideoCapture, in parallel"""
+        def probe(index):
+            capture = cv2.VideoCapture(index)
+            try:
+                return capture.isOpened()
+            finally:
+                capture.release()
+
+        indices = list(range(self.fallback_indices))
+        if not indices:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(indices))) as pool:
+            results = list(pool.map(probe, indices))
+        self.probes += len(indices)
+        return [CameraDevice(index, f"index {index}", f"Camera {index}")
+                for index, ok in zip(indices, results) if ok]
+
+
+def find_device(devices: List[CameraDevice], index: int) -> Optional[CameraDevice]:
+    """Find a device by camera index"""
+    for device in devices:
+        if device.index == index:
+            return device
+    return None
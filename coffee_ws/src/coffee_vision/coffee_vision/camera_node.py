@@ -8,17 +8,27 @@ import numpy as np
 import threading
 import os
 import subprocess
-import json
 import collections
 from rclpy.node import Node
+from rclpy.time import Time as RclpyTime
 
 from std_msgs.msg import Float32MultiArray, String, Bool, Int32
-from sensor_msgs.msg import Image
+from sensor_msgs.msg import Image, CompressedImage
 from geometry_msgs.msg import Point
+from coffee_vision_msgs.msg import FaceArray, SharedFrame, FaceCrop
 from cv_bridge import CvBridge
 
 from .coordinate_utils import transform_camera_to_eye_coords
+from .data_types import build_face_array
 from .face_detection import FaceDetector
+from .face_detectors import (benchmark_detectors, format_benchmark, save_benchmark,
+                             resolve_detector_name, set_dnn_threads)
+from .face_quality import score_face_crops, FaceCropGate
+from .frame_streams import FrameStreamEncoder, STREAM_COMPRESSED
+from .shm_frames import SharedFrameWriter
+from .capture_config import build_gstreamer_pipeline, negotiate_format, CaptureRateMeter, format_capture_report
+from .frame_buffer import FrameRingBuffer
+from .camera_inventory import CameraInventory
 
 
 class FrameGrabber:
@@ -48,6 +58,15 @@ class FrameGrabber:
             # cv2.CAP_PROP_AUTO_WB: 1,  # Enable auto white balance
             # cv2.CAP_PROP_EXPOSURE: self.target_exposure,
         }
+        
+        # Capture format negotiation: explicit FOURCC (MJPG keeps 720p at full rate over
+        # USB 2.0) or a user-supplied GStreamer pipeline that decodes and scales
+        self.pixel_format = self.config.get('pixel_format', 'auto')
+        self.gstreamer_pipeline = self.config.get('gstreamer_pipeline', '')
+        self.using_pipeline = False
+        self.rate_meter = CaptureRateMeter()
+        self.capture_report = {}
+        self.reconfigure_pending = False  # New capture settings for the capture thread to apply
         self.running = False
         self.lock = threading.Lock()
         self.capture_thread = None
@@ -55,12 +74,15 @@ class FrameGrabber:
         self.publish_thread = None
         self.high_quality = False
         
-        # Initialize shared frame buffer
-        self.current_frame = None
-        self.processed_frame = None
+        # Preallocated frame rings: capture -> process -> publish
+        # Consumers block on a newer sequence number instead of polling
+        self.frame_ring = FrameRingBuffer(self.config.get('frame_buffer_size', 4))
+        self.processed_ring = FrameRingBuffer(3)
         self.current_faces = []
+        self.processing_fps = 0.0
         self.frame_lock = threading.Lock()
-        self.frame_timestamp = 0  # Track frame freshness
+        self.max_frame_age = 0.1  # Skip frames older than 100ms
+        self.ring_wait_timeout = 0.5  # Re-check running flag at least this often
         
         # Frame processing control
         # (UI-related frame rate controls removed in headless mode)
@@ -78,10 +100,17 @@ class FrameGrabber:
         
         # Face detection
         self.enable_face_detection = True
+        set_dnn_threads(self.config.get('dnn_threads', 0))
         self.face_detector = FaceDetector(
             confidence_threshold=self.config.get('face_confidence_threshold', 0.5),
             smoothing_factor=self.config.get('face_smoothing_factor', 0.4),
-            logger=self.node.get_logger() if self.node else None
+            logger=self.node.get_logger() if self.node else None,
+            enable_tracking=self.config.get('face_tracking', True),
+            enable_roi_detection=self.config.get('face_roi_detection', True),
+            full_sweep_interval=self.config.get('face_full_sweep_interval', 10),
+            backend=resolve_detector_name(self.config.get('face_detector', 'ssd')),
+            dnn_backend=self.config.get('dnn_backend', 'auto'),
+            dnn_target=self.config.get('dnn_target', 'auto')
         )
 
         # Eye movement parameters from configuration
@@ -92,85 +121,80 @@ class FrameGrabber:
 
         # ROS publishers for face data and images
         if self.node:
-            self.face_pub = node.create_publisher(String, 'face_detection_data', 10)
+            self.face_pub = node.create_publisher(FaceArray, 'face_detection_data', 10)
             self.face_position_pub = node.create_publisher(Point, '/vision/face_position', 10)
-            self.face_position_pub_v2 = node.create_publisher(String, '/vision/face_position_v2', 10)
+            self.face_position_pub_v2 = node.create_publisher(FaceArray, '/vision/face_position_v2', 10)
             self.frame_pub = node.create_publisher(Image, '/coffee_bot/camera/image_raw', 10)
+            self.compressed_frame_pub = node.create_publisher(
+                CompressedImage, '/coffee_bot/camera/image_raw/compressed', 10)
+            self.preview_pub = node.create_publisher(CompressedImage, '/coffee_bot/camera/preview/compressed', 10)
+            self.shm_frame_pub = node.create_publisher(SharedFrame, '/coffee_bot/camera/image_shm', 10)
             self.face_image_pub = node.create_publisher(Image, 'face_images', 10)
+            self.face_crop_pub = node.create_publisher(FaceCrop, 'face_crops', 10)
             self.bridge = CvBridge()
+
+        # Same-host consumers read frames from a shared-memory ring; the topic only carries the slot index
+        self.shm_transport = self.config.get('shm_transport', True)
+        self.shm_writer = SharedFrameWriter(self.config.get('shm_slots', 4))
+        
+        # Overlay mode: 'frame' draws debug graphics into the published frames,
+        # 'metadata' publishes clean frames and leaves drawing to the UI
+        self.overlay_mode = self.config.get('overlay_mode', 'frame')
+        self.draw_overlays = self.overlay_mode != 'metadata'
+        
+        # Frame streams: raw frames only when subscribed, JPEG and preview encoded off the publish thread
+        self.publish_raw = self.config.get('publish_raw', True)
+        self.publish_compressed = self.config.get('publish_compressed', True)
+        self.preview_enabled = self.config.get('preview_enabled', True)
+        self.frame_encoder = FrameStreamEncoder(
+            self._publish_encoded_frame,
+            jpeg_quality=self.config.get('jpeg_quality', 80),
+            preview_width=self.config.get('preview_width', 320),
+            preview_rate=self.config.get('preview_rate', 5.0),
+            preview_jpeg_quality=self.config.get('preview_jpeg_quality', 70)
+        )
+        
+        # Only publish face crops that improve on their track's best (or are due a refresh)
+        self.face_crop_gate = FaceCropGate(
+            refresh_interval=self.config.get('face_image_refresh_interval', 2.0),
+            min_improvement=self.config.get('face_image_min_improvement', 5.0)
+        )
             
         # Face recognition data
         self.face_ids = {}  # Map of face index to recognized face ID
         self.last_recognition_time = 0
         self.recognition_timeout = 3.0  # Clear recognition data after 3 seconds
      
-    def publish_face_data(self, faces):
+    def build_face_message(self, faces, timestamp):
+        """
+        Build a FaceArray message for a processed frame.
+
+        Args:
+            faces: Face dictionaries from the detector
+            timestamp: Capture time of the frame the faces were detected in
+
+        Returns:
+            FaceArray message stamped with the capture time
+        """
+        return build_face_array(
+            faces,
+            self.frame_width,
+            self.frame_height,
+            stamp=RclpyTime(seconds=timestamp).to_msg()
+        )
+
+    def publish_face_data(self, face_msg):
         """Publish face detection data for other nodes"""
         if not self.node:
             return
-        
-        # Ensure faces is at least an empty list
-        faces = faces if faces else []
-            
-        # Create JSON with face data - convert NumPy types to Python native types
-        face_data = {
-            "timestamp": float(time.time()),
-            "frame_width": int(self.frame_width),
-            "frame_height": int(self.frame_height),
-            "faces": [
-                {
-                    "x1": int(face["x1"]),
-                    "y1": int(face["y1"]),
-                    "x2": int(face["x2"]),
-                    "y2": int(face["y2"]),
-                    "center_x": int(face["center_x"]),
-                    "center_y": int(face["center_y"]),
-                    "confidence": float(face["confidence"]),
-                    "id": str(face.get("id", "Unknown"))
-                }
-                for face in faces
-            ]
-        }
-        
-        # Publish
-        msg = String()
-        msg.data = json.dumps(face_data)
-        self.face_pub.publish(msg)
+        self.face_pub.publish(face_msg)
 
-    def publish_face_position_v2(self, faces):
-        """Publish face detection data for other nodes"""
+    def publish_face_position_v2(self, face_msg):
+        """Publish face positions for the expression state manager"""
         if not self.node:
             return
-            
-        # Ensure faces is at least an empty list
-        faces = faces if faces else []
-            
-        # Create JSON with face data - convert NumPy types to Python native types
-        face_data = {
-            "timestamp": float(time.time()),
-            "frame_width": int(self.frame_width),
-            "frame_height": int(self.frame_height),
-            "faces": [
-                {
-                    "x1": int(face["x1"]),
-                    "y1": int(face["y1"]),
-                    "x2": int(face["x2"]),
-                    "y2": int(face["y2"]),
-                    "center_x": int(face["center_x"]),
-                    "center_y": int(face["center_y"]),
-                    "confidence": float(face["confidence"]),
-                    "id": str(face.get("id", "Unknown"))
-                }
-                for face in faces
-            ]
-        }
-        
-        # Publish
-        msg = String()
-        msg.data = json.dumps(face_data)
-        self.face_position_pub_v2.publish(msg)
+        self.face_position_pub_v2.publish(face_msg)
 
-        
     def publish_face_position(self, faces):
         """Process incoming face detection data"""
 
@@ -240,65 +264,151 @@ class FrameGrabber:
             self.node.get_logger().error(f"Error processing face position data: {e}")
 
     def publish_face_images(self, frame, faces):
-        """Extract and publish individual face images"""
+        """Extract and publish face images that beat their track's best crop (or are due a refresh)"""
         if not self.node:
             return
             
         try:
+            margin = 0.2  # 20%
+            crop_size = 150
+            h, w = frame.shape[:2]
+            crops = []
+            candidates = []  # (track ID, box) per crop
+            origins = []  # Crop origin (x, y) in the frame
+            
             for i, face in enumerate(faces):
-                # Extract face with margin
-                margin = 0.2  # 20%
-                
                 # Get dimensions
                 x1, y1 = face['x1'], face['y1']
                 x2, y2 = face['x2'], face['y2']
-                h, w = frame.shape[:2]
                 
                 # Calculate margin
                 margin_x = int((x2 - x1) * margin)
                 margin_y = int((y2 - y1) * margin)
                 
-                # Apply margin
-                x1_margin = max(0, x1 - margin_x)
-                y1_margin = max(0, y1 - margin_y)
-                x2_margin = min(w, x2 + margin_x)
-                y2_margin = min(h, y2 + margin_y)
-                
-                # Extract face
-                face_img = frame[y1_margin:y2_margin, x1_margin:x2_margin]
+                # Extract face with margin
+                crop_x, crop_y = max(0, x1 - margin_x), max(0, y1 - margin_y)
+                face_img = frame[crop_y:min(h, y2 + margin_y), crop_x:min(w, x2 + margin_x)]
                 
                 # Skip if too small
                 if face_img.size == 0 or face_img.shape[0] < 30 or face_img.shape[1] < 30:
                     continue
-                    
+                
+                crops.append(face_img)
+                candidates.append((face.get('track_id', i), (x1, y1, x2, y2)))
+                origins.append((crop_x, crop_y, face.get('landmarks')))
+            
+            if not crops:
+                return
+            
+            # Score all crops in one batch and only publish those that improve on their track
+            qualities = score_face_crops(crops, [box for _, box in candidates])
+            selected = self.face_crop_gate.select([track_id for track_id, _ in candidates], qualities)
+            
+            stamp = self.node.get_clock().now().to_msg()
+            publish_crops = self.face_crop_pub.get_subscription_count() > 0
+            for face_img, (track_id, box), origin, publish in zip(crops, candidates, origins, selected):
+                if not publish:
+                    continue
+                
                 # Resize
-                face_img = cv2.resize(face_img, (150, 150))
+                scale_x = crop_size / face_img.shape[1]
+                scale_y = crop_size / face_img.shape[0]
+                face_img = cv2.resize(face_img, (crop_size, crop_size))
                 
                 # Publish
                 face_msg = self.bridge.cv2_to_imgmsg(face_img, encoding="bgr8")
-                face_msg.header.stamp = self.node.get_clock().now().to_msg()
-                face_msg.header.frame_id = f"face_{i}"
+                face_msg.header.stamp = stamp
+                face_msg.header.frame_id = f"face_{track_id}"  # Track ID keys recognition
                 self.face_image_pub.publish(face_msg)
                 
+                if publish_crops:
+                    # Same crop plus the face's location in it, so the recognizer can skip detection
+                    self.face_crop_pub.publish(
+                        self._build_face_crop(face_msg, track_id, box, origin, scale_x, scale_y))
+                
         except Exception as e:
             if self.node:
                 self.node.get_logger().error(f"Error publishing face images: {e}")
 
 
 
+    def _build_face_crop(self, image_msg, track_id, box, origin, scale_x, scale_y):
+        """
+        Build a FaceCrop message with the face box and landmarks in crop coordinates.
+        
+        Args:
+            image_msg: Published face crop image message
+            track_id: Track ID of the face
+            box: Face box (x1, y1, x2, y2) in frame coordinates
+            origin: (crop x, crop y, landmarks or None) in frame coordinates
+            scale_x: Horizontal scale from the frame crop to the published crop
+            scale_y: Vertical scale from the frame crop to the published crop
+        """
+        crop_x, crop_y, landmarks = origin
+        crop_msg = FaceCrop()
+        crop_msg.header = image_msg.header
+        crop_msg.image = image_msg
+        crop_msg.track_id = int(track_id)
+        crop_msg.x1 = int((box[0] - crop_x) * scale_x)
+        crop_msg.y1 = int((box[1] - crop_y) * scale_y)
+        crop_msg.x2 = int((box[2] - crop_x) * scale_x)
+        crop_msg.y2 = int((box[3] - crop_y) * scale_y)
+        if landmarks:
+            crop_msg.landmarks = [
+                float(value)
+                for x, y in landmarks
+                for value in ((x - crop_x) * scale_x, (y - crop_y) * scale_y)
+            ]
+        return crop_msg
+    
     def publish_frame(self, frame):
-        """Publish camera frame to ROS topics"""
+        """
+        Publish camera frame to ROS topics.
+
+        The raw frame is only converted and published when the raw topic has
+        subscribers; same-host readers get it through the shared-memory ring
+        instead. The compressed and preview streams are handed to the
+        frame encoder, which encodes them on its own thread.
+        """
         if not self.node:
             return
             
         try:
-            frame_msg = self.bridge.cv2_to_imgmsg(frame, encoding="bgr8")
-            frame_msg.header.stamp = self.node.get_clock().now().to_msg()
-            self.frame_pub.publish(frame_msg)
+            now = self.node.get_clock().now()
+            stamp = now.to_msg()
+            if self.shm_transport and self.shm_frame_pub.get_subscription_count() > 0:
+                segment, slot, sequence = self.shm_writer.write(frame, now.nanoseconds * 1e-9)
+                shm_msg = SharedFrame()
+                shm_msg.header.stamp = stamp
+                shm_msg.segment = segment
+                shm_msg.slot = slot
+                shm_msg.sequence = sequence
+                self.shm_frame_pub.publish(shm_msg)
+            
+            if self.publish_raw and self.frame_pub.get_subscription_count() > 0:
+                frame_msg = self.bridge.cv2_to_imgmsg(frame, encoding="bgr8")
+                frame_msg.header.stamp = stamp
+                self.frame_pub.publish(frame_msg)
+            
+            compressed = self.publish_compressed and self.compressed_frame_pub.get_subscription_count() > 0
+            preview = self.preview_enabled and self.preview_pub.get_subscription_count() > 0
+            if compressed or preview:
+                self.frame_encoder.submit(frame, stamp, compressed=compressed, preview=preview)
         except Exception as e:
             if self.node:
                 self.node.get_logger().error(f"Error publishing frame: {e}")
     
+    def _publish_encoded_frame(self, stream, data, stamp):
+        """Publish a JPEG frame from the frame encoder thread"""
+        msg = CompressedImage()
+        msg.header.stamp = stamp
+        msg.format = 'jpeg'
+        msg.data = data
+        if stream == STREAM_COMPRESSED:
+            self.compressed_frame_pub.publish(msg)
+        else:
+            self.preview_pub.publish(msg)
+    
 
     
     def start(self, camera_index, backend=cv2.CAP_ANY):
@@ -309,6 +419,8 @@ class FrameGrabber:
             self.camera_index = camera_index
             self.backend = backend
             self.running = True
+            self.frame_ring.reopen()
+            self.processed_ring.reopen()
             
             # Start capture thread
             self.capture_thread = threading.Thread(target=self._capture_loop)
@@ -325,15 +437,18 @@ class FrameGrabber:
                 self.publish_thread = threading.Thread(target=self._publish_loop)
                 self.publish_thread.daemon = True
                 self.publish_thread.start()
+                self.frame_encoder.start()
     
     def stop(self):
         """Stop the frame grabber threads"""
         with self.frame_lock:
             self.running = False
-            self.current_frame = None
-            self.processed_frame = None
             self.current_faces = []
         
+        # Wake any consumers blocked on the frame rings
+        self.frame_ring.close()
+        self.processed_ring.close()
+        
         # Wait for threads to finish
         if self.capture_thread and self.capture_thread.is_alive():
             self.capture_thread.join()
@@ -344,6 +459,9 @@ class FrameGrabber:
         if self.publish_thread and self.publish_thread.is_alive():
             self.publish_thread.join()
         
+        # Stop the frame stream encoder after the publish thread that feeds it
+        self.frame_encoder.stop()
+        
         # Release camera if it's open
         if self.camera and self.camera.isOpened():
             self.camera.release()
@@ -367,23 +485,36 @@ class FrameGrabber:
             cv2.CAP_PROP_FPS: self.target_fps
         })
         
-        if self.camera and self.camera.isOpened():
-            # Apply new settings
-            for prop, value in self.camera_props.items():
-                try:
-                    self.camera.set(prop, value)
-                except:
-                    pass
-            
-            # Verify new settings
-            actual_width = int(self.camera.get(cv2.CAP_PROP_FRAME_WIDTH))
-            actual_height = int(self.camera.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            actual_fps = self.camera.get(cv2.CAP_PROP_FPS)
-            
-            print(f"Quality changed to: {actual_width}x{actual_height} @ {actual_fps:.1f} FPS")
+        if self.using_pipeline and self.running:
+            # Pipeline caps are fixed at open time - reopen with the new size
+            self.start(self.camera_index, self.backend)
+            print(f"Quality changed to: {self.frame_width}x{self.frame_height} @ {self.target_fps} FPS (pipeline reopened)")
+        elif self.running:
+            # The capture thread applies the settings between reads - changing the
+            # format underneath a blocked read() makes V4L2 restart the stream
+            self.reconfigure_pending = True
             
             # No UI update needed in headless mode
     
+    def _apply_capture_settings(self):
+        """Renegotiate format, size and rate on the open camera (capture thread only)"""
+        # Apply new settings (format first, so the new size is available in it)
+        pixel_format = self._negotiate_format()
+        
+        # Verify new settings
+        actual_width = int(self.camera.get(cv2.CAP_PROP_FRAME_WIDTH))
+        actual_height = int(self.camera.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        actual_fps = self.camera.get(cv2.CAP_PROP_FPS)
+        
+        print(f"Quality changed to: {actual_width}x{actual_height} @ {actual_fps:.1f} FPS ({pixel_format})")
+        self.capture_report.update({
+            'pixel_format': pixel_format,
+            'requested': {'width': self.frame_width, 'height': self.frame_height, 'fps': self.target_fps},
+            'reported_fps': actual_fps,
+            'achieved': {}
+        })
+        self.rate_meter.reset()
+    
     def toggle_face_detection(self, enable):
         """Enable or disable face detection"""
         with self.lock:
@@ -399,9 +530,95 @@ class FrameGrabber:
     
 
     
+    def run_detector_benchmark(self, frame_count=20, recall_floor=0.9, timeout=30.0):
+        """
+        Benchmark the detector backends on live frames and switch to the best one.
+        
+        Frames are sampled from the capture ring over a few seconds; face
+        detection is paused while the backends are timed so the processing
+        thread does not compete for the CPU. The result is saved for nodes
+        configured with face_detector 'auto'.
+        
+        Args:
+            frame_count: Number of sample frames
+            recall_floor: Minimum recall against the reference detector
+            timeout: Maximum time to wait for sample frames in seconds
+            
+        Returns:
+            Benchmark result dict, or None if no frames were captured
+        """
+        logger = self.node.get_logger() if self.node else None
+        frames = []
+        last_sequence = 0
+        deadline = time.time() + timeout
+        while len(frames) < frame_count and time.time() < deadline and self.running:
+            packet = self.frame_ring.wait_for_next(last_sequence, timeout=0.5, consumer='benchmark')
+            if packet is None:
+                continue
+            last_sequence = packet.sequence
+            frame = packet.frame.copy()
+            if self.frame_ring.is_valid(packet):
+                frames.append(frame)
+            time.sleep(0.1)  # Spread the samples over a few seconds of motion
+        
+        if not frames:
+            if logger:
+                logger.error("Detector benchmark: no frames captured")
+            return None
+        
+        was_enabled = self.enable_face_detection
+        self.toggle_face_detection(False)
+        try:
+            result = benchmark_detectors(
+                frames,
+                recall_floor=recall_floor,
+                confidence_threshold=self.face_detector.confidence_threshold,
+                models_dir=self.face_detector.models_dir,
+                dnn_backend=self.face_detector.dnn_backend,
+                dnn_target=self.face_detector.dnn_target
+            )
+        finally:
+            self.toggle_face_detection(was_enabled)
+        
+        report = format_benchmark(result)
+        print(report)
+        if logger:
+            logger.info(report)
+        
+        if result['choice']:
+            save_benchmark(result, self.face_detector.models_dir)
+            self.face_detector.set_backend(result['choice'])
+            if logger:
+                logger.info(f"Using face detector: {self.face_detector.detector.describe()}")
+        elif logger:
+            logger.warn("Detector benchmark found no backend meeting the recall floor, "
+                        f"keeping {self.face_detector.backend_name}")
+        return result
+    
     def _capture_loop(self):
         """Main capture loop for camera frames"""
         try:
+            success = False
+            error_msg = ""
+            backend_name = ""
+            self.using_pipeline = False
+            
+            # A user-supplied GStreamer pipeline takes precedence over the backends
+            if self.gstreamer_pipeline:
+                pipeline = build_gstreamer_pipeline(
+                    self.gstreamer_pipeline, self.camera_index,
+                    self.frame_width, self.frame_height, self.target_fps)
+                self.camera = cv2.VideoCapture(pipeline, cv2.CAP_GSTREAMER)
+                if self.camera.isOpened():
+                    success = True
+                    backend_name = "GStreamer pipeline"
+                    self.using_pipeline = True
+                    print(f"Opened camera with GStreamer pipeline: {pipeline}")
+                else:
+                    if self.node:
+                        self.node.get_logger().warn(
+                            f"Could not open GStreamer pipeline, falling back to backends: {pipeline}")
+            
             # Try different backends if the default doesn't work
             backends_to_try = [
                 (cv2.CAP_V4L2, "V4L2"),        # Linux V4L2
@@ -413,11 +630,8 @@ class FrameGrabber:
             if self.backend != cv2.CAP_ANY:
                 backends_to_try.insert(0, (self.backend, "User selected"))
             
-            success = False
-            error_msg = ""
-            
             # Try each backend until one works
-            for backend, backend_name in backends_to_try:
+            for backend, backend_name_candidate in ([] if success else backends_to_try):
                 try:
                     if backend == cv2.CAP_ANY:
                         self.camera = cv2.VideoCapture(self.camera_index)
@@ -425,14 +639,15 @@ class FrameGrabber:
                         self.camera = cv2.VideoCapture(self.camera_index, backend)
                     
                     if not self.camera.isOpened():
-                        error_msg = f"Could not open camera {self.camera_index} with {backend_name} backend"
+                        error_msg = f"Could not open camera {self.camera_index} with {backend_name_candidate} backend"
                         continue
                     
                     success = True
+                    backend_name = backend_name_candidate
                     print(f"Successfully opened camera with {backend_name} backend")
                     break
                 except Exception as e:
-                    error_msg = f"Error opening camera with {backend_name} backend: {str(e)}"
+                    error_msg = f"Error opening camera with {backend_name_candidate} backend: {str(e)}"
                     continue
             
             if not success:
@@ -440,19 +655,26 @@ class FrameGrabber:
                     self.node.get_logger().error(f"Failed to open camera: {error_msg}")
                 return
             
-            # Configure camera with optimal settings
-            for prop, value in self.camera_props.items():
-                try:
-                    self.camera.set(prop, value)
-                except:
-                    pass  # Skip unsupported properties
+            # Negotiate pixel format, size and rate (a pipeline fixes these itself)
+            self.reconfigure_pending = False
+            if self.using_pipeline:
+                pixel_format = "pipeline"
+            else:
+                pixel_format = self._negotiate_format()
             
             # Verify and adjust settings
             actual_width = int(self.camera.get(cv2.CAP_PROP_FRAME_WIDTH))
             actual_height = int(self.camera.get(cv2.CAP_PROP_FRAME_HEIGHT))
             actual_fps = self.camera.get(cv2.CAP_PROP_FPS)
             
-            print(f"Camera configured with: {actual_width}x{actual_height} @ {actual_fps:.1f} FPS")
+            print(f"Camera configured with: {actual_width}x{actual_height} @ {actual_fps:.1f} FPS ({pixel_format})")
+            self.capture_report = {
+                'backend': backend_name,
+                'pixel_format': pixel_format,
+                'requested': {'width': self.frame_width, 'height': self.frame_height, 'fps': self.target_fps},
+                'reported_fps': actual_fps,
+                'achieved': {}
+            }
             
             # Warm up the camera
             for _ in range(5):
@@ -467,19 +689,30 @@ class FrameGrabber:
                     self.frame_width = frame_w
                     self.frame_height = frame_h
             
+            # Measure the achieved rate over the first frames of the loop
+            self.rate_meter.reset()
+            
             # Main capture loop
+            raw_frame = None
             while self.running:
-                ret, frame = self.camera.read()
+                # Apply quality changes here, never while a read is in progress
+                if self.reconfigure_pending:
+                    self.reconfigure_pending = False
+                    self._apply_capture_settings()
+                    raw_frame = None  # The frame size may change
+                
+                # Reuse the capture buffer between reads
+                ret, raw_frame = self.camera.read(raw_frame)
                 if not ret:
                     continue
+                capture_time = time.time()
+                if self.rate_meter.tick(capture_time):
+                    self._report_capture(raw_frame)
                 
-                # Flip frame horizontally
-                frame = cv2.flip(frame, 1)
-                
-                # Update shared frame buffer
-                with self.frame_lock:
-                    self.current_frame = frame
-                    self.frame_timestamp = time.time()
+                # Flip frame horizontally straight into the next ring slot
+                slot = self.frame_ring.begin_write(raw_frame.shape)
+                cv2.flip(raw_frame, 1, dst=slot)
+                self.frame_ring.commit(capture_time)
                         
         except Exception as e:
             if self.node:
@@ -489,29 +722,80 @@ class FrameGrabber:
                 self.camera.release()
                 self.camera = None
     
+    def _negotiate_format(self):
+        """Request the pixel format, frame size and rate from the open camera"""
+        extra_props = {
+            prop: value for prop, value in self.camera_props.items()
+            if prop not in (cv2.CAP_PROP_FRAME_WIDTH, cv2.CAP_PROP_FRAME_HEIGHT, cv2.CAP_PROP_FPS)
+        }
+        pixel_format = negotiate_format(
+            self.camera, self.pixel_format, self.frame_width, self.frame_height, self.target_fps, extra_props)
+        if self.pixel_format.upper() not in ('AUTO', 'ANY') and pixel_format != self.pixel_format.upper()[:4]:
+            if self.node:
+                self.node.get_logger().warn(
+                    f"Camera did not accept pixel format {self.pixel_format}, using {pixel_format}")
+        return pixel_format
+    
+    def _report_capture(self, frame):
+        """Log the requested vs achieved capture format once the rate has been measured"""
+        achieved_fps = self.rate_meter.fps
+        self.capture_report['achieved'] = {
+            'width': frame.shape[1],
+            'height': frame.shape[0],
+            'fps': achieved_fps
+        }
+        summary = format_capture_report(self.capture_report)
+        if self.node:
+            if achieved_fps < 0.8 * self.target_fps:
+                self.node.get_logger().warn(f"Camera capture below requested rate - {summary}")
+            else:
+                self.node.get_logger().info(f"Camera capture - {summary}")
+        else:
+            print(f"Camera capture - {summary}")
+    
+    def _apply_face_ids(self, faces, current_time):
+        """Attach recognized face IDs to a face list"""
+        # Check if recognition data is stale
+        if current_time - self.last_recognition_time > self.recognition_timeout:
+            self.face_ids = {}
+        
+        # Add face IDs
+        for i, face in enumerate(faces):
+            if i in self.face_ids:
+                face['id'] = self.face_ids[i]['id']
+            else:
+                face['id'] = 'Unknown'
+    
     def _process_loop(self):
         """Process frames from the queue"""
         try:
             frame_count = 0
             start_time = time.time()
             fps = 0
-            face_detection_interval = 3  # Reduced face detection frequency
-            frame_index = 0
+            last_sequence = 0
             
             while self.running:
-                # Get latest frame
-                with self.frame_lock:
-                    frame = self.current_frame
-                    frame_time = self.frame_timestamp
-                    if frame is None:
-                        continue
-                    
-                    # Make a copy to avoid holding the lock
-                    frame = frame.copy()
+                # Block until the capture thread commits a newer frame
+                packet = self.frame_ring.wait_for_next(
+                    last_sequence, timeout=self.ring_wait_timeout, consumer='process')
+                if packet is None:
+                    continue
+                last_sequence = packet.sequence
                 
                 # Skip if frame is too old (> 100ms)
-                if time.time() - frame_time > 0.1:
+                if time.time() - packet.timestamp > self.max_frame_age:
+                    continue
+                
+                # Copy into the output ring first, so detection and overlays work on a
+                # slot only this thread writes; a capture slot can be recycled while
+                # a slow detection is still reading it
+                output = self.processed_ring.begin_write(packet.frame.shape)
+                np.copyto(output, packet.frame)
+                if not self.frame_ring.is_valid(packet):
+                    # Capture thread lapped us while copying - drop the torn frame
+                    self.processed_ring.abort_write()
                     continue
+                frame = output
                 
                 # Adaptive face detection with time budgeting
                 self.detection_frame_counter += 1
@@ -526,8 +810,10 @@ class FrameGrabber:
                 
                 if should_detect:
                     detection_start = time.time()
-                    faces = self.face_detector.detect_faces(frame)
+                    faces = self.face_detector.detect(frame)
                     faces = self.face_detector.smooth_detections(faces)
+                    # Re-seed the trackers that carry faces until the next detection
+                    self.face_detector.seed_tracking(frame, faces)
                     detection_time = time.time() - detection_start
                     
                     # If detection took too long, increase skip frames
@@ -540,21 +826,15 @@ class FrameGrabber:
                     self.current_faces = faces  # No smoothing for better latency
                     self.last_detection_time = current_time
                     self.detection_frame_counter = 0
-                    
-                    # Check if recognition data is stale
-                    if current_time - self.last_recognition_time > self.recognition_timeout:
-                        self.face_ids = {}
-                    
-                    # Add face IDs
-                    for i, face in enumerate(faces):
-                        if i in self.face_ids:
-                            face['id'] = self.face_ids[i]['id']
-                        else:
-                            face['id'] = 'Unknown'
+                    self._apply_face_ids(faces, current_time)
                 
-                # Draw faces if available
-                if self.current_faces:
-                    frame = self.face_detector.draw_debug_overlay(frame, self.current_faces)
+                elif (self.enable_face_detection and self.face_detector.enable_tracking
+                        and self.current_faces):
+                    # Between detections, move the boxes with the trackers so
+                    # face positions come out at camera rate
+                    faces = self.face_detector.track_faces(frame)
+                    self._apply_face_ids(faces, current_time)
+                    self.current_faces = faces
                 
                 # Update FPS counter
                 frame_count += 1
@@ -564,14 +844,20 @@ class FrameGrabber:
                     fps = frame_count / elapsed if elapsed > 0 else 0
                     frame_count = 0
                     start_time = current_time
+                self.processing_fps = fps
                 
-                # Draw FPS
-                cv2.putText(frame, f"FPS: {fps:.1f}", (10, 30),
-                           cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+                # In metadata mode the frame stays clean - the UI draws from the face topic
+                if self.draw_overlays:
+                    # Draw faces if available
+                    if self.current_faces:
+                        frame = self.face_detector.draw_debug_overlay(frame, self.current_faces)
+                    
+                    # Draw FPS
+                    cv2.putText(frame, f"FPS: {fps:.1f}", (10, 30),
+                               cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
                 
-                # Update processed frame
-                with self.frame_lock:
-                    self.processed_frame = frame
+                # Hand the processed frame to the publish thread
+                self.processed_ring.commit(packet.timestamp)
                 
                 # No UI frame emission needed in headless mode
         except Exception as e:
@@ -581,37 +867,57 @@ class FrameGrabber:
     def _publish_loop(self):
         """Handle ROS publishing at controlled rate"""
         try:
+            last_sequence = 0
+            publish_buffer = None  # Private copy of the frame being published
+            
             while self.running:
-                current_time = time.time()
+                # Block until the process thread commits a newer frame
+                packet = self.processed_ring.wait_for_next(
+                    last_sequence, timeout=self.ring_wait_timeout, consumer='publish')
+                if packet is None:
+                    continue
                 
-                # Check if enough time has passed since last publish
-                if current_time - self.last_publish_time >= self.min_publish_interval:
-                    # Get latest processed frame
-                    with self.frame_lock:
-                        frame = self.processed_frame
-                        faces = self.current_faces[:] if self.current_faces else []
-                    
-                    if frame is not None:
-                        # Publish frame and face data
-                        self.publish_frame(frame)
-                        # Always publish face position, even when no faces are detected
-                        # This is used so that we can re-center the eyes -- zero them in.
-                        # self.publish_face_position(faces)
-                        # Always publish face data, even when no faces are detected
-                        self.publish_face_position_v2(faces)
-                        self.publish_face_data(faces)
-                        # Only publish face images when faces are actually detected
-                        if faces:
-                            self.publish_face_images(frame, faces)
-                        
-                        self.last_publish_time = current_time
+                # Rate limit publishing without spinning
+                wait_time = self.min_publish_interval - (time.time() - self.last_publish_time)
+                if wait_time > 0:
+                    time.sleep(wait_time)
+                    # Publish the newest frame, not the one that arrived before the pause
+                    packet = self.processed_ring.latest(packet.sequence) or packet
+                last_sequence = packet.sequence
+                
+                # Copy out of the ring slot and check it was not recycled meanwhile;
+                # publishing converts and crops the frame, which takes too long to
+                # do on a view the process thread may overwrite
+                if publish_buffer is None or publish_buffer.shape != packet.frame.shape:
+                    publish_buffer = np.empty_like(packet.frame)
+                np.copyto(publish_buffer, packet.frame)
+                if not self.processed_ring.is_valid(packet):
+                    continue
+                frame = publish_buffer
+                with self.frame_lock:
+                    faces = self.current_faces[:] if self.current_faces else []
+                
+                # Publish frame and face data
+                self.publish_frame(frame)
+                # Always publish face position, even when no faces are detected
+                # This is used so that we can re-center the eyes -- zero them in.
+                # self.publish_face_position(faces)
+                # Always publish face data, even when no faces are detected
+                face_msg = self.build_face_message(faces, packet.timestamp)
+                self.publish_face_position_v2(face_msg)
+                self.publish_face_data(face_msg)
+                # Only publish face images when faces are actually detected
+                if faces:
+                    self.publish_face_images(frame, faces)
+                
+                self.last_publish_time = time.time()
         except Exception as e:
             if self.node:
                 self.node.get_logger().error(f"Error in publish thread: {str(e)}")
 
 
 class CameraNode(Node):
-    def __init__(self):
+    def __init__(self, benchmark=False):
         # Initialize node
         super().__init__('coffee_camera_node')
         self.get_logger().info('Camera node is starting...')
@@ -621,6 +927,7 @@ class CameraNode(Node):
         self.current_camera_index = -1
         self.high_quality = False
         self.face_detection_enabled = True
+        self.camera_inventory = CameraInventory()
         
         # Declare ROS parameters for configuration
         self._declare_parameters()
@@ -635,7 +942,29 @@ class CameraNode(Node):
             'eye_range': self.eye_range,
             'eye_sensitivity': self.eye_sensitivity,
             'invert_x': self.invert_x,
-            'invert_y': self.invert_y
+            'invert_y': self.invert_y,
+            'frame_buffer_size': self.frame_buffer_size,
+            'face_tracking': self.face_tracking,
+            'face_roi_detection': self.face_roi_detection,
+            'face_full_sweep_interval': self.face_full_sweep_interval,
+            'face_image_refresh_interval': self.face_image_refresh_interval,
+            'face_image_min_improvement': self.face_image_min_improvement,
+            'publish_raw': self.publish_raw,
+            'publish_compressed': self.publish_compressed,
+            'jpeg_quality': self.jpeg_quality,
+            'preview_enabled': self.preview_enabled,
+            'preview_width': self.preview_width,
+            'preview_rate': self.preview_rate,
+            'preview_jpeg_quality': self.preview_jpeg_quality,
+            'overlay_mode': self.overlay_mode,
+            'shm_transport': self.shm_transport,
+            'shm_slots': self.shm_slots,
+            'pixel_format': self.pixel_format,
+            'gstreamer_pipeline': self.gstreamer_pipeline,
+            'face_detector': self.face_detector_name,
+            'dnn_backend': self.dnn_backend,
+            'dnn_target': self.dnn_target,
+            'dnn_threads': self.dnn_threads
         }
         self.frame_grabber = FrameGrabber(self, config)
         
@@ -644,6 +973,19 @@ class CameraNode(Node):
         
         # Initialize camera system
         self.scan_cameras()
+        
+        # Time the detector backends on live frames (--benchmark or detector_benchmark:=true)
+        if benchmark or self.detector_benchmark:
+            threading.Thread(
+                target=self.frame_grabber.run_detector_benchmark,
+                kwargs={'recall_floor': self.detector_recall_floor},
+                name="detector_benchmark",
+                daemon=True
+            ).start()
+        
+        # Watch for cameras being plugged in or removed
+        if self.camera_hotplug_interval > 0:
+            self.hotplug_timer = self.create_timer(self.camera_hotplug_interval, self._check_camera_hotplug)
     
     def _declare_parameters(self):
         """Declare ROS parameters with default values"""
@@ -654,6 +996,31 @@ class CameraNode(Node):
         self.declare_parameter('eye_sensitivity', 1.5)
         self.declare_parameter('invert_x', False)
         self.declare_parameter('invert_y', False)
+        self.declare_parameter('frame_buffer_size', 4)
+        self.declare_parameter('face_tracking', True)
+        self.declare_parameter('face_roi_detection', True)
+        self.declare_parameter('face_full_sweep_interval', 10)
+        self.declare_parameter('face_image_refresh_interval', 2.0)
+        self.declare_parameter('face_image_min_improvement', 5.0)
+        self.declare_parameter('publish_raw', True)
+        self.declare_parameter('publish_compressed', True)
+        self.declare_parameter('jpeg_quality', 80)
+        self.declare_parameter('preview_enabled', True)
+        self.declare_parameter('preview_width', 320)
+        self.declare_parameter('preview_rate', 5.0)
+        self.declare_parameter('preview_jpeg_quality', 70)
+        self.declare_parameter('overlay_mode', 'frame')
+        self.declare_parameter('shm_transport', True)
+        self.declare_parameter('shm_slots', 4)
+        self.declare_parameter('pixel_format', 'auto')
+        self.declare_parameter('gstreamer_pipeline', '')
+        self.declare_parameter('camera_hotplug_interval', 2.0)
+        self.declare_parameter('face_detector', 'ssd')
+        self.declare_parameter('dnn_backend', 'auto')
+        self.declare_parameter('dnn_target', 'auto')
+        self.declare_parameter('dnn_threads', 0)
+        self.declare_parameter('detector_benchmark', False)
+        self.declare_parameter('detector_recall_floor', 0.9)
         
     def _load_parameters(self):
         """Load parameter values from ROS parameter server"""
@@ -663,59 +1030,82 @@ class CameraNode(Node):
         self.eye_sensitivity = self.get_parameter('eye_sensitivity').value
         self.invert_x = self.get_parameter('invert_x').value
         self.invert_y = self.get_parameter('invert_y').value
+        self.frame_buffer_size = self.get_parameter('frame_buffer_size').value
+        self.face_tracking = self.get_parameter('face_tracking').value
+        self.face_roi_detection = self.get_parameter('face_roi_detection').value
+        self.face_full_sweep_interval = self.get_parameter('face_full_sweep_interval').value
+        self.face_image_refresh_interval = self.get_parameter('face_image_refresh_interval').value
+        self.face_image_min_improvement = self.get_parameter('face_image_min_improvement').value
+        self.publish_raw = self.get_parameter('publish_raw').value
+        self.publish_compressed = self.get_parameter('publish_compressed').value
+        self.jpeg_quality = self.get_parameter('jpeg_quality').value
+        self.preview_enabled = self.get_parameter('preview_enabled').value
+        self.preview_width = self.get_parameter('preview_width').value
+        self.preview_rate = self.get_parameter('preview_rate').value
+        self.preview_jpeg_quality = self.get_parameter('preview_jpeg_quality').value
+        self.shm_transport = self.get_parameter('shm_transport').value
+        self.shm_slots = self.get_parameter('shm_slots').value
+        self.pixel_format = self.get_parameter('pixel_format').value
+        self.gstreamer_pipeline = self.get_parameter('gstreamer_pipeline').value
+        self.camera_hotplug_interval = self.get_parameter('camera_hotplug_interval').value
+        self.face_detector_name = self.get_parameter('face_detector').value
+        self.dnn_backend = self.get_parameter('dnn_backend').value
+        self.dnn_target = self.get_parameter('dnn_target').value
+        self.dnn_threads = self.get_parameter('dnn_threads').value
+        self.detector_benchmark = self.get_parameter('detector_benchmark').value
+        self.detector_recall_floor = self.get_parameter('detector_recall_floor').value
+        self.overlay_mode = self.get_parameter('overlay_mode').value
+        if self.overlay_mode not in ('frame', 'metadata'):
+            self.get_logger().warn(f"Unknown overlay_mode '{self.overlay_mode}', using 'frame'")
+            self.overlay_mode = 'frame'
     
 
     def scan_cameras(self):
-        """Scan for available cameras"""
-        self.get_logger().info("Scanning for cameras...")
-        available_cameras = []
+        """
+        Scan for available cameras using the cached camera inventory.
         
-        # Stop current camera if running
-        if hasattr(self, 'frame_grabber'):
-            self.frame_grabber.stop()
-        
-        # Check for cameras using direct V4L2 access first
-        if os.path.exists('/dev'):
-            for i in range(10):
-                device_path = f"/dev/video{i}"
-                if os.path.exists(device_path) and os.access(device_path, os.R_OK):
-                    try:
-                        # Try to open the camera directly with V4L2
-                        cap = cv2.VideoCapture(i, cv2.CAP_V4L2)
-                        if cap.isOpened():
-                            # It's a valid camera
-                            camera_name = f"Camera {i} ({device_path})"
-                            available_cameras.append((i, camera_name))
-                            cap.release()
-                        else:
-                            self.get_logger().info(f"Device {device_path} exists but couldn't be opened as a camera")
-                    except Exception as e:
-                        self.get_logger().warn(f"Error checking {device_path}: {e}")
-        
-        # Fallback to generic scanning
-        if not available_cameras:
-            self.get_logger().info("Direct scan failed, trying generic approach...")
-            for i in range(2):  # Only try the first two indices to avoid lengthy timeouts
-                try:
-                    cap = cv2.VideoCapture(i)
-                    if cap.isOpened():
-                        camera_name = f"Camera {i}"
-                        available_cameras.append((i, camera_name))
-                        cap.release()
-                except Exception as e:
-                    self.get_logger().warn(f"Error scanning camera {i}: {e}")
+        Devices are listed from sysfs and probed in parallel without opening
+        a stream, so the running camera keeps streaming during the scan. The
+        current camera is kept if it is still present; otherwise the first
+        available camera is started.
+        """
+        self.get_logger().info("Scanning for cameras...")
+        scan_start = time.time()
+        try:
+            devices = self.camera_inventory.get_cameras(refresh=True)
+        except Exception as e:
+            self.get_logger().error(f"Camera scan failed: {e}")
+            devices = []
         
         # Store for state queries
-        self.available_cameras = available_cameras
+        self.available_cameras = [(device.index, device.label) for device in devices]
+        self.get_logger().info(f"Found {len(devices)} camera(s) in {(time.time() - scan_start) * 1000:.0f} ms")
         
-        if not available_cameras:
+        if not self.available_cameras:
             self.get_logger().error("No cameras found!")
+            if self.current_camera_index >= 0:
+                self.frame_grabber.stop()
+                self.current_camera_index = -1
             return
-            
+        
+        available_indices = [idx for idx, _ in self.available_cameras]
+        if self.current_camera_index in available_indices and self.frame_grabber.running:
+            return
+        
         # Start the first available camera
-        if available_cameras:
-            first_camera_index = available_cameras[0][0]
-            self.change_camera(first_camera_index)
+        self.change_camera(available_indices[0])
+    
+    def _check_camera_hotplug(self):
+        """Rescan cameras when video devices were added or removed"""
+        if not self.camera_inventory.changed():
+            return
+        self.get_logger().info("Video devices changed, rescanning cameras")
+        self.scan_cameras()
+        self._publish_state()
+        
+        status_msg = String()
+        status_msg.data = f"Camera list changed: {len(self.available_cameras)} camera(s) available"
+        self.camera_status_pub.publish(status_msg)
     
     def change_camera(self, camera_index):
         """Change to a different camera"""
@@ -868,16 +1258,44 @@ class CameraNode(Node):
             info += f"Frame Grabber Running: {self.frame_grabber.running}\n"
             info += f"Current Camera Index: {getattr(self.frame_grabber, 'camera_index', 'Unknown')}\n"
             info += f"Frame Dimensions: {getattr(self.frame_grabber, 'frame_width', 'Unknown')}x{getattr(self.frame_grabber, 'frame_height', 'Unknown')}\n"
-            info += f"Face Detection: {'Enabled' if getattr(self.frame_grabber, 'enable_face_detection', False) else 'Disabled'}\n\n"
+            info += f"Face Detection: {'Enabled' if getattr(self.frame_grabber, 'enable_face_detection', False) else 'Disabled'}\n"
+            detector = self.frame_grabber.face_detector.detector
+            info += f"Face Detector: {detector.describe() if detector else 'not initialized'}\n"
+            capture_report = self.frame_grabber.capture_report
+            if capture_report.get('achieved'):
+                info += f"Capture: {format_capture_report(capture_report)}\n"
+            elif capture_report:
+                info += f"Capture: {capture_report['backend']} {capture_report['pixel_format']} (measuring rate)\n"
+            info += f"Overlay Mode: {self.frame_grabber.overlay_mode} (processing {self.frame_grabber.processing_fps:.1f} FPS)\n\n"
+            
+            # Frame ring statistics
+            ring_stats = self.frame_grabber.frame_ring.get_stats()
+            info += f"Frame Buffer: {ring_stats['capacity']} slots, {ring_stats['frames_written']} frames captured\n"
+            for name, stats in ring_stats['consumers'].items():
+                info += f"  - {name}: read {stats['read']}, dropped {stats['dropped']}, duplicated {stats['duplicated']}\n"
+            
+            # Compressed and preview stream statistics
+            stream_stats = self.frame_grabber.frame_encoder.get_stats()
+            info += (f"Frame Streams: {stream_stats['compressed_published']} compressed "
+                     f"({stream_stats['compressed_bytes'] / 1024:.0f} KB), "
+                     f"{stream_stats['preview_published']} preview "
+                     f"({stream_stats['preview_bytes'] / 1024:.0f} KB), "
+                     f"{stream_stats['dropped']} dropped, "
+                     f"encode {stream_stats['avg_encode_time'] * 1000:.1f} ms\n")
+            info += "\n"
         
         # ROS Topics
         info += "Active ROS Publishers:\n"
-        info += "- /coffee_bot/camera/image_raw (camera frames)\n"
+        info += "- /coffee_bot/camera/image_raw (camera frames, only when subscribed)\n"
+        info += "- /coffee_bot/camera/image_raw/compressed (JPEG camera frames)\n"
+        info += "- /coffee_bot/camera/preview/compressed (downscaled JPEG preview)\n"
+        info += "- /coffee_bot/camera/image_shm (shared-memory frame index, same-host readers)\n"
         info += "- /coffee_bot/camera/status/info (status updates)\n"
         info += "- /coffee_bot/camera/status/available (camera list)\n"
         info += "- /coffee_bot/camera/status/diagnostics (this message)\n"
         info += "- /vision/face_position (face tracking)\n"
-        info += "- face_detection_data (face data)\n\n"
+        info += "- face_detection_data (face data)\n"
+        info += "- face_crops (face crops with their face box, for recognition)\n\n"
         
         info += "Active ROS Subscribers:\n"
         info += "- /coffee_bot/camera/cmd/select (camera selection)\n"
@@ -889,7 +1307,9 @@ class CameraNode(Node):
         
         # Available cameras
         camera_count = len(self.available_cameras)
-        info += f"Available Cameras: {camera_count}\n"
+        inventory_stats = self.camera_inventory.get_stats()
+        info += (f"Available Cameras: {camera_count} (inventory: {inventory_stats['scans']} scans, "
+                 f"{inventory_stats['probes']} probes, {inventory_stats['cache_hits']} cache hits)\n")
         for idx, name in self.available_cameras:
             info += f"  - {name} (index: {idx})\n"
         
@@ -898,12 +1318,16 @@ class CameraNode(Node):
     def _on_state_query(self, msg):
         """Handle state query from separated UI and respond with current camera state"""
         self.get_logger().info('Received state query from separated UI')
-        
+        self._publish_state()
+    
+    def _publish_state(self):
+        """Publish the current camera state as JSON on the available cameras topic"""
         # Gather current state directly from CameraNode
         current_state = {
             'camera_index': self.current_camera_index,
             'high_quality': self.high_quality,
             'face_detection_enabled': self.face_detection_enabled,
+            'overlay_mode': self.overlay_mode,
             'available_cameras': [
                 {"index": idx, "name": name} 
                 for idx, name in self.available_cameras
@@ -928,6 +1352,7 @@ class CameraNode(Node):
         if hasattr(self, 'frame_grabber'):
             try:
                 self.frame_grabber.stop()
+                self.frame_grabber.shm_writer.close()
                 self.get_logger().info('Frame grabber stopped')
             except Exception as e:
                 self.get_logger().error(f'Error stopping frame grabber: {e}')
@@ -941,8 +1366,11 @@ def main(args=None):
         # Initialize ROS2
         rclpy.init(args=args)
         
+        # --benchmark times the face detector backends at startup
+        cli_args = rclpy.utilities.remove_ros_args(args if args is not None else sys.argv)
+        
         # Create and run the node
-        node = CameraNode()
+        node = CameraNode(benchmark='--benchmark' in cli_args)
         
         # Standard ROS spinning
         try:
@@ -8,17 +8,22 @@ import numpy as np
 import threading
 import os
 import subprocess
-import json
 import collections
 from rclpy.node import Node
 from python_qt_binding.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QLabel, QPushButton, QComboBox, QHBoxLayout, QCheckBox, QMessageBox
 from python_qt_binding.QtGui import QImage, QPixmap
 from python_qt_binding.QtCore import Qt, QTimer, pyqtSignal, QObject
-from std_msgs.msg import Float32MultiArray, String
-from sensor_msgs.msg import Image
+from std_msgs.msg import Float32MultiArray
+from sensor_msgs.msg import Image, CompressedImage
 from geometry_msgs.msg import Point
+from coffee_vision_msgs.msg import FaceArray
 from cv_bridge import CvBridge
 
+from .data_types import build_face_array
+from .face_quality import score_face_crops, FaceCropGate
+from .frame_streams import FrameStreamEncoder, STREAM_COMPRESSED
+from .camera_inventory import CameraInventory
+
 # Models directory for face detection models
 MODELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
 os.makedirs(MODELS_DIR, exist_ok=True)
@@ -105,12 +110,24 @@ class FrameGrabber(QObject):
 
         # ROS publishers for face data and images
         if self.node:
-            self.face_pub = node.create_publisher(String, 'face_detection_data', 10)
+            self.face_pub = node.create_publisher(FaceArray, 'face_detection_data', 10)
             self.face_position_pub = node.create_publisher(Point, '/vision/face_position', 10)
-            self.face_position_pub_v2 = node.create_publisher(String, '/vision/face_position_v2', 10)
+            self.face_position_pub_v2 = node.create_publisher(FaceArray, '/vision/face_position_v2', 10)
             self.frame_pub = node.create_publisher(Image, '/coffee_bot/camera/image_raw', 10)
+            self.compressed_frame_pub = node.create_publisher(
+                CompressedImage, '/coffee_bot/camera/image_raw/compressed', 10)
+            self.preview_pub = node.create_publisher(CompressedImage, '/coffee_bot/camera/preview/compressed', 10)
             self.face_image_pub = node.create_publisher(Image, 'face_images', 10)
             self.bridge = CvBridge()
+
+        # Frame streams: raw frames only when subscribed, JPEG and preview encoded off the publish thread
+        self.publish_raw = True
+        self.publish_compressed = True
+        self.preview_enabled = True
+        self.frame_encoder = FrameStreamEncoder(self._publish_encoded_frame)
+        
+        # Only publish face crops that improve on their track's best (or are due a refresh)
+        self.face_crop_gate = FaceCropGate()
             
         # Face recognition data
         self.face_ids = {}  # Map of face index to recognized face ID
@@ -119,73 +136,27 @@ class FrameGrabber(QObject):
         
         self.init_face_detector()
      
-    def publish_face_data(self, faces):
+    def build_face_message(self, faces):
+        """Build a FaceArray message for the latest processed frame"""
+        return build_face_array(
+            faces,
+            self.frame_width,
+            self.frame_height,
+            stamp=self.node.get_clock().now().to_msg()
+        )
+
+    def publish_face_data(self, face_msg):
         """Publish face detection data for other nodes"""
         if not self.node:
             return
-        
-        # Ensure faces is at least an empty list
-        faces = faces if faces else []
-            
-        # Create JSON with face data - convert NumPy types to Python native types
-        face_data = {
-            "timestamp": float(time.time()),
-            "frame_width": int(self.frame_width),
-            "frame_height": int(self.frame_height),
-            "faces": [
-                {
-                    "x1": int(face["x1"]),
-                    "y1": int(face["y1"]),
-                    "x2": int(face["x2"]),
-                    "y2": int(face["y2"]),
-                    "center_x": int(face["center_x"]),
-                    "center_y": int(face["center_y"]),
-                    "confidence": float(face["confidence"]),
-                    "id": str(face.get("id", "Unknown"))
-                }
-                for face in faces
-            ]
-        }
-        
-        # Publish
-        msg = String()
-        msg.data = json.dumps(face_data)
-        self.face_pub.publish(msg)
+        self.face_pub.publish(face_msg)
 
-    def publish_face_position_v2(self, faces):
-        """Publish face detection data for other nodes"""
+    def publish_face_position_v2(self, face_msg):
+        """Publish face positions for the expression state manager"""
         if not self.node:
             return
-            
-        # Ensure faces is at least an empty list
-        faces = faces if faces else []
-            
-        # Create JSON with face data - convert NumPy types to Python native types
-        face_data = {
-            "timestamp": float(time.time()),
-            "frame_width": int(self.frame_width),
-            "frame_height": int(self.frame_height),
-            "faces": [
-                {
-                    "x1": int(face["x1"]),
-                    "y1": int(face["y1"]),
-                    "x2": int(face["x2"]),
-                    "y2": int(face["y2"]),
-                    "center_x": int(face["center_x"]),
-                    "center_y": int(face["center_y"]),
-                    "confidence": float(face["confidence"]),
-                    "id": str(face.get("id", "Unknown"))
-                }
-                for face in faces
-            ]
-        }
-        
-        # Publish
-        msg = String()
-        msg.data = json.dumps(face_data)
-        self.face_position_pub_v2.publish(msg)
+        self.face_position_pub_v2.publish(face_msg)
 
-        
     def publish_face_position(self, faces):
         """Process incoming face detection data"""
 
@@ -248,44 +219,55 @@ class FrameGrabber(QObject):
             self.node.get_logger().error(f"Error processing face position data: {e}")
 
     def publish_face_images(self, frame, faces):
-        """Extract and publish individual face images"""
+        """Extract and publish face images that beat their track's best crop (or are due a refresh)"""
         if not self.node:
             return
             
         try:
+            margin = 0.2  # 20%
+            h, w = frame.shape[:2]
+            crops = []
+            candidates = []  # (track ID, box) per crop
+            
             for i, face in enumerate(faces):
-                # Extract face with margin
-                margin = 0.2  # 20%
-                
                 # Get dimensions
                 x1, y1 = face['x1'], face['y1']
                 x2, y2 = face['x2'], face['y2']
-                h, w = frame.shape[:2]
                 
                 # Calculate margin
                 margin_x = int((x2 - x1) * margin)
                 margin_y = int((y2 - y1) * margin)
                 
-                # Apply margin
-                x1_margin = max(0, x1 - margin_x)
-                y1_margin = max(0, y1 - margin_y)
-                x2_margin = min(w, x2 + margin_x)
-                y2_margin = min(h, y2 + margin_y)
-                
-                # Extract face
-                face_img = frame[y1_margin:y2_margin, x1_margin:x2_margin]
+                # Extract face with margin
+                face_img = frame[max(0, y1 - margin_y):min(h, y2 + margin_y),
+                                 max(0, x1 - margin_x):min(w, x2 + margin_x)]
                 
                 # Skip if too small
                 if face_img.size == 0 or face_img.shape[0] < 30 or face_img.shape[1] < 30:
                     continue
-                    
+                
+                crops.append(face_img)
+                candidates.append((face.get('track_id', i), (x1, y1, x2, y2)))
+            
+            if not crops:
+                return
+            
+            # Score all crops in one batch and only publish those that improve on their track
+            qualities = score_face_crops(crops, [box for _, box in candidates])
+            selected = self.face_crop_gate.select([track_id for track_id, _ in candidates], qualities)
+            
+            stamp = self.node.get_clock().now().to_msg()
+            for face_img, (track_id, _), publish in zip(crops, candidates, selected):
+                if not publish:
+                    continue
+                
                 # Resize
                 face_img = cv2.resize(face_img, (150, 150))
                 
                 # Publish
                 face_msg = self.bridge.cv2_to_imgmsg(face_img, encoding="bgr8")
-                face_msg.header.stamp = self.node.get_clock().now().to_msg()
-                face_msg.header.frame_id = f"face_{i}"
+                face_msg.header.stamp = stamp
+                face_msg.header.frame_id = f"face_{track_id}"  # Track ID keys recognition
                 self.face_image_pub.publish(face_msg)
                 
         except Exception as e:
@@ -328,18 +310,42 @@ class FrameGrabber(QObject):
         return (eye_x, eye_y)
 
     def publish_frame(self, frame):
-        """Publish camera frame to ROS topics"""
+        """
+        Publish camera frame to ROS topics.
+
+        The raw frame is only converted and published when the raw topic has
+        subscribers. The compressed and preview streams are handed to the
+        frame encoder, which encodes them on its own thread.
+        """
         if not self.node:
             return
             
         try:
-            frame_msg = self.bridge.cv2_to_imgmsg(frame, encoding="bgr8")
-            frame_msg.header.stamp = self.node.get_clock().now().to_msg()
-            self.frame_pub.publish(frame_msg)
+            stamp = self.node.get_clock().now().to_msg()
+            if self.publish_raw and self.frame_pub.get_subscription_count() > 0:
+                frame_msg = self.bridge.cv2_to_imgmsg(frame, encoding="bgr8")
+                frame_msg.header.stamp = stamp
+                self.frame_pub.publish(frame_msg)
+            
+            compressed = self.publish_compressed and self.compressed_frame_pub.get_subscription_count() > 0
+            preview = self.preview_enabled and self.preview_pub.get_subscription_count() > 0
+            if compressed or preview:
+                self.frame_encoder.submit(frame, stamp, compressed=compressed, preview=preview)
         except Exception as e:
             if self.node:
                 self.node.get_logger().error(f"Error publishing frame: {e}")
     
+    def _publish_encoded_frame(self, stream, data, stamp):
+        """Publish a JPEG frame from the frame encoder thread"""
+        msg = CompressedImage()
+        msg.header.stamp = stamp
+        msg.format = 'jpeg'
+        msg.data = data
+        if stream == STREAM_COMPRESSED:
+            self.compressed_frame_pub.publish(msg)
+        else:
+            self.preview_pub.publish(msg)
+    
     def init_face_detector(self):
         """Initialize the OpenCV DNN face detector"""
         try:
@@ -408,6 +414,7 @@ class FrameGrabber(QObject):
                 self.publish_thread = threading.Thread(target=self._publish_loop)
                 self.publish_thread.daemon = True
                 self.publish_thread.start()
+                self.frame_encoder.start()
     
     def stop(self):
         """Stop the frame grabber threads"""
@@ -427,6 +434,9 @@ class FrameGrabber(QObject):
         if self.publish_thread and self.publish_thread.is_alive():
             self.publish_thread.join()
         
+        # Stop the frame stream encoder after the publish thread that feeds it
+        self.frame_encoder.stop()
+        
         # Release camera if it's open
         if self.camera and self.camera.isOpened():
             self.camera.release()
@@ -855,8 +865,9 @@ class FrameGrabber(QObject):
                         # This is used so that we can re-center the eyes -- zero them in.
                         # self.publish_face_position(faces)
                         # Always publish face data, even when no faces are detected
-                        self.publish_face_position_v2(faces)
-                        self.publish_face_data(faces)
+                        face_msg = self.build_face_message(faces)
+                        self.publish_face_position_v2(face_msg)
+                        self.publish_face_data(face_msg)
                         # Only publish face images when faces are actually detected
                         if faces:
                             self.publish_face_images(frame, faces)
@@ -874,10 +885,16 @@ class CameraViewer(QMainWindow):
         self.frame_grabber.error.connect(self.handle_camera_error)
         self.high_quality = False
         self.face_detection_enabled = True
+        self.camera_inventory = CameraInventory()
         self.initUI()
         self.check_video_devices()
         self.scan_cameras()
         
+        # Watch for cameras being plugged in or removed
+        self.hotplug_timer = QTimer(self)
+        self.hotplug_timer.timeout.connect(self._check_camera_hotplug)
+        self.hotplug_timer.start(2000)
+        
     def initUI(self):
         self.setWindowTitle('Coffee Camera - Webcam Viewer')
         self.setGeometry(100, 100, 800, 600)
@@ -1022,60 +1039,47 @@ class CameraViewer(QMainWindow):
         QMessageBox.information(self, "Camera Diagnostics", info)
     
     def scan_cameras(self):
-        """Scan for available cameras"""
-        self.camera_combo.clear()
-        
-        # Stop current camera if running
-        self.frame_grabber.stop()
+        """
+        Scan for available cameras using the cached camera inventory.
         
-        # Check for cameras using direct V4L2 access first
+        The scan does not open streams, so the running camera keeps
+        streaming; it is only restarted if it is no longer present.
+        """
         self.node.get_logger().info("Scanning for cameras...")
-        available_cameras = []
-        
-        # In Linux, we can check directly which devices are video capture devices
-        if os.path.exists('/dev'):
-            for i in range(10):
-                device_path = f"/dev/video{i}"
-                if os.path.exists(device_path) and os.access(device_path, os.R_OK):
-                    try:
-                        # Try to open the camera directly with V4L2
-                        cap = cv2.VideoCapture(i, cv2.CAP_V4L2)
-                        if cap.isOpened():
-                            # It's a valid camera
-                            camera_name = f"Camera {i} ({device_path})"
-                            available_cameras.append((i, camera_name))
-                            cap.release()
-                        else:
-                            self.node.get_logger().info(f"Device {device_path} exists but couldn't be opened as a camera")
-                    except Exception as e:
-                        self.node.get_logger().warn(f"Error checking {device_path}: {e}")
+        try:
+            devices = self.camera_inventory.get_cameras(refresh=True)
+        except Exception as e:
+            self.node.get_logger().error(f"Camera scan failed: {e}")
+            devices = []
+        available_cameras = [(device.index, device.label) for device in devices]
         
-        # Fallback to generic scanning
-        if not available_cameras:
-            self.node.get_logger().info("Direct scan failed, trying generic approach...")
-            for i in range(2):  # Only try the first two indices to avoid lengthy timeouts
-                try:
-                    cap = cv2.VideoCapture(i)
-                    if cap.isOpened():
-                        camera_name = f"Camera {i}"
-                        available_cameras.append((i, camera_name))
-                        cap.release()
-                except Exception as e:
-                    self.node.get_logger().warn(f"Error scanning camera {i}: {e}")
+        current_index = self.frame_grabber.camera_index if self.frame_grabber.running else None
         
-        # Add available cameras to combo box
+        # Refill the combo box without triggering camera changes
+        self.camera_combo.blockSignals(True)
+        self.camera_combo.clear()
         for idx, name in available_cameras:
             self.camera_combo.addItem(name, idx)
+        current_row = self.camera_combo.findData(current_index) if current_index is not None else -1
+        self.camera_combo.setCurrentIndex(max(current_row, 0) if available_cameras else -1)
+        self.camera_combo.blockSignals(False)
             
         if not available_cameras:
             self.node.get_logger().error("No cameras found!")
+            self.frame_grabber.stop()
             self.image_label.setText("No cameras found! Check connections and permissions.")
             return
             
-        # If any camera is available, start the first one
-        if self.camera_combo.count() > 0:
+        # Start the first camera unless the current one is still available
+        if current_row < 0:
             self.change_camera(self.camera_combo.currentIndex())
     
+    def _check_camera_hotplug(self):
+        """Rescan cameras when video devices were added or removed"""
+        if self.camera_inventory.changed():
+            self.node.get_logger().info("Video devices changed, rescanning cameras")
+            self.scan_cameras()
+    
     def change_camera(self, index):
         """Change to a different camera"""
         if index >= 0:
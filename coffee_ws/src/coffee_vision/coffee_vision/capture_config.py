@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+
+"""
+Capture format negotiation for the camera node.
+
+Many USB cameras fall back to uncompressed YUYV when no pixel format is
+requested, and YUYV over USB 2.0 cannot carry 720p at more than a few
+frames per second. These helpers request a FOURCC explicitly (MJPG first,
+YUYV as the fallback), build GStreamer pipelines from user templates (so
+decoding and scaling can run in the pipeline, e.g. on a hardware JPEG
+decoder), and produce a report of the requested vs achieved capture format.
+"""
+
+import time
+import collections
+from typing import Dict, Optional
+
+import cv2
+
+# Pixel formats tried in 'auto' mode, best first
+AUTO_PIXEL_FORMATS = ('MJPG', 'YUYV')
+
+# Built-in pipeline for gstreamer_pipeline='mjpeg': MJPEG from the camera,
+# decoded in GStreamer and delivered as BGR with a single-buffer appsink
+MJPEG_PIPELINE = (
+    "v4l2src device={device} io-mode=2 ! "
+    "image/jpeg,width={width},height={height},framerate={fps}/1 ! "
+    "jpegdec ! videoconvert ! video/x-raw,format=BGR ! "
+    "appsink drop=true max-buffers=1 sync=false"
+)
+
+PIPELINE_PRESETS = {
+    'mjpeg': MJPEG_PIPELINE
+}
+
+
+def fourcc_to_str(value: float) -> str:
+    """Decode a CAP_PROP_FOURCC value into its four-character code"""
+    code = int(value)
+    if code <= 0:
+        return "unknown"
+    chars = ''.join(chr((code >> (8 * i)) & 0xFF) for i in range(4))
+    return chars if chars.isprintable() else f"0x{code:08x}"
+
+
+def build_gstreamer_pipeline(template: str, camera_index: int, width: int, height: int, fps: int) -> str:
+    """
+    Build a GStreamer pipeline string from a template or preset name.
+
+    The template may use {device}, {index}, {width}, {height} and {fps}.
+    If its appsink does not limit buffering, drop=true max-buffers=1 is
+    added so OpenCV always reads the newest frame.
+
+    Args:
+        template: Pipeline template, or a preset name (e.g. 'mjpeg')
+        camera_index: Camera index (device is /dev/video<index>)
+        width: Requested frame width
+        height: Requested frame height
+        fps: Requested frame rate
+
+    Returns:
+        Pipeline string for cv2.VideoCapture(..., cv2.CAP_GSTREAMER)
+    """
+    template = PIPELINE_PRESETS.get(template.strip().lower(), template)
+    pipeline = template.format(
+        device=f"/dev/video{camera_index}",
+        index=camera_index,
+        width=int(width),
+        height=int(height),
+        fps=int(round(fps))
+    ).strip()
+
+    if 'appsink' not in pipeline:
+        pipeline += " ! videoconvert ! video/x-raw,format=BGR ! appsink drop=true max-buffers=1 sync=false"
+    elif 'max-buffers' not in pipeline:
+        pipeline = pipeline.replace('appsink', 'appsink drop=true max-buffers=1', 1)
+    return pipeline
+
+
+def negotiate_format(capture, pixel_format: str, width: int, height: int, fps: float,
+                     extra_props: Optional[Dict[int, float]] = None) -> str:
+    """
+    Request a pixel format, frame size and rate from an opened V4L2 capture.
+
+    V4L2 applies settings in order, so the FOURCC is set before the frame
+    size and the frame rate last. In 'auto' mode MJPG is tried first and
+    YUYV is used if the camera does not accept it.
+
+    Args:
+        capture: Opened cv2.VideoCapture
+        pixel_format: 'auto', a FOURCC such as 'MJPG' or 'YUYV', or 'any'
+            to leave the format to the driver
+        width: Requested frame width
+        height: Requested frame height
+        fps: Requested frame rate
+        extra_props: Other capture properties to set afterwards
+
+    Returns:
+        The FOURCC the capture reports after negotiation
+    """
+    pixel_format = (pixel_format or 'auto').strip().upper()
+    if pixel_format == 'ANY':
+        candidates = ()
+    elif pixel_format == 'AUTO':
+        candidates = AUTO_PIXEL_FORMATS
+    else:
+        candidates = (pixel_format,)
+
+    for candidate in candidates:
+        try:
+            capture.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*candidate[:4].ljust(4)))
+        except Exception:
+            continue
+        if fourcc_to_str(capture.get(cv2.CAP_PROP_FOURCC)) == candidate[:4].ljust(4):
+            break
+
+    for prop, value in ((cv2.CAP_PROP_FRAME_WIDTH, width), (cv2.CAP_PROP_FRAME_HEIGHT, height),
+                        (cv2.CAP_PROP_FPS, fps)):
+        try:
+            capture.set(prop, value)
+        except Exception:
+            pass  # Skip unsupported properties
+    for prop, value in (extra_props or {}).items():
+        try:
+            capture.set(prop, value)
+        except Exception:
+            pass
+
+    return fourcc_to_str(capture.get(cv2.CAP_PROP_FOURCC))
+
+
+class CaptureRateMeter:
+    """
+    Measures the achieved capture rate from frame read times.
+
+    Features:
+    - Sliding window of read timestamps (no extra reads)
+    - One-shot report once enough frames were read after a (re)configuration
+    """
+
+    def __init__(self, window: int = 60):
+        """
+        Initialize the meter.
+
+        Args:
+            window: Number of frames the achieved rate is measured over
+        """
+        self.window = max(2, window)
+        self._times = collections.deque(maxlen=self.window)
+        self._report_due = False
+
+    def reset(self):
+        """Start a new measurement (e.g. after the capture format changed)"""
+        self._times.clear()
+        self._report_due = True
+
+    def tick(self, timestamp: Optional[float] = None) -> bool:
+        """
+        Record a frame read.
+
+        Returns:
+            True once per reset() when a full window has been measured
+        """
+        self._times.append(time.time() if timestamp is None else timestamp)
+        if self._report_due and len(self._times) == self.window:
+            self._report_due = False
+            return True
+        return False
+
+    @property
+    def fps(self) -> float:
+        """Achieved frames per second over the window"""
+        if len(self._times) < 2:
+            return 0.0
+        elapsed = self._times[-1] - self._times[0]
+        return (len(self._times) - 1) / elapsed if elapsed > 0 else 0.0
+
+
+def format_capture_report(report: Dict) -> str:
+    """Format a capture report as a one-line summary"""
+    requested = report.get('requested', {})
+    achieved = report.get('achieved', {})
+    return (
+        f"{report.get('backend', '?')} {report.get('pixel_format', '?')}: "
+        f"requested {requested.get('width')}x{requested.get('height')} @ {requested.get('fps', 0):.0f} FPS, "
+        f"got {achieved.get('width')}x{achieved.get('height')} @ {achieved.get('fps', 0):.1f} FPS "
+        f"(driver reports {report.get('reported_fps', 0):.1f})"
+    )
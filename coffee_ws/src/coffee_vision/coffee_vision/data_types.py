@@ -4,6 +4,8 @@ import json
 from dataclasses import dataclass, asdict
 from typing import List, Dict, Any, Tuple, Optional
 
+from coffee_vision_msgs.msg import FaceArray, FaceDetection
+
 
 @dataclass
 class FaceData:
@@ -29,6 +31,19 @@ class FaceData:
             confidence=data['confidence']
         )
 
+    @classmethod
+    def from_msg(cls, msg: FaceDetection) -> 'FaceData':
+        """Create FaceData from a FaceDetection message"""
+        return cls(
+            x1=msg.x1,
+            y1=msg.y1,
+            x2=msg.x2,
+            y2=msg.y2,
+            center_x=msg.center_x,
+            center_y=msg.center_y,
+            confidence=msg.confidence
+        )
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary representation"""
         return asdict(self)
@@ -54,4 +69,43 @@ class VelocityVector:
     """Representation of a 2D velocity vector"""
     x: float
     y: float
-    magnitude: float 
\ No newline at end of file
+    magnitude: float 
+
+
+def build_face_array(faces: List[Dict[str, Any]], frame_width: int, frame_height: int,
+                     stamp=None, frame_id: str = 'camera') -> FaceArray:
+    """
+    Build a FaceArray message from detector face dictionaries.
+
+    Args:
+        faces: Face dictionaries as produced by FaceDetector
+        frame_width: Width of the frame the coordinates refer to
+        frame_height: Height of the frame the coordinates refer to
+        stamp: Capture time of the frame (builtin_interfaces/Time)
+        frame_id: Header frame ID
+
+    Returns:
+        Populated FaceArray message
+    """
+    msg = FaceArray()
+    if stamp is not None:
+        msg.header.stamp = stamp
+    msg.header.frame_id = frame_id
+    msg.frame_width = int(frame_width)
+    msg.frame_height = int(frame_height)
+
+    for face in faces or []:
+        detection = FaceDetection()
+        detection.x1 = int(face['x1'])
+        detection.y1 = int(face['y1'])
+        detection.x2 = int(face['x2'])
+        detection.y2 = int(face['y2'])
+        detection.center_x = int(face['center_x'])
+        detection.center_y = int(face['center_y'])
+        detection.confidence = float(face['confidence'])
+        detection.track_id = int(face.get('track_id', 0))
+        identity = face.get('id', 'Unknown')
+        detection.identity = '' if identity in (None, 'Unknown') else str(identity)
+        msg.faces.append(detection)
+
+    return msg
@@ -3,28 +3,305 @@
 """
 Face detection module for coffee vision system.
 
-This module provides face detection capabilities using OpenCV's DNN-based
-face detector with temporal smoothing and visualization features.
+This module provides face detection capabilities using a pluggable detector
+backend (see face_detectors) with temporal smoothing and visualization
+features. Between detections, an optional optical-flow tracker propagates
+face boxes on every captured frame.
 """
 
 import cv2
 import numpy as np
 import os
-import urllib.request
 import time
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
+
+from .face_detectors import create_detector
+
+# Prefer SciPy's assignment solver, fall back to the NumPy implementation below
+try:
+    from scipy.optimize import linear_sum_assignment as _scipy_linear_sum_assignment
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+
+def linear_sum_assignment(cost: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Solve the rectangular linear assignment problem (minimum total cost).
+    
+    Uses SciPy when available, otherwise a shortest-augmenting-path Hungarian
+    algorithm vectorized over columns with NumPy. Face counts are small
+    (typically < 20), so the O(n^2 m) fallback is cheap.
+    
+    Args:
+        cost: Cost matrix of shape (n, m)
+        
+    Returns:
+        Tuple of (row_indices, col_indices) of the optimal assignment,
+        sorted by row index
+    """
+    cost = np.asarray(cost, dtype=np.float64)
+    if cost.size == 0:
+        return np.empty(0, dtype=int), np.empty(0, dtype=int)
+    if SCIPY_AVAILABLE:
+        return _scipy_linear_sum_assignment(cost)
+    
+    # The algorithm below needs rows <= columns
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+    n, m = cost.shape
+    
+    # Potentials and matching (1-based, column 0 is a virtual start column)
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype=int)  # p[j] = row matched to column j
+    way = np.zeros(m + 1, dtype=int)
+    
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        
+        # Grow an alternating tree until a free column is reached
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            free = ~used
+            free[0] = False
+            
+            reduced = cost[i0 - 1] - u[i0] - v[1:]
+            improve = free[1:] & (reduced < minv[1:])
+            minv[1:][improve] = reduced[improve]
+            way[1:][improve] = j0
+            
+            candidates = np.where(free[1:], minv[1:], np.inf)
+            j1 = int(np.argmin(candidates)) + 1
+            delta = candidates[j1 - 1]
+            
+            u[p[used]] += delta
+            v[used] -= delta
+            minv[free] -= delta
+            
+            j0 = j1
+            if p[j0] == 0:
+                break
+        
+        # Augment along the path back to the virtual column
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+    
+    assigned = np.nonzero(p[1:])[0]
+    rows = p[1:][assigned] - 1
+    cols = assigned
+    if transposed:
+        rows, cols = cols, rows
+    order = np.argsort(rows)
+    return rows[order], cols[order]
+
+
+class FaceTracker:
+    """
+    Lucas-Kanade optical flow tracker for face boxes.
+    
+    DNN detections seed a sparse set of corner features inside each face box.
+    On every subsequent frame the features are tracked with pyramidal optical
+    flow and each box is moved by the median feature displacement and scaled
+    by the median change in feature spread.
+    """
+    
+    def __init__(
+        self,
+        max_points_per_face: int = 30,
+        min_points: int = 5,
+        max_track_age: float = 1.0
+    ):
+        """
+        Initialize the face tracker.
+        
+        Args:
+            max_points_per_face: Maximum number of features tracked per face
+            min_points: Minimum surviving features to keep updating a face
+            max_track_age: Seconds after the last seed before tracks expire
+        """
+        self.max_points_per_face = max_points_per_face
+        self.min_points = min_points
+        self.max_track_age = max_track_age
+        
+        # Optical flow parameters
+        self.lk_params = dict(
+            winSize=(15, 15),
+            maxLevel=2,
+            criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03)
+        )
+        
+        # Tracking state
+        self.prev_gray = None
+        self.tracks = []  # list of {'face': dict, 'box': [cx, cy, w, h], 'points': ndarray}
+        self.last_seed_time = 0
+    
+    def seed(self, frame: np.ndarray, faces: List[Dict]):
+        """
+        Re-seed tracks from a fresh set of detections.
+        
+        Args:
+            frame: Frame the detections were made on (BGR format)
+            faces: List of face dictionaries from the detector
+        """
+        gray = self._to_gray(frame)
+        self.tracks = []
+        
+        for face in faces:
+            x1, y1, x2, y2 = face['x1'], face['y1'], face['x2'], face['y2']
+            w, h = x2 - x1, y2 - y1
+            if w <= 0 or h <= 0:
+                continue
+            
+            self.tracks.append({
+                'face': dict(face),
+                'box': [(x1 + x2) / 2.0, (y1 + y2) / 2.0, float(w), float(h)],
+                'points': self._find_points(gray, x1, y1, x2, y2)
+            })
+        
+        self.prev_gray = gray
+        self.last_seed_time = time.time()
+    
+    def update(self, frame: np.ndarray) -> List[Dict]:
+        """
+        Propagate all tracked faces to a new frame.
+        
+        Args:
+            frame: New input frame (BGR format)
+            
+        Returns:
+            List of face dictionaries at their tracked positions
+        """
+        if self.prev_gray is None or not self.tracks:
+            return []
+        
+        if time.time() - self.last_seed_time > self.max_track_age:
+            self.reset()
+            return []
+        
+        gray = self._to_gray(frame)
+        if gray.shape != self.prev_gray.shape:
+            # Resolution changed - tracks are meaningless now
+            self.reset()
+            return []
+        
+        # Track the features of all faces in a single optical flow call
+        active = [t for t in self.tracks if t['points'] is not None]
+        if active:
+            prev_points = np.concatenate([t['points'] for t in active])
+            next_points, status, _ = cv2.calcOpticalFlowPyrLK(
+                self.prev_gray, gray, prev_points, None, **self.lk_params)
+            status = status.reshape(-1).astype(bool)
+            
+            offset = 0
+            for track in active:
+                count = len(track['points'])
+                self._move_track(
+                    track,
+                    prev_points[offset:offset + count].reshape(-1, 2),
+                    next_points[offset:offset + count].reshape(-1, 2),
+                    status[offset:offset + count]
+                )
+                offset += count
+        
+        self.prev_gray = gray
+        h, w = gray.shape[:2]
+        return [self._track_to_face(track, w, h) for track in self.tracks]
+    
+    def reset(self):
+        """Drop all tracks"""
+        self.prev_gray = None
+        self.tracks = []
+    
+    def _find_points(self, gray, x1, y1, x2, y2) -> Optional[np.ndarray]:
+        """Find good features inside the central part of a face box"""
+        # Shrink the box to avoid background features at the edges
+        inset_x = (x2 - x1) // 5
+        inset_y = (y2 - y1) // 5
+        roi = gray[y1 + inset_y:y2 - inset_y, x1 + inset_x:x2 - inset_x]
+        if roi.size == 0:
+            return None
+        
+        points = cv2.goodFeaturesToTrack(
+            roi, maxCorners=self.max_points_per_face, qualityLevel=0.01, minDistance=3)
+        if points is None or len(points) < self.min_points:
+            return None
+        
+        points = points.astype(np.float32)
+        points[:, 0, 0] += x1 + inset_x
+        points[:, 0, 1] += y1 + inset_y
+        return points
+    
+    def _move_track(self, track, prev_points, next_points, status):
+        """Apply the median motion of a track's surviving features to its box"""
+        old = prev_points[status]
+        new = next_points[status]
+        if len(new) < self.min_points:
+            # Lost the features - hold the box in place until the next seed
+            track['points'] = None
+            return
+        
+        dx, dy = np.median(new - old, axis=0)
+        
+        # Scale from the change in spread around the feature centroid
+        old_spread = np.linalg.norm(old - old.mean(axis=0), axis=1)
+        new_spread = np.linalg.norm(new - new.mean(axis=0), axis=1)
+        valid = old_spread > 1e-3
+        scale = float(np.median(new_spread[valid] / old_spread[valid])) if valid.any() else 1.0
+        scale = max(0.8, min(1.25, scale))
+        
+        box = track['box']
+        box[0] += float(dx)
+        box[1] += float(dy)
+        box[2] *= scale
+        box[3] *= scale
+        track['points'] = new.reshape(-1, 1, 2)
+    
+    def _track_to_face(self, track, frame_w, frame_h) -> Dict:
+        """Build a face dictionary from a track's current box"""
+        cx, cy, w, h = track['box']
+        x1 = int(max(0, min(cx - w / 2, frame_w - 1)))
+        y1 = int(max(0, min(cy - h / 2, frame_h - 1)))
+        x2 = int(max(0, min(cx + w / 2, frame_w - 1)))
+        y2 = int(max(0, min(cy + h / 2, frame_h - 1)))
+        
+        face = dict(track['face'])
+        face.pop('landmarks', None)  # Only valid for the detection the track was seeded with
+        face.update({
+            'x1': x1, 'y1': y1, 'x2': x2, 'y2': y2,
+            'center_x': (x1 + x2) // 2,
+            'center_y': (y1 + y2) // 2,
+            'radius': max((x2 - x1), (y2 - y1)) // 2
+        })
+        return face
+    
+    @staticmethod
+    def _to_gray(frame: np.ndarray) -> np.ndarray:
+        """Convert a frame to grayscale if needed"""
+        if len(frame.shape) == 3:
+            return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return frame
 
 
 class FaceDetector:
     """
-    OpenCV DNN-based face detector with temporal smoothing.
+    Face detector with temporal smoothing.
     
     Features:
-    - DNN-based face detection using OpenCV
+    - Pluggable detector backend (SSD, YuNet, Haar cascade, dlib HOG)
     - Automatic model downloading
     - Temporal smoothing to reduce detection flickering
     - Debug visualization with face overlays
-    - CUDA acceleration when available
+    - Selectable OpenCV DNN backend/target (CUDA when available)
+    - Optional optical-flow tracking between detections
+    - Optional ROI-restricted re-detection around tracked faces
     """
     
     def __init__(
@@ -32,7 +309,13 @@ class FaceDetector:
         confidence_threshold: float = 0.5,
         smoothing_factor: float = 0.4,
         models_dir: Optional[str] = None,
-        logger: Optional[Any] = None
+        logger: Optional[Any] = None,
+        enable_tracking: bool = True,
+        enable_roi_detection: bool = True,
+        full_sweep_interval: int = 10,
+        backend: str = 'ssd',
+        dnn_backend: str = 'auto',
+        dnn_target: str = 'auto'
     ):
         """
         Initialize the face detector.
@@ -42,10 +325,30 @@ class FaceDetector:
             smoothing_factor: Temporal smoothing factor (0.0-1.0, higher = more smoothing)
             models_dir: Directory to store/load model files (default: ./models)
             logger: Optional logger for debug output
+            enable_tracking: Track faces between detections with optical flow
+            enable_roi_detection: Re-detect in enlarged crops around known faces
+            full_sweep_interval: Run a full-frame detection every N detections
+                when ROI detection is enabled
+            backend: Detector backend name ('ssd', 'yunet', 'haar' or 'dlib_hog')
+            dnn_backend: OpenCV DNN backend for network detectors ('auto', 'default',
+                'opencv', 'cuda' or 'openvino')
+            dnn_target: OpenCV DNN target ('auto', 'cpu', 'opencl', 'opencl_fp16',
+                'cuda' or 'cuda_fp16')
         """
         self.confidence_threshold = confidence_threshold
         self.smoothing_factor = smoothing_factor
         self.logger = logger
+        self.enable_tracking = enable_tracking
+        
+        # ROI re-detection settings
+        self.enable_roi_detection = enable_roi_detection
+        self.full_sweep_interval = max(1, int(full_sweep_interval))
+        self.roi_scale = 2.0  # ROI side relative to the face box
+        self.roi_min_size = 120  # Minimum ROI side in pixels
+        self.nms_threshold = 0.4  # Overlap threshold when merging ROI results
+        self.detections_since_sweep = 0
+        self.dnn_backend = dnn_backend
+        self.dnn_target = dnn_target
         
         # Set up models directory
         if models_dir is None:
@@ -54,214 +357,260 @@ class FaceDetector:
         os.makedirs(self.models_dir, exist_ok=True)
         
         # Face detection state
-        self.face_net = None
+        self.detector = None
         self.prev_faces = []
+        self.next_track_id = 1
+        self.max_match_distance = 100  # Max center distance (px) to associate faces
+        self.tracker = FaceTracker()
         
         # Initialize the detector
-        self.init_face_detector()
+        self.init_face_detector(backend)
     
-    def init_face_detector(self):
-        """Initialize the OpenCV DNN face detector"""
+    def init_face_detector(self, backend: str = 'ssd'):
+        """
+        Initialize the detector backend, falling back to SSD if it is unavailable.
+        
+        Args:
+            backend: Detector backend name
+        """
         try:
-            # Try to get the models from disk, or download them if not present
-            model_file = os.path.join(self.models_dir, "opencv_face_detector_uint8.pb")
-            config_file = os.path.join(self.models_dir, "opencv_face_detector.pbtxt")
-            
-            # Download the model files if they don't exist
-            if not os.path.exists(model_file) or not os.path.exists(config_file):
-                self.download_face_model(model_file, config_file)
-            
-            # Load the DNN face detector
-            self.face_net = cv2.dnn.readNet(model_file, config_file)
-            
-            # Switch to a more accurate backend if available
-            if cv2.cuda.getCudaEnabledDeviceCount() > 0:
-                self.face_net.setPreferableBackend(cv2.dnn.DNN_BACKEND_CUDA)
-                self.face_net.setPreferableTarget(cv2.dnn.DNN_TARGET_CUDA)
-                backend_info = "CUDA"
-            else:
-                self.face_net.setPreferableBackend(cv2.dnn.DNN_BACKEND_DEFAULT)
-                self.face_net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
-                backend_info = "CPU"
-            
-            message = f"Face detector (OpenCV DNN) initialized successfully on {backend_info}"
-            print(message)
-            if self.logger:
-                self.logger.info(message)
-                
+            detector = create_detector(
+                backend,
+                confidence_threshold=self.confidence_threshold,
+                models_dir=self.models_dir,
+                dnn_backend=self.dnn_backend,
+                dnn_target=self.dnn_target,
+                logger=self.logger
+            )
+            if not detector.available and backend != 'ssd':
+                raise RuntimeError(f"{detector.label} detector is not available")
         except Exception as e:
-            error_msg = f"Error initializing face detector: {e}"
+            error_msg = f"Error initializing face detector '{backend}': {e}, falling back to SSD"
             print(error_msg)
             if self.logger:
                 self.logger.error(error_msg)
-            self.face_net = None
-    
-    def download_face_model(self, model_file: str, config_file: str):
-        """Download the face detection model if needed"""
-        try:
-            # Model URLs
-            model_url = "https://github.com/spmallick/learnopencv/raw/refs/heads/master/AgeGender/opencv_face_detector_uint8.pb"
-            config_url = "https://raw.githubusercontent.com/spmallick/learnopencv/refs/heads/master/AgeGender/opencv_face_detector.pbtxt"
-            
-            # Download the files
-            message = "Downloading face detection model..."
+            detector = create_detector(
+                'ssd',
+                confidence_threshold=self.confidence_threshold,
+                models_dir=self.models_dir,
+                dnn_backend=self.dnn_backend,
+                dnn_target=self.dnn_target,
+                logger=self.logger
+            )
+        
+        self.detector = detector if detector.available else None
+        if self.detector is not None:
+            message = f"Face detector {self.detector.describe()} initialized successfully"
             print(message)
             if self.logger:
                 self.logger.info(message)
-                
-            urllib.request.urlretrieve(model_url, model_file)
-            urllib.request.urlretrieve(config_url, config_file)
-            
-            success_msg = "Face detection model downloaded successfully"
-            print(success_msg)
-            if self.logger:
-                self.logger.info(success_msg)
-                
-        except Exception as e:
-            error_msg = f"Error downloading face model: {e}"
-            print(error_msg)
-            if self.logger:
-                self.logger.error(error_msg)
-            raise
+    
+    def set_backend(self, backend: str):
+        """
+        Switch to a different detector backend.
+        
+        Args:
+            backend: Detector backend name
+        """
+        if self.detector is not None and self.detector.name == backend:
+            return
+        self.init_face_detector(backend)
+        self.reset_tracking()
+    
+    @property
+    def backend_name(self) -> str:
+        """Name of the active detector backend ('' if none)"""
+        return self.detector.name if self.detector is not None else ''
     
     def detect_faces(self, frame: np.ndarray) -> List[Dict]:
         """
-        Detect faces using OpenCV's DNN-based face detector.
+        Detect faces in the whole frame with the detector backend.
         
         Args:
             frame: Input image as numpy array (BGR format)
             
         Returns:
             List of face dictionaries with keys: x1, y1, x2, y2, center_x, center_y, radius, confidence
+            (and 'landmarks' for backends that provide them)
         """
-        if self.face_net is None:
+        if self.detector is None:
             return []
         
-        # Get frame dimensions
-        h, w = frame.shape[:2]
+        return self.detector.detect(frame)
+    
+    def detect(self, frame: np.ndarray) -> List[Dict]:
+        """
+        Detect faces, restricted to regions around known faces when possible.
+        
+        With ROI detection enabled, the network runs on enlarged crops around
+        the previous smoothed/tracked faces. A full-frame sweep is done every
+        full_sweep_interval detections, when there are no known faces, or when
+        any known face is not found again in its ROI.
+        
+        Args:
+            frame: Input image as numpy array (BGR format)
+            
+        Returns:
+            List of face dictionaries (same format as detect_faces())
+        """
+        if (not self.enable_roi_detection or not self.prev_faces or
+                self.detections_since_sweep >= self.full_sweep_interval):
+            self.detections_since_sweep = 0
+            return self.detect_faces(frame)
         
-        # Prepare input blob for the network
-        blob = cv2.dnn.blobFromImage(frame, 1.0, (300, 300), [104, 117, 123], False, False)
-        self.face_net.setInput(blob)
-        
-        # Run forward pass
-        detections = self.face_net.forward()
-        
-        # Parse detections
-        faces = []
-        for i in range(detections.shape[2]):
-            confidence = detections[0, 0, i, 2]
-            if confidence > self.confidence_threshold:
-                # Get face bounding box
-                x1 = int(detections[0, 0, i, 3] * w)
-                y1 = int(detections[0, 0, i, 4] * h)
-                x2 = int(detections[0, 0, i, 5] * w)
-                y2 = int(detections[0, 0, i, 6] * h)
-                
-                # Make sure the coordinates are within the frame
-                x1 = max(0, min(x1, w-1))
-                y1 = max(0, min(y1, h-1))
-                x2 = max(0, min(x2, w-1))
-                y2 = max(0, min(y2, h-1))
-                
-                if x2 > x1 and y2 > y1:  # Valid face
-                    faces.append({
-                        'x1': x1, 'y1': y1, 'x2': x2, 'y2': y2,
-                        'center_x': (x1 + x2) // 2,
-                        'center_y': (y1 + y2) // 2,
-                        'radius': max((x2 - x1), (y2 - y1)) // 2,
-                        'confidence': confidence
-                    })
+        faces, lost = self.detect_faces_roi(frame, self.prev_faces)
+        if lost:
+            # A track was lost - look at the whole frame again
+            self.detections_since_sweep = 0
+            return self.detect_faces(frame)
         
+        self.detections_since_sweep += 1
         return faces
     
+    def detect_faces_roi(self, frame: np.ndarray, known_faces: List[Dict]):
+        """
+        Run the detector on enlarged crops around known faces.
+        
+        Backends that support it (SSD) batch all crops into a single forward
+        pass. Small, distant faces are upscaled to the network input size,
+        which improves recall compared to shrinking the full frame.
+        
+        Args:
+            frame: Input image as numpy array (BGR format)
+            known_faces: Face dictionaries to search around
+            
+        Returns:
+            Tuple of (faces, lost) where lost is True if any ROI had no face
+        """
+        if self.detector is None:
+            return [], True
+        
+        h, w = frame.shape[:2]
+        rois = [self._face_roi(face, w, h) for face in known_faces]
+        rois = [roi for roi in rois if roi[2] > roi[0] and roi[3] > roi[1]]
+        if not rois:
+            return [], True
+        
+        crops = [frame[ry1:ry2, rx1:rx2] for rx1, ry1, rx2, ry2 in rois]
+        faces = self.detector.detect_batch(crops, rois, w, h)
+        
+        # Every ROI must produce at least one face, otherwise the track is lost
+        found = set(face.pop('roi_index') for face in faces)
+        lost = len(found) < len(rois)
+        
+        return self._merge_overlapping(faces), lost
+    
+    def _face_roi(self, face: Dict, frame_w: int, frame_h: int):
+        """
+        Compute the enlarged, square search region around a face.
+        
+        Near the frame edge the square is shifted back inside the frame
+        rather than clipped: the detector resizes every crop to its square
+        input, and a clipped, non-square crop would be stretched and skew
+        the boxes found in it.
+        """
+        side = max(face['x2'] - face['x1'], face['y2'] - face['y1']) * self.roi_scale
+        side = int(min(max(side, self.roi_min_size), frame_w, frame_h))
+        x1 = int(min(max(0, face['center_x'] - side / 2), frame_w - side))
+        y1 = int(min(max(0, face['center_y'] - side / 2), frame_h - side))
+        return (x1, y1, x1 + side, y1 + side)
+    
+    def _merge_overlapping(self, faces: List[Dict]) -> List[Dict]:
+        """Suppress duplicate faces found in overlapping ROIs"""
+        if len(faces) < 2:
+            return faces
+        
+        boxes = [[f['x1'], f['y1'], f['x2'] - f['x1'], f['y2'] - f['y1']] for f in faces]
+        scores = [float(f['confidence']) for f in faces]
+        keep = cv2.dnn.NMSBoxes(boxes, scores, self.confidence_threshold, self.nms_threshold)
+        keep = np.array(keep).reshape(-1)
+        return [faces[i] for i in keep]
+    
     def smooth_detections(self, faces: List[Dict]) -> List[Dict]:
         """
         Apply temporal smoothing to face detections to reduce flickering.
         
+        New detections are associated with previous faces by solving an
+        optimal assignment over the center-distance cost matrix. Matched faces
+        keep their integer 'track_id'; unmatched detections get a new one.
+        
         Args:
             faces: List of face dictionaries from detect_faces()
             
         Returns:
-            List of smoothed face dictionaries
+            List of smoothed face dictionaries, each with a 'track_id'
         """
         if not faces:
             # If no faces detected in current frame but we have previous faces,
             # decay them but keep showing them for a while
-            if self.prev_faces:
-                # Slowly reduce confidence of previous faces
-                for face in self.prev_faces:
-                    face['confidence'] *= 0.8  # Decay factor
-                
-                # Remove faces with very low confidence
-                self.prev_faces = [f for f in self.prev_faces if f['confidence'] > 0.2]
-                return self.prev_faces
-            return []
+            self.prev_faces = [
+                dict(face, confidence=face['confidence'] * 0.8)  # Decay factor
+                for face in self.prev_faces
+                if face['confidence'] * 0.8 > 0.2  # Remove very low confidence
+            ]
+            return [dict(face) for face in self.prev_faces]
         
         # If we have new faces, smoothly transition to them
         if not self.prev_faces:
             # First detection, just use it
-            self.prev_faces = faces
-            return faces
+            new_faces = [self._with_new_track_id(face) for face in faces]
+            self.prev_faces = [dict(face) for face in new_faces]
+            return new_faces
         
-        # Try to match new faces with previous faces
-        new_faces = []
-        for new_face in faces:
-            # Find closest previous face
-            best_match = None
-            min_distance = float('inf')
-            
-            for i, prev_face in enumerate(self.prev_faces):
-                # Calculate distance between centers
-                dx = new_face['center_x'] - prev_face['center_x']
-                dy = new_face['center_y'] - prev_face['center_y']
-                distance = (dx*dx + dy*dy) ** 0.5
-                
-                if distance < min_distance:
-                    min_distance = distance
-                    best_match = i
-            
-            # If we found a close enough match, smooth the transition
-            if best_match is not None and min_distance < 100:  # Threshold distance
-                prev_face = self.prev_faces[best_match]
-                
-                # Smooth position and size
-                smoothed_face = {
-                    'center_x': int(self.smoothing_factor * prev_face['center_x'] + 
-                                    (1 - self.smoothing_factor) * new_face['center_x']),
-                    'center_y': int(self.smoothing_factor * prev_face['center_y'] + 
-                                    (1 - self.smoothing_factor) * new_face['center_y']),
-                    'radius': int(self.smoothing_factor * prev_face['radius'] + 
-                                 (1 - self.smoothing_factor) * new_face['radius']),
-                    'confidence': new_face['confidence']
-                }
-                
-                # Calculate new bounding box from smoothed center and radius
-                r = smoothed_face['radius']
-                cx = smoothed_face['center_x']
-                cy = smoothed_face['center_y']
-                smoothed_face['x1'] = cx - r
-                smoothed_face['y1'] = cy - r
-                smoothed_face['x2'] = cx + r
-                smoothed_face['y2'] = cy + r
-                
-                new_faces.append(smoothed_face)
-                # Remove the matched face to prevent double matching
-                self.prev_faces.pop(best_match)
-            else:
-                # No match, add as new face
-                new_faces.append(new_face)
+        # Centers and radii as arrays
+        new_centers = np.array([[f['center_x'], f['center_y']] for f in faces], dtype=np.float32)
+        new_radii = np.array([f['radius'] for f in faces], dtype=np.float32)
+        prev_centers = np.array([[f['center_x'], f['center_y']] for f in self.prev_faces], dtype=np.float32)
+        prev_radii = np.array([f['radius'] for f in self.prev_faces], dtype=np.float32)
+        
+        # Pairwise center distances and optimal one-to-one matching
+        cost = np.linalg.norm(new_centers[:, None, :] - prev_centers[None, :, :], axis=2)
+        rows, cols = linear_sum_assignment(cost)
+        close = cost[rows, cols] < self.max_match_distance
+        rows, cols = rows[close], cols[close]
+        
+        # Smooth position and size of matched faces in one step
+        alpha = self.smoothing_factor
+        centers = (alpha * prev_centers[cols] + (1 - alpha) * new_centers[rows]).astype(np.int32)
+        radii = (alpha * prev_radii[cols] + (1 - alpha) * new_radii[rows]).astype(np.int32)
+        
+        new_faces = [None] * len(faces)
+        for row, col, (cx, cy), r in zip(rows.tolist(), cols.tolist(), centers.tolist(), radii.tolist()):
+            # Calculate new bounding box from smoothed center and radius
+            new_faces[row] = {
+                'x1': cx - r, 'y1': cy - r, 'x2': cx + r, 'y2': cy + r,
+                'center_x': cx,
+                'center_y': cy,
+                'radius': r,
+                'confidence': faces[row]['confidence'],
+                'track_id': self.prev_faces[col]['track_id']
+            }
+        
+        # No match, add as new face
+        for i, face in enumerate(faces):
+            if new_faces[i] is None:
+                new_faces[i] = self._with_new_track_id(face)
         
         # Add any remaining unmatched previous faces with decayed confidence
-        for face in self.prev_faces:
-            face['confidence'] *= 0.5  # Faster decay for unmatched faces
-            if face['confidence'] > 0.3:  # Only keep if still confident enough
-                new_faces.append(face)
+        matched_prev = set(cols.tolist())
+        for i, face in enumerate(self.prev_faces):
+            if i in matched_prev:
+                continue
+            confidence = face['confidence'] * 0.5  # Faster decay for unmatched faces
+            if confidence > 0.3:  # Only keep if still confident enough
+                new_faces.append(dict(face, confidence=confidence))
         
         # Update previous faces for next frame
-        self.prev_faces = new_faces
+        self.prev_faces = [dict(face) for face in new_faces]
         return new_faces
     
+    def _with_new_track_id(self, face: Dict) -> Dict:
+        """Copy a face dictionary and assign it a new track ID"""
+        face = dict(face)
+        face['track_id'] = self.next_track_id
+        self.next_track_id += 1
+        return face
+    
     def draw_debug_overlay(self, frame: np.ndarray, faces: List[Dict]) -> np.ndarray:
         """
         Draw transparent circles and rectangles over detected faces with IDs.
@@ -327,18 +676,58 @@ class FaceDetector:
         
         return frame
     
+    def seed_tracking(self, frame: np.ndarray, faces: List[Dict]):
+        """
+        Re-seed the per-face trackers from a fresh detection result.
+        
+        Args:
+            frame: Frame the detections were made on (BGR format)
+            faces: Smoothed face dictionaries from smooth_detections()
+        """
+        if self.enable_tracking:
+            self.tracker.seed(frame, faces)
+    
+    def track_faces(self, frame: np.ndarray) -> List[Dict]:
+        """
+        Update face positions on a frame without running the DNN.
+        
+        Args:
+            frame: Input image as numpy array (BGR format)
+            
+        Returns:
+            List of face dictionaries at their tracked positions
+        """
+        if not self.enable_tracking:
+            return self.prev_faces
+        
+        faces = self.tracker.update(frame)
+        if faces:
+            # Smooth the next detection against the tracked positions
+            self.prev_faces = [dict(face) for face in faces]
+        return faces
+    
     def reset_tracking(self):
         """Reset face tracking history"""
         self.prev_faces = []
+        self.tracker.reset()
+        self.detections_since_sweep = 0
     
     def is_initialized(self) -> bool:
         """Check if the face detector is properly initialized"""
-        return self.face_net is not None
+        return self.detector is not None
     
     def set_confidence_threshold(self, threshold: float):
         """Update the confidence threshold for face detection"""
         self.confidence_threshold = max(0.0, min(1.0, threshold))
+        if self.detector is not None:
+            self.detector.confidence_threshold = self.confidence_threshold
     
     def set_smoothing_factor(self, factor: float):
         """Update the temporal smoothing factor"""
-        self.smoothing_factor = max(0.0, min(1.0, factor)) 
\ No newline at end of file
+        self.smoothing_factor = max(0.0, min(1.0, factor))
+    
+    def set_tracking_enabled(self, enabled: bool):
+        """Enable or disable optical-flow tracking between detections"""
+        self.enable_tracking = enabled
+        if not enabled:
+            self.tracker.reset()
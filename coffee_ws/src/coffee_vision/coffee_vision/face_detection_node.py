@@ -7,12 +7,14 @@ import json
 import numpy as np
 import cv2
 import threading
+import heapq
 import rclpy
 from rclpy.node import Node
 from rclpy.qos import QoSProfile
 from std_msgs.msg import String, Float32
 from sensor_msgs.msg import Image
 from geometry_msgs.msg import Vector3
+from coffee_vision_msgs.msg import FaceArray, SharedFrame, FaceCrop
 from cv_bridge import CvBridge
 
 from python_qt_binding.QtWidgets import QApplication, QMainWindow, QLabel, QVBoxLayout, QWidget, QGridLayout, QHBoxLayout
@@ -21,20 +23,58 @@ from python_qt_binding.QtCore import QTimer, Qt, QSize
 
 # Import face recognition core class
 from .recognition_memory import RecogniserBN
+from .image_writer import ImageWriter
+from .image_store import ImageStore
+from .recognition_queue import RecognitionQueue
+from .memory_monitor import get_memory_sampler
+from .shm_frames import SharedFrameReader
+from .face_detectors import set_dnn_threads
 
 # Import data types
 from .data_types import FaceData
 
 # Add these imports at the top of the file
-import psutil
 import gc
 
+# Faces per row in the recognized faces grid
+FACE_GRID_COLUMNS = 3
+
+
+def face_thumbnail(face_img):
+    """
+    Convert a BGR face image to a QImage thumbnail for the faces grid.
+    
+    Done once when a recognition result is stored, so UI refreshes only
+    reuse it. QImage (unlike QPixmap) may be created on worker threads.
+    
+    Args:
+        face_img: BGR face image
+        
+    Returns:
+        RGB QImage that owns its pixel data
+    """
+    face_img = np.ascontiguousarray(face_img)
+    h, w = face_img.shape[:2]
+    # rgbSwapped() returns a deep copy, so the numpy buffer can be released
+    return QImage(face_img.data, w, h, w * 3, QImage.Format_RGB888).rgbSwapped()
+
 
 class FaceMemory:
     """Manages face recognition and memory"""
     
-    def __init__(self, data_dir):
-        """Initialize the face recognition system"""
+    def __init__(self, data_dir, recognizer_backend='classic', face_detector='auto',
+                 dnn_backend='auto', dnn_target='auto'):
+        """
+        Initialize the face recognition system
+
+        Args:
+            data_dir: Directory for the face database, images and models
+            recognizer_backend: Recognizer backend, 'classic' (LBPH) or 'embedding'
+            face_detector: Detector backend of the recognizer ('auto' uses the
+                camera node's benchmark choice, see face_detectors)
+            dnn_backend: OpenCV DNN backend for network detectors
+            dnn_target: OpenCV DNN target for network detectors
+        """
         self.data_dir = data_dir
         os.makedirs(self.data_dir, exist_ok=True)
         
@@ -47,7 +87,8 @@ class FaceMemory:
         os.makedirs(self.model_dir, exist_ok=True)
         
         # Initialize RecogniserBN
-        self.rb = RecogniserBN()
+        self.rb = RecogniserBN(backend=recognizer_backend, detector=face_detector,
+                               dnn_backend=dnn_backend, dnn_target=dnn_target)
         self.rb.setFilePaths(self.data_dir)
         self.rb.isMultipleRecognitions = False
         self.rb.isMemoryRobot = False  # We're not using the robot features
@@ -62,24 +103,42 @@ class FaceMemory:
         # Resource limits and cleanup settings
         self.max_faces_to_track = 10  # Maximum number of faces to keep in memory
         self.max_stored_images = 1000  # Maximum images to store on disk before cleanup
+        self.max_stored_bytes = 200 * 1024 * 1024  # Maximum total size of stored images
         self.cleanup_interval = 600  # Cleanup old images every 10 minutes
         self.last_cleanup = time.time()
         self.max_memory_usage_mb = 500  # Maximum allowed memory usage in MB
         
+        # Memory is sampled in the background - admission checks read the cached value
+        self.memory_sampler = get_memory_sampler()
+        
+        # Index of stored face images - retention evicts the oldest entries
+        self.image_store = ImageStore(
+            self.faces_dir,
+            os.path.join(self.data_dir, 'faces_index.jsonl'),
+            max_images=self.max_stored_images,
+            max_bytes=self.max_stored_bytes
+        )
+        
+        # Face images are written by a background writer so recognition never waits on the disk
+        self.image_writer = ImageWriter(on_write=self.image_store.add)
+        self.rb.image_writer = self.image_writer
+        
         # Training parameters
         self.training_faces = {}  # id -> list of face images for training
         self.training_count_target = 250  # Target number of images per face
         self.is_training = False  # Flag to indicate active training
         self.last_model_save = 0  # Timestamp of last model save
         self.model_save_interval = 300  # Save model every 5 minutes
+        self.model_save_due = False  # Set after training; saved by the model save timer
         
-        # Check if model exists, otherwise create it
+        # Register the saved model - it is restored instead of retraining when
+        # the face database below still matches the one it was trained on
         if os.path.exists(self.model_file):
             print(f"Loading existing face model from {self.model_file}")
             self.rb.loadModel(self.model_file)
         
         # Check if face database exists, otherwise create it
-        if os.path.isfile(os.path.join(self.data_dir, self.face_db_file)):
+        if self.rb.faceDetectionDBExists(self.face_db_file):
             self.rb.useFaceDetectionDB(self.face_db_file)
         else:
             self.rb.resetFaceDetectionDB()
@@ -105,6 +164,7 @@ class FaceMemory:
             'last_model_save': 0,
             'training_faces': {},
             'memory_usage_mb': 0,
+            'peak_memory_mb': 0,
             'last_cleanup_time': 0,
             'cleanup_count': 0
         }
@@ -137,13 +197,19 @@ class FaceMemory:
         self.stats['new_faces_learned'] = self.stats['total_faces_processed']
     
     def save_model(self, force=False):
-        """Save the face recognition model"""
+        """
+        Save the face recognition model.
+        
+        Saving takes seconds, so never call this while holding processing_lock;
+        set model_save_due instead and let the model save timer do it.
+        """
         current_time = time.time()
         
-        # Only save if enough time has passed or if forced
-        if force or (current_time - self.last_model_save > self.model_save_interval):
+        # Only save if enough time has passed, a save is due or if forced
+        if force or self.model_save_due or (current_time - self.last_model_save > self.model_save_interval):
             try:
-                self.rb.saveModel(self.model_file)
+                if self.rb.saveModel(self.model_file):
+                    self.model_save_due = False
                 self.last_model_save = current_time
                 self.stats['last_model_save'] = current_time
                 print(f"Face model saved to {self.model_file}")
@@ -160,8 +226,9 @@ class FaceMemory:
             self.stats['training_faces'][face_id] = 0
         
         # Check memory usage before adding more images
-        if self.check_memory_usage() > self.max_memory_usage_mb:
-            print(f"WARNING: Memory usage too high ({self.check_memory_usage()} MB). Skipping training image.")
+        memory_mb = self.check_memory_usage()
+        if memory_mb > self.max_memory_usage_mb:
+            print(f"WARNING: Memory usage too high ({memory_mb:.1f} MB). Skipping training image.")
             return False
             
         # Convert to grayscale if not already
@@ -181,9 +248,8 @@ class FaceMemory:
             
             # Save training image
             training_dir = os.path.join(self.faces_dir, f'training_{face_id}')
-            os.makedirs(training_dir, exist_ok=True)
             img_path = os.path.join(training_dir, f'train_{len(self.training_faces[face_id])}.jpg')
-            cv2.imwrite(img_path, gray)
+            self.image_writer.submit(img_path, gray)
             
             # Check if it's time to cleanup
             current_time = time.time()
@@ -220,20 +286,20 @@ class FaceMemory:
                 person = [face_id, "", "", 0, 0]
                 self.rb.addPersonToBN(person)
             
-            # Train with each image
+            # Train with each image - the recognizer is updated incrementally
             for img in self.training_faces[face_id]:
-                # Save to a temporary file
-                temp_path = os.path.join(self.faces_dir, f'temp_train_{face_id}.jpg')
-                cv2.imwrite(temp_path, img)
-                
-                # Train the model
-                self.rb.setImageToCopy(temp_path)
                 self.rb.isRegistered = False
                 self.rb.identity_est = face_id
-                self.rb.confirmPersonIdentity(face_id)
+                self.rb.confirm_identity(img, face_id, commit=False)
             
-            # Save model after training
-            self.save_model(force=True)
+            # Hand the batch to the background training worker (recognition keeps
+            # using the current model until the new generation is swapped in)
+            # and save the database once
+            self.rb.flush_pending_training(force=True)
+            self.rb.saveFaceRecognitionDB()
+            
+            # Save model after training (by the model save timer, not under processing_lock)
+            self.model_save_due = True
             
             # Clear training data after successful training
             self.training_faces[face_id] = []
@@ -253,43 +319,29 @@ class FaceMemory:
             self.last_cleanup = time.time()
             self.stats['last_cleanup_time'] = self.last_cleanup
             
-            # Get list of all image files
-            image_files = []
-            for root, dirs, files in os.walk(self.faces_dir):
-                for file in files:
-                    if file.endswith('.jpg'):
-                        full_path = os.path.join(root, file)
-                        image_files.append((full_path, os.path.getmtime(full_path)))
-            
-            # If we have more than the maximum, delete the oldest
-            if len(image_files) > self.max_stored_images:
-                # Sort by modification time (oldest first)
-                image_files.sort(key=lambda x: x[1])
-                
-                # Delete oldest files exceeding the limit
-                files_to_delete = len(image_files) - self.max_stored_images
-                for i in range(files_to_delete):
-                    try:
-                        os.remove(image_files[i][0])
-                        self.stats['cleanup_count'] += 1
-                    except:
-                        pass
-                
-                print(f"Cleaned up {files_to_delete} old image files")
+            # The index is ordered oldest first, so this only touches evicted files
+            self.image_store.max_images = self.max_stored_images
+            self.image_store.max_bytes = self.max_stored_bytes
+            files_deleted = self.image_store.enforce_retention()
+            self.stats['cleanup_count'] = self.image_store.evicted
+            
+            if files_deleted:
+                print(f"Cleaned up {files_deleted} old image files")
         except Exception as e:
             print(f"Error during cleanup: {e}")
     
     def check_memory_usage(self):
-        """Check current memory usage of the process in MB"""
-        try:
-            process = psutil.Process(os.getpid())
-            memory_info = process.memory_info()
-            memory_mb = memory_info.rss / 1024 / 1024  # Convert to MB
-            self.stats['memory_usage_mb'] = memory_mb
-            return memory_mb
-        except:
-            # If psutil is not available, return a conservative estimate
-            return 0  # Will assume we're under limit
+        """
+        Get the memory usage of the process in MB.
+
+        Returns the memory sampler's cached value, so this is cheap enough to
+        call on every face. Returns 0 (assume under the limit) where the
+        sampler cannot read the process memory.
+        """
+        memory_mb = self.memory_sampler.current_mb
+        self.stats['memory_usage_mb'] = memory_mb
+        self.stats['peak_memory_mb'] = self.memory_sampler.peak_mb
+        return memory_mb
     
     def manage_recognized_faces(self):
         """Limit the number of recognized faces in memory"""
@@ -318,7 +370,7 @@ class FaceMemory:
         
         # Check memory usage - skip processing if too high
         if self.check_memory_usage() > self.max_memory_usage_mb:
-            print(f"WARNING: Memory usage too high ({self.stats['memory_usage_mb']} MB). Skipping face processing.")
+            print(f"WARNING: Memory usage too high ({self.stats['memory_usage_mb']:.1f} MB). Skipping face processing.")
             return self.recognized_faces
         
         with self.processing_lock:
@@ -340,18 +392,11 @@ class FaceMemory:
                 if face_img is not None:
                     self.stats['total_faces_processed'] += 1
                     
-                    # Save the face image for recognition - use a consistent filename to avoid proliferation
-                    face_image_path = os.path.join(self.faces_dir, f'temp_face_{face_idx}.jpg')
-                    cv2.imwrite(face_image_path, face_img)
-                    
-                    # Set image for recognition
-                    self.rb.setImageToCopy(face_image_path)
-                    
                     # Perform recognition
                     recognition_start = time.time()
                     self.rb.num_recognitions += 1
                     self.stats['total_recognitions'] += 1
-                    recog_results = self.rb.recognisePerson()
+                    self.rb.recognise(face_img)
                     recognition_time = time.time() - recognition_start
                     
                     # Update timing stats
@@ -374,7 +419,7 @@ class FaceMemory:
                         
                         # Every time we recognize a face, update the model to improve recognition
                         # This is a form of continuous learning
-                        self.rb.confirmPersonIdentity(face_id)
+                        self.rb.confirm_identity(face_img, face_id)
                         
                         # Add to training set for continuous improvement - but limit frequency
                         if self.stats['total_recognitions'] % 30 == 0:  # Only add every 30th recognition
@@ -400,7 +445,7 @@ class FaceMemory:
                             # Now update the database with the face
                             self.rb.isRegistered = False
                             self.rb.identity_est = face_id
-                            self.rb.confirmPersonIdentity(face_id)
+                            self.rb.confirm_identity(face_img, face_id)
                             
                             # Start collecting training images for this new face
                             self.add_training_face(face_id, face_img)
@@ -420,6 +465,7 @@ class FaceMemory:
                         'face_data': face_data,
                         'confidence': confidence,
                         'face_image': face_img_small,  # Use smaller face image
+                        'face_thumbnail': face_thumbnail(face_img_small),
                         'is_new': is_new_face,
                         'recognition_time': recognition_time,
                         'face_size': f"{face_shape[1]}x{face_shape[0]}",
@@ -435,18 +481,13 @@ class FaceMemory:
                         timestamp = int(time.time())
                         face_filename = f"face_{face_id}_{timestamp}.jpg"
                         face_path = os.path.join(self.faces_dir, face_filename)
-                        cv2.imwrite(face_path, face_img_small)
+                        self.image_writer.submit(face_path, face_img_small)
             
             # Update the recognized faces dictionary
             self.recognized_faces.update(recognized_faces)
             
             # Manage the number of faces we're tracking
             self.manage_recognized_faces()
-            
-            # Check if it's time to save the model
-            current_time = time.time()
-            if current_time - self.last_model_save > self.model_save_interval:
-                self.save_model()
         
         self.stats['processing_time'] = time.time() - start_time
         return recognized_faces
@@ -580,9 +621,11 @@ class FaceRecognitionUI(QMainWindow):
         self.status_label.setAlignment(Qt.AlignCenter)
         self.main_layout.addWidget(self.status_label)
         
-        # Memory grid for storing face widgets
-        self.face_labels = {}
-        self.face_info_labels = {}
+        # Pool of face grid tiles, updated in place. A face keeps its tile (and
+        # grid position) while it is shown; freed tiles are reused lowest index first
+        self.face_tiles = []  # All tiles, indexed by grid position
+        self.tiles_by_face = {}  # face_id -> tile currently showing it
+        self.free_tiles = []  # Heap of (index, tile) for hidden tiles
         
         # Debug log storage
         self.log_messages = []
@@ -667,6 +710,12 @@ class FaceRecognitionUI(QMainWindow):
             # Format model save info
             last_save = time.strftime('%H:%M:%S', time.localtime(stats.get('last_model_save', 0))) if stats.get('last_model_save', 0) else "Not saved yet"
             
+            # Format model generation info (built by the background training worker)
+            training_stats = self.face_memory.rb.get_training_stats()
+            training_state = "Training" if training_stats['training'] else "Idle"
+            writer_stats = self.face_memory.image_writer.get_stats()
+            memory_stats = self.face_memory.memory_sampler.get_stats()
+            
             stats_text = (
                 f"Connection Status:\n"
                 f"- Camera Frame: {camera_status} (Frames: {frames_received})\n"
@@ -680,7 +729,15 @@ class FaceRecognitionUI(QMainWindow):
                 f"- Processing Time: {stats.get('processing_time', 0):.3f}s\n"
                 f"- Last Update: {time.strftime('%H:%M:%S', time.localtime(stats.get('last_process_timestamp', 0)))}\n\n"
                 f"Model Status:\n"
-                f"- Last Model Save: {last_save}\n\n"
+                f"- Last Model Save: {last_save}\n"
+                f"- Generation: {training_stats['generation']} "
+                f"(built in {training_stats['last_build_time'] * 1000:.0f} ms, {training_state})\n"
+                f"- Pending Samples: {training_stats['pending_samples']}\n"
+                f"- Image Writes: {writer_stats['written']} "
+                f"(queued {writer_stats['queue_depth']}, dropped {writer_stats['dropped']}, "
+                f"latency {writer_stats['avg_latency'] * 1000:.0f} ms)\n"
+                f"- Memory: {memory_stats['memory_mb']:.0f} MB "
+                f"(peak {memory_stats['peak_mb']:.0f} MB, CPU {memory_stats['cpu_percent']:.0f}%)\n\n"
                 f"Training Progress:\n"
                 f"{training_info}"
             )
@@ -699,7 +756,9 @@ class FaceRecognitionUI(QMainWindow):
         
         # Update faces grid
         if hasattr(self.face_memory, 'recognized_faces'):
-            faces = self.face_memory.recognized_faces
+            # Snapshot the faces (recognition workers update them concurrently)
+            with self.face_memory.processing_lock:
+                faces = list(self.face_memory.recognized_faces.items())
             
             # Update status
             if not faces:
@@ -707,85 +766,146 @@ class FaceRecognitionUI(QMainWindow):
             else:
                 self.status_label.setText(f"Recognized {len(faces)} faces")
                 # Add log message if new faces are detected
-                for face_id, face_data in faces.items():
-                    if face_id not in self.face_labels and face_data.get('is_new', False):
+                for face_id, face_data in faces:
+                    if face_id not in self.tiles_by_face and face_data.get('is_new', False):
                         self.add_log_message(f"New face learned: ID {face_id}")
             
-            # Clear grid if face count changes
-            if len(faces) != len(self.face_labels):
-                self.clear_face_grid()
-            
-            # Update face grid
-            row, col = 0, 0
-            for face_id, face_data in faces.items():
-                if face_id not in self.face_labels:
-                    # Create new label for this face
-                    face_img_label = QLabel()
-                    face_img_label.setFixedSize(QSize(150, 150))
-                    face_img_label.setScaledContents(True)
-                    face_img_label.setStyleSheet("border: 2px solid " + 
-                                                ("red" if face_data.get('is_new', False) else "green"))
-                    
-                    face_info_label = QLabel()
-                    face_info_label.setAlignment(Qt.AlignCenter)
-                    face_info_label.setWordWrap(True)
-                    
-                    # Add to grid
-                    self.faces_grid.addWidget(face_img_label, row, col)
-                    self.faces_grid.addWidget(face_info_label, row+1, col)
-                    
-                    # Store references
-                    self.face_labels[face_id] = face_img_label
-                    self.face_info_labels[face_id] = face_info_label
-                    
-                    # Move to next position
-                    col += 1
-                    if col >= 3:  # 3 faces per row
-                        col = 0
-                        row += 2  # Each face takes 2 rows (image + label)
-                
-                # Update image
-                if 'face_image' in face_data:
-                    face_img = face_data['face_image']
-                    h, w = face_img.shape[:2]
-                    
-                    q_img = QImage(face_img.data, w, h, w*3, QImage.Format_RGB888).rgbSwapped()
-                    pixmap = QPixmap.fromImage(q_img)
-                    
-                    self.face_labels[face_id].setPixmap(pixmap)
-                    
-                    # Update info with extended details
-                    confidence = face_data.get('confidence', 0.0)
-                    is_new = face_data.get('is_new', False)
-                    learning_status = face_data.get('learning_status', "")
-                    face_size = face_data.get('face_size', "")
-                    face_quality = face_data.get('face_quality', 0)
-                    
-                    # Get training progress
-                    training_count = len(self.face_memory.training_faces.get(face_id, []))
-                    training_target = self.face_memory.training_count_target
-                    training_progress = f"{training_count}/{training_target}"
-                    
-                    status = "New Face" if is_new else f"Confidence: {confidence:.2f}"
-                    info_text = (
-                        f"ID: {face_id}\n"
-                        f"{status}\n"
-                        f"Training: {training_progress}\n"
-                        f"Quality: {face_quality}%\n"
-                        f"Size: {face_size}"
-                    )
-                    self.face_info_labels[face_id].setText(info_text)
+            # Free the tiles of faces that are gone; the other tiles stay put
+            current_ids = {face_id for face_id, _ in faces}
+            for face_id in [fid for fid in self.tiles_by_face if fid not in current_ids]:
+                self._release_face_tile(face_id)
+            
+            # Update tiles in place; only tiles whose face changed are repainted
+            for face_id, face_data in faces:
+                tile = self.tiles_by_face.get(face_id)
+                if tile is None:
+                    tile = self._acquire_face_tile(face_id)
+                self._update_face_tile(tile, face_id, face_data)
     
-    def clear_face_grid(self):
-        """Clear all faces from the grid"""
-        for face_label in self.face_labels.values():
-            face_label.setParent(None)
+    def _create_face_tile(self, index):
+        """
+        Create a face grid tile (image and info label) at a grid position.
         
-        for info_label in self.face_info_labels.values():
-            info_label.setParent(None)
+        Args:
+            index: Tile index; tiles fill the grid row by row
+            
+        Returns:
+            Tile dict with its labels and the state it currently shows
+        """
+        row = (index // FACE_GRID_COLUMNS) * 2  # Each face takes 2 rows (image + label)
+        col = index % FACE_GRID_COLUMNS
+        
+        face_img_label = QLabel()
+        face_img_label.setFixedSize(QSize(150, 150))
+        face_img_label.setScaledContents(True)
+        
+        face_info_label = QLabel()
+        face_info_label.setAlignment(Qt.AlignCenter)
+        face_info_label.setWordWrap(True)
+        
+        # Add to grid
+        self.faces_grid.addWidget(face_img_label, row, col)
+        self.faces_grid.addWidget(face_info_label, row + 1, col)
+        
+        return {
+            'index': index,
+            'image_label': face_img_label,
+            'info_label': face_info_label,
+            'entry': None,  # Recognition result currently shown
+            'is_new': None,
+            'info_text': ""
+        }
+    
+    def _acquire_face_tile(self, face_id):
+        """
+        Assign a tile to a face, reusing the lowest free grid position.
+        
+        Args:
+            face_id: Face ID that needs a tile
+            
+        Returns:
+            Tile dict now owned by the face
+        """
+        if self.free_tiles:
+            _, tile = heapq.heappop(self.free_tiles)
+        else:
+            # Grow the pool (tiles are never destroyed)
+            tile = self._create_face_tile(len(self.face_tiles))
+            self.face_tiles.append(tile)
+        self.tiles_by_face[face_id] = tile
+        return tile
+    
+    def _release_face_tile(self, face_id):
+        """Hide a face's tile and return it to the free list"""
+        tile = self.tiles_by_face.pop(face_id)
+        self._hide_face_tile(tile)
+        heapq.heappush(self.free_tiles, (tile['index'], tile))
+    
+    def _update_face_tile(self, tile, face_id, face_data):
+        """
+        Show a recognized face on a tile, touching only what changed.
         
-        self.face_labels = {}
-        self.face_info_labels = {}
+        Args:
+            tile: Tile dict from _create_face_tile
+            face_id: Face ID shown on the tile
+            face_data: Recognition result of the face
+        """
+        if tile['entry'] is None:
+            tile['image_label'].show()
+            tile['info_label'].show()
+        
+        # Results are replaced (not modified) on every recognition, so a new
+        # entry object means a new thumbnail
+        if face_data is not tile['entry']:
+            tile['entry'] = face_data
+            thumbnail = face_data.get('face_thumbnail')
+            if thumbnail is None and 'face_image' in face_data:
+                thumbnail = face_data['face_thumbnail'] = face_thumbnail(face_data['face_image'])
+            if thumbnail is not None:
+                tile['image_label'].setPixmap(QPixmap.fromImage(thumbnail))
+        
+        is_new = face_data.get('is_new', False)
+        if is_new != tile['is_new']:
+            tile['is_new'] = is_new
+            tile['image_label'].setStyleSheet("border: 2px solid " + ("red" if is_new else "green"))
+        
+        # Update info with extended details
+        confidence = face_data.get('confidence', 0.0)
+        face_size = face_data.get('face_size', "")
+        face_quality = face_data.get('face_quality', 0)
+        
+        # Get training progress
+        training_count = len(self.face_memory.training_faces.get(face_id, []))
+        training_target = self.face_memory.training_count_target
+        training_progress = f"{training_count}/{training_target}"
+        
+        status = "New Face" if is_new else f"Confidence: {confidence:.2f}"
+        info_text = (
+            f"ID: {face_id}\n"
+            f"{status}\n"
+            f"Training: {training_progress}\n"
+            f"Quality: {face_quality}%\n"
+            f"Size: {face_size}"
+        )
+        if info_text != tile['info_text']:
+            tile['info_text'] = info_text
+            tile['info_label'].setText(info_text)
+    
+    def _hide_face_tile(self, tile):
+        """Hide an unused tile, keeping it in the pool for reuse"""
+        if tile['entry'] is None:
+            return
+        tile['image_label'].hide()
+        tile['info_label'].hide()
+        tile['image_label'].clear()
+        tile['entry'] = None
+        tile['is_new'] = None
+        tile['info_text'] = ""
+    
+    def clear_face_grid(self):
+        """Clear all faces from the grid (the tiles stay pooled)"""
+        for face_id in list(self.tiles_by_face):
+            self._release_face_tile(face_id)
     
     def update_recognized_faces(self, faces):
         """Update the recognized faces data"""
@@ -806,15 +926,59 @@ class FaceRecognitionNode(Node):
         self.data_dir = os.path.join(os.path.expanduser('~'), '.coffee_buddy', 'face_recognition')
         os.makedirs(self.data_dir, exist_ok=True)
         
+        # Recognizer backend: 'classic' (LBPH/Eigen/Fisher) or 'embedding' (ONNX face embeddings)
+        self.declare_parameter('recognizer_backend', 'classic')
+        recognizer_backend = self.get_parameter('recognizer_backend').value
+        
+        # Face detector used before recognition: 'auto' follows the camera node's
+        # detector benchmark, or name a backend ('ssd', 'yunet', 'haar', 'dlib_hog')
+        self.declare_parameter('face_detector', 'auto')
+        self.declare_parameter('dnn_backend', 'auto')
+        self.declare_parameter('dnn_target', 'auto')
+        self.declare_parameter('dnn_threads', 0)
+        set_dnn_threads(self.get_parameter('dnn_threads').value)
+        
+        # Face crops from the face_crops topic carry the camera node's face box, so the
+        # recognizer aligns them without detecting again; redetect_faces forces a detection
+        self.declare_parameter('use_face_crops', True)
+        self.declare_parameter('redetect_faces', False)
+        self.use_face_crops = self.get_parameter('use_face_crops').value
+        self.redetect_faces = self.get_parameter('redetect_faces').value
+        
+        # Recognition work queue: best crop per track within a window, processed by a
+        # small worker pool; confidently identified tracks are skipped until the TTL expires
+        self.declare_parameter('recognition_workers', 2)
+        self.declare_parameter('recognition_window', 0.3)
+        self.declare_parameter('identity_ttl', 5.0)
+        
+        # Camera frames from the shared-memory ring when camera_node runs on this host
+        # (falls back to the image topic if the ring cannot be attached)
+        self.declare_parameter('use_shared_memory', True)
+        self.use_shared_memory = self.get_parameter('use_shared_memory').value
+        self.shm_reader = SharedFrameReader()
+        
         # Initialize face recognition memory
-        self.face_memory = FaceMemory(self.data_dir)
+        self.face_memory = FaceMemory(
+            self.data_dir,
+            recognizer_backend,
+            face_detector=self.get_parameter('face_detector').value,
+            dnn_backend=self.get_parameter('dnn_backend').value,
+            dnn_target=self.get_parameter('dnn_target').value
+        )
+        self.recognition_queue = RecognitionQueue(
+            self.process_face_image,
+            quality_fn=self.face_memory._calculate_face_quality,
+            num_workers=self.get_parameter('recognition_workers').value,
+            window=self.get_parameter('recognition_window').value,
+            identity_ttl=self.get_parameter('identity_ttl').value
+        )
+        self.recognition_queue.start()
         
         # State variables
         self.latest_frame = None
         self.latest_faces = []
         self.latest_face_images = {}  # face_id -> face_image
         self.has_new_data = False
-        self.processing = False
         self.connection_status = {
             'camera_frame': False,
             'face_detection': False,
@@ -892,6 +1056,16 @@ class FaceRecognitionNode(Node):
         except Exception as e:
             self.get_logger().error(f'Error saving face model during shutdown: {e}')
         
+        # Stop the recognition workers and the background training worker,
+        # then write out queued face images
+        if hasattr(self, 'recognition_queue'):
+            self.recognition_queue.stop()
+        if hasattr(self, 'face_memory'):
+            self.face_memory.rb.stop_training_worker()
+            self.face_memory.image_writer.stop()
+        if hasattr(self, 'shm_reader'):
+            self.shm_reader.close()
+        
         # Close UI
         if hasattr(self, 'ui') and self.ui:
             self.ui.close()
@@ -902,33 +1076,59 @@ class FaceRecognitionNode(Node):
     
     def create_subscriptions(self):
         """Create ROS subscriptions"""
-        # Camera frame subscription with quality of service settings
-        qos = QoSProfile(depth=10)
-        self.frame_subscription = self.create_subscription(
-            Image,
-            'camera_frame',  # Topic from camera_node
-            self.frame_callback,
-            qos
-        )
-        self.get_logger().info('Subscribed to camera_frame topic')
+        # Camera frame subscription: shared-memory frame index, or the image topic
+        self.shm_frame_subscription = None
+        self.frame_subscription = None
+        if self.use_shared_memory:
+            self.shm_frame_subscription = self.create_subscription(
+                SharedFrame,
+                '/coffee_bot/camera/image_shm',  # Frame index from camera_node
+                self.shm_frame_callback,
+                10
+            )
+            self.get_logger().info('Subscribed to /coffee_bot/camera/image_shm topic')
+        else:
+            self.create_frame_subscription()
         
         # Face detection subscription
         self.face_subscription = self.create_subscription(
-            String,
+            FaceArray,
             'face_detection_data',  # Topic from camera_node
             self.face_data_callback,
             10
         )
         self.get_logger().info('Subscribed to face_detection_data topic')
         
-        # Face images subscription (new)
-        self.face_image_subscription = self.create_subscription(
+        if self.use_face_crops:
+            # Face crops with their face box (recognized without re-detection)
+            self.face_image_subscription = self.create_subscription(
+                FaceCrop,
+                'face_crops',  # Face crops from camera_node
+                self.face_crop_callback,
+                10
+            )
+            self.get_logger().info('Subscribed to face_crops topic')
+        else:
+            # Face images subscription (new)
+            self.face_image_subscription = self.create_subscription(
+                Image,
+                'face_images',  # Face images from camera_node
+                self.face_image_callback,
+                10
+            )
+            self.get_logger().info('Subscribed to face_images topic')
+    
+    def create_frame_subscription(self):
+        """Subscribe to camera frames on the image topic"""
+        # Camera frame subscription with quality of service settings
+        qos = QoSProfile(depth=10)
+        self.frame_subscription = self.create_subscription(
             Image,
-            'face_images',  # Face images from camera_node
-            self.face_image_callback,
-            10
+            'camera_frame',  # Topic from camera_node
+            self.frame_callback,
+            qos
         )
-        self.get_logger().info('Subscribed to face_images topic')
+        self.get_logger().info('Subscribed to camera_frame topic')
     
     def create_publishers(self):
         """Create ROS publishers"""
@@ -1008,13 +1208,7 @@ class FaceRecognitionNode(Node):
             # Convert ROS Image message to OpenCV image
             frame = self.bridge.imgmsg_to_cv2(msg, "bgr8")
             
-            # Downscale large images to save memory
-            h, w = frame.shape[:2]
-            scale_factor = min(1.0, 640 / max(w, h))  # Limit to 640px in largest dimension
-            if scale_factor < 1.0:
-                frame = cv2.resize(frame, (int(w * scale_factor), int(h * scale_factor)))
-                
-            self.latest_frame = frame
+            self.latest_frame = self._downscale_frame(frame)
             self.has_new_data = True
             
             # Log periodically (every 100 frames)
@@ -1023,6 +1217,51 @@ class FaceRecognitionNode(Node):
         except Exception as e:
             self.get_logger().error(f'Error processing camera frame: {e}')
     
+    def shm_frame_callback(self, msg):
+        """Read camera frames from the shared-memory ring with rate limiting"""
+        try:
+            # Update connection status
+            self.connection_status['last_frame_time'] = time.time()
+            self.connection_status['frames_received'] += 1
+            
+            # Rate limiting - only process every Nth frame
+            self.frame_counter += 1
+            if self.frame_counter % self.process_every_n_frames != 0:
+                return
+            
+            # Zero-copy view of the ring slot
+            packet = self.shm_reader.read(msg.segment, msg.slot, msg.sequence)
+            if packet is None:
+                return  # Slot already recycled - a newer frame is on its way
+            
+            # Downscaling (or copying) moves the frame out of the ring; drop it if
+            # the camera node recycled the slot meanwhile
+            frame = self._downscale_frame(packet.frame)
+            if frame is packet.frame:
+                frame = frame.copy()
+            if not self.shm_reader.is_valid(packet):
+                return
+            
+            self.latest_frame = frame
+            self.has_new_data = True
+        except FileNotFoundError:
+            # The ring lives on another host - fall back to the image topic
+            self.get_logger().warn(
+                f'Shared frame ring {msg.segment} not found on this host, using the image topic instead')
+            self.destroy_subscription(self.shm_frame_subscription)
+            self.shm_frame_subscription = None
+            self.create_frame_subscription()
+        except Exception as e:
+            self.get_logger().error(f'Error reading shared camera frame: {e}')
+    
+    def _downscale_frame(self, frame):
+        """Downscale large images to save memory"""
+        h, w = frame.shape[:2]
+        scale_factor = min(1.0, 640 / max(w, h))  # Limit to 640px in largest dimension
+        if scale_factor < 1.0:
+            frame = cv2.resize(frame, (int(w * scale_factor), int(h * scale_factor)))
+        return frame
+    
     def face_data_callback(self, msg):
         """Process incoming face detection data"""
         try:
@@ -1030,11 +1269,8 @@ class FaceRecognitionNode(Node):
             self.connection_status['last_face_data_time'] = time.time()
             self.connection_status['face_data_received'] += 1
             
-            # Parse face data JSON
-            face_data = json.loads(msg.data)
-            
             # Convert to FaceData objects
-            faces = [FaceData.from_dict(face) for face in face_data.get('faces', [])]
+            faces = [FaceData.from_msg(face) for face in msg.faces]
             
             if faces:
                 self.latest_faces = faces
@@ -1055,17 +1291,13 @@ class FaceRecognitionNode(Node):
             # Convert ROS Image message to OpenCV image
             face_img = self.bridge.imgmsg_to_cv2(msg, "bgr8")
             
-            # Get face ID from header frame_id field (e.g., "face_0")
+            # Get the track ID from the header frame_id field (e.g., "face_12")
             face_id = msg.header.frame_id
             timestamp = time.time()
             
             if face_img is not None:
-                # Save the face image to a temporary file for recognition
-                temp_file = os.path.join(self.face_memory.faces_dir, f'temp_face_{face_id}.jpg')
-                cv2.imwrite(temp_file, face_img)
-                
-                # Process this face image directly with the face recognition system
-                self.process_face_image(face_img, temp_file, face_id, timestamp)
+                # Queue the crop - only the best crop per track and window is recognized
+                self.recognition_queue.submit(face_id, face_img, timestamp)
                 
                 # Log occasionally
                 if self.connection_status['face_images_received'] % 30 == 0:
@@ -1074,43 +1306,93 @@ class FaceRecognitionNode(Node):
         except Exception as e:
             self.get_logger().error(f'Error processing face image: {e}')
     
-    def process_face_image(self, face_img, face_image_path, face_id, timestamp):
-        """Process a single face image for recognition with memory optimization"""
-        if self.processing:
-            return
+    def face_crop_callback(self, msg):
+        """Process incoming face crop with its face box and landmarks"""
+        try:
+            # Update connection status
+            self.connection_status['last_face_image_time'] = time.time()
+            self.connection_status['face_images_received'] += 1
             
-        self.processing = True
-        
+            # Convert the crop image to OpenCV image
+            face_img = self.bridge.imgmsg_to_cv2(msg.image, "bgr8")
+            
+            # Same track key as on the face_images topic (e.g., "face_12")
+            face_id = msg.image.header.frame_id or f"face_{msg.track_id}"
+            timestamp = time.time()
+            
+            # Face location inside the crop, so the recognizer can skip detection
+            landmarks = list(msg.landmarks)
+            face_info = {
+                'box': (msg.x1, msg.y1, msg.x2, msg.y2),
+                'landmarks': list(zip(landmarks[0::2], landmarks[1::2])) or None
+            }
+            
+            if face_img is not None:
+                # Queue the crop - only the best crop per track and window is recognized
+                self.recognition_queue.submit(face_id, face_img, timestamp, face_info)
+                
+                # Log occasionally
+                if self.connection_status['face_images_received'] % 30 == 0:
+                    self.get_logger().debug(f"Received {self.connection_status['face_images_received']} face crops")
+                
+        except Exception as e:
+            self.get_logger().error(f'Error processing face crop: {e}')
+    
+    def process_face_image(self, face_id, face_img, timestamp, face_info=None):
+        """
+        Process a single face image for recognition with memory optimization.
+
+        Runs on a recognition queue worker thread.
+
+        Args:
+            face_id: Track ID of the crop
+            face_img: Face crop (BGR)
+            timestamp: Time the crop was received
+            face_info: Optional dict with the face 'box' (x1, y1, x2, y2) and
+                'landmarks' in crop coordinates; with it the recognizer skips
+                face detection unless redetect_faces is set
+
+        Returns:
+            Recognized person ID if the face was recognized with confidence, else None
+        """
         try:
             # Check if memory usage is too high
             if hasattr(self.face_memory, 'check_memory_usage'):
                 memory_usage = self.face_memory.check_memory_usage()
                 if memory_usage > self.face_memory.max_memory_usage_mb:
                     self.get_logger().warn(f'Memory usage too high ({memory_usage:.1f} MB). Skipping face processing.')
-                    return
+                    return None
+            
+            # Known face location in the crop (None lets the recognizer detect it)
+            face_box = face_info.get('box') if face_info else None
+            landmarks = face_info.get('landmarks') if face_info else None
             
             # Resize image to save memory if needed
             h, w = face_img.shape[:2]
             if h > 200 or w > 200:
                 face_img = cv2.resize(face_img, (min(w, 200), min(h, 200)))
-                cv2.imwrite(face_image_path, face_img)
-                
-            # Set the image for recognition
-            self.face_memory.rb.setImageToCopy(face_image_path)
+                scale_x, scale_y = min(w, 200) / w, min(h, 200) / h
+                if face_box is not None:
+                    face_box = (face_box[0] * scale_x, face_box[1] * scale_y,
+                                face_box[2] * scale_x, face_box[3] * scale_y)
+                if landmarks:
+                    landmarks = [(x * scale_x, y * scale_y) for x, y in landmarks]
+            face_location = {'face_box': face_box, 'landmarks': landmarks, 'redetect': self.redetect_faces}
             
-            # Perform recognition
+            # Perform recognition (workers may run this concurrently, so use the
+            # returned result rather than the recognizer's last estimate)
             recognition_start = time.time()
-            self.face_memory.rb.num_recognitions += 1
-            self.face_memory.stats['total_recognitions'] += 1
-            recog_results = self.face_memory.rb.recognisePerson()
+            with self.face_memory.processing_lock:
+                self.face_memory.rb.num_recognitions += 1
+                self.face_memory.stats['total_recognitions'] += 1
+                recognition_count = self.face_memory.stats['total_recognitions']
+            identity, confidence = self.face_memory.rb.recognise(face_img, **face_location)
             recognition_time = time.time() - recognition_start
             
             # Store a downsampled version of the face to save memory
             face_img_small = cv2.resize(face_img, (100, 100))
             
             # Get the recognition results
-            identity = self.face_memory.rb.identity_est
-            confidence = self.face_memory.rb.quality_estimate
             is_new_face = False
             recognized_id = "0"  # Default to unknown face ID
             
@@ -1131,11 +1413,12 @@ class FaceRecognitionNode(Node):
                 recognized_id = identity
                 
                 # Every time we recognize a face, update the model to improve recognition
-                self.face_memory.rb.confirmPersonIdentity(recognized_id)
+                self.face_memory.rb.confirm_identity(face_img, recognized_id, **face_location)
                 
                 # Add to training set for continuous improvement - but limit frequency
-                if self.face_memory.stats['total_recognitions'] % 30 == 0:  # Only add every 30th recognition
-                    training_complete = self.face_memory.add_training_face(recognized_id, face_img_small)
+                if recognition_count % 30 == 0:  # Only add every 30th recognition
+                    with self.face_memory.processing_lock:
+                        training_complete = self.face_memory.add_training_face(recognized_id, face_img_small)
                     if training_complete:
                         self.get_logger().info(f"Completed training for face ID: {recognized_id} with {self.face_memory.training_count_target} images")
                         self.ui.add_log_message(f"Completed training for face ID: {recognized_id}")
@@ -1144,39 +1427,44 @@ class FaceRecognitionNode(Node):
             elif confidence > 0.3:  # Face with medium confidence
                 # Use the existing ID but don't create a new face
                 self.get_logger().info(f"Face detected with medium confidence: {confidence:.2f}")
-                return  # Skip further processing
+                return None  # Skip further processing
             else:  # New face or no face detected
                 # Check if a face was actually detected
                 if hasattr(self.face_memory.rb, 'is_face_detected') and not self.face_memory.rb.is_face_detected:
                     self.get_logger().info("No face detected in the image")
-                    return  # Skip further processing if no face detected
+                    return None  # Skip further processing if no face detected
                     
                 # Only add new faces if we have room and quality is acceptable
                 face_quality = self.face_memory._calculate_face_quality(face_img_small)
-                if len(self.face_memory.recognized_faces) < self.face_memory.max_faces_to_track and face_quality > 30:
-                    # Assign a new ID
-                    recognized_id = str(self.face_memory.next_id)
-                    self.face_memory.next_id += 1
+                with self.face_memory.processing_lock:
+                    has_room = len(self.face_memory.recognized_faces) < self.face_memory.max_faces_to_track
+                    if has_room and face_quality > 30:
+                        # Assign a new ID
+                        recognized_id = str(self.face_memory.next_id)
+                        self.face_memory.next_id += 1
+                        self.face_memory.stats['new_faces_learned'] += 1
+                        
+                        # Create a person entry with just an ID
+                        person = [recognized_id, "", "", 0, 0]
+                        self.face_memory.rb.addPersonToBN(person)
+                
+                if recognized_id != "0":
                     is_new_face = True
-                    self.face_memory.stats['new_faces_learned'] += 1
-                    
-                    # Create a person entry with just an ID
-                    person = [recognized_id, "", "", 0, 0]
-                    self.face_memory.rb.addPersonToBN(person)
                     
                     # Now update the database with the face
                     self.face_memory.rb.isRegistered = False
                     self.face_memory.rb.identity_est = recognized_id
-                    self.face_memory.rb.confirmPersonIdentity(recognized_id)
+                    self.face_memory.rb.confirm_identity(face_img, recognized_id, **face_location)
                     
                     # Start collecting training images
-                    self.face_memory.add_training_face(recognized_id, face_img_small)
+                    with self.face_memory.processing_lock:
+                        self.face_memory.add_training_face(recognized_id, face_img_small)
                     
                     self.get_logger().info(f"Learned new face - ID: {recognized_id}")
                     self.ui.add_log_message(f"Started training new face - ID: {recognized_id}")
                 else:
                     self.get_logger().info(f"Skipping new face creation - low quality ({face_quality}) or too many faces")
-                    return  # Skip further processing
+                    return None  # Skip further processing
             
             # Only create recognized_faces entry if we have a valid ID
             if recognized_id != "0":
@@ -1186,6 +1474,7 @@ class FaceRecognitionNode(Node):
                         'face_data': face_data,
                         'confidence': confidence,
                         'face_image': face_img_small,  # Use smaller face image
+                        'face_thumbnail': face_thumbnail(face_img_small),
                         'is_new': is_new_face,
                         'recognition_time': recognition_time,
                         'face_size': f"{face_img_small.shape[1]}x{face_img_small.shape[0]}",
@@ -1195,24 +1484,25 @@ class FaceRecognitionNode(Node):
                     }
                 }
                 
-                # Update the recognized faces dictionary
-                self.face_memory.recognized_faces.update(recognized_faces)
-                
-                # Manage the number of faces we're tracking
-                self.face_memory.manage_recognized_faces()
-                
-                # Check if it's time to save the model
-                current_time = time.time()
-                if current_time - self.face_memory.last_model_save > self.face_memory.model_save_interval:
-                    self.face_memory.save_model()
+                with self.face_memory.processing_lock:
+                    # Update the recognized faces dictionary
+                    self.face_memory.recognized_faces.update(recognized_faces)
+                    
+                    # Manage the number of faces we're tracking
+                    self.face_memory.manage_recognized_faces()
+                    
+                    # Publish recognition results
+                    self.publish_recognition_results(self.face_memory.recognized_faces)
                 
-                # Publish recognition results
-                self.publish_recognition_results(self.face_memory.recognized_faces)
+                # Known faces are skipped by the queue until their identity expires;
+                # new faces keep being processed to collect samples
+                if not is_new_face:
+                    return recognized_id
             
         except Exception as e:
             self.get_logger().error(f'Error in face recognition processing: {e}', exc_info=True)
-        finally:
-            self.processing = False
+        
+        return None
     
     def process_recognition(self):
         """
@@ -1277,16 +1567,17 @@ class FaceRecognitionNode(Node):
     def monitor_resources(self):
         """Monitor system resources and adjust behavior as needed"""
         try:
-            # Check memory usage
-            process = psutil.Process(os.getpid())
-            memory_info = process.memory_info()
-            memory_mb = memory_info.rss / 1024 / 1024
-            
-            # Check CPU usage
-            cpu_percent = process.cpu_percent(interval=0.1)
+            # Read the sampled memory and CPU usage (peak is since the last check)
+            sampler = self.face_memory.memory_sampler
+            memory_stats = sampler.get_stats()
+            memory_mb = memory_stats['memory_mb']
+            cpu_percent = memory_stats['cpu_percent']
+            window_peak_mb = sampler.reset_peak()
             
             # Log resource usage
-            self.get_logger().debug(f'Memory usage: {memory_mb:.1f} MB, CPU: {cpu_percent:.1f}%')
+            self.get_logger().debug(
+                f'Memory usage: {memory_mb:.1f} MB (peak {window_peak_mb:.1f} MB, '
+                f'overall {memory_stats["peak_mb"]:.1f} MB), CPU: {cpu_percent:.1f}%')
             
             # Adjust processing rate based on resource usage
             if memory_mb > 800:  # If memory usage is very high
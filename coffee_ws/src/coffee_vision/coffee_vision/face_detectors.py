@@ -0,0 +1,614 @@
+#!/usr/bin/env python3
+
+"""
+Face detector backends for the coffee vision pipeline.
+
+The camera node and the recognizer both find faces, and the right detector
+depends on the machine: the ResNet-SSD network is accurate but heavy on
+small CPUs, YuNet is faster and also returns five landmarks, and the Haar
+cascade and dlib HOG detectors need no network at all. This module puts
+these behind one interface that returns face dictionaries in the format
+used throughout the package (x1, y1, x2, y2, center_x, center_y, radius,
+confidence, plus 'landmarks' where the backend provides them).
+
+DNN backends can be placed on a specific OpenCV DNN backend/target, and the
+OpenCV thread count can be set. benchmark_detectors() times every backend
+on sample frames and picks the fastest one whose recall (against a
+reference detector) meets a floor. The result is saved next to the models
+so every node on the host can use the same choice with detector 'auto'.
+"""
+
+import os
+import json
+import time
+import logging
+import platform
+import urllib.request
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+try:
+    import dlib
+    DLIB_AVAILABLE = True
+except ImportError:
+    DLIB_AVAILABLE = False
+
+logger = logging.getLogger("face_detectors")
+
+# ResNet-10 SSD face detector (TensorFlow graph, 300x300 input)
+SSD_MODEL_NAME = "opencv_face_detector_uint8.pb"
+SSD_CONFIG_NAME = "opencv_face_detector.pbtxt"
+SSD_MODEL_URL = "https://github.com/spmallick/learnopencv/raw/refs/heads/master/AgeGender/opencv_face_detector_uint8.pb"
+SSD_CONFIG_URL = "https://raw.githubusercontent.com/spmallick/learnopencv/refs/heads/master/AgeGender/opencv_face_detector.pbtxt"
+
+# YuNet face detector from the OpenCV model zoo (needs OpenCV 4.8+)
+YUNET_MODEL_NAME = "face_detection_yunet_2023mar.onnx"
+YUNET_MODEL_URL = ("https://github.com/opencv/opencv_zoo/raw/main/models/"
+                   "face_detection_yunet/face_detection_yunet_2023mar.onnx")
+
+# Benchmark result shared by the nodes on this host
+BENCHMARK_FILE = "detector_benchmark.json"
+
+DNN_BACKENDS = {
+    'default': cv2.dnn.DNN_BACKEND_DEFAULT,
+    'opencv': cv2.dnn.DNN_BACKEND_OPENCV,
+    'cuda': cv2.dnn.DNN_BACKEND_CUDA,
+    'openvino': cv2.dnn.DNN_BACKEND_INFERENCE_ENGINE
+}
+
+DNN_TARGETS = {
+    'cpu': cv2.dnn.DNN_TARGET_CPU,
+    'opencl': cv2.dnn.DNN_TARGET_OPENCL,
+    'opencl_fp16': cv2.dnn.DNN_TARGET_OPENCL_FP16,
+    'cuda': cv2.dnn.DNN_TARGET_CUDA,
+    'cuda_fp16': cv2.dnn.DNN_TARGET_CUDA_FP16
+}
+
+
+def cuda_available() -> bool:
+    """Whether OpenCV was built with CUDA and sees a device"""
+    try:
+        return cv2.cuda.getCudaEnabledDeviceCount() > 0
+    except Exception:
+        return False
+
+
+def resolve_dnn_preference(backend: str = 'auto', target: str = 'auto') -> Tuple[int, int, str]:
+    """
+    Map DNN backend/target names to OpenCV constants.
+
+    Args:
+        backend: 'auto' (CUDA if available, else default), or a key of DNN_BACKENDS
+        target: 'auto' (matches the backend), or a key of DNN_TARGETS
+
+    Returns:
+        Tuple of (backend id, target id, description)
+    """
+    backend = (backend or 'auto').lower()
+    target = (target or 'auto').lower()
+    if backend == 'auto':
+        backend = 'cuda' if cuda_available() else 'default'
+    if backend not in DNN_BACKENDS:
+        logger.warning(f"Unknown DNN backend '{backend}', using default")
+        backend = 'default'
+    if target == 'auto':
+        target = 'cuda' if backend == 'cuda' else 'cpu'
+    if target not in DNN_TARGETS:
+        logger.warning(f"Unknown DNN target '{target}', using cpu")
+        target = 'cpu'
+    return DNN_BACKENDS[backend], DNN_TARGETS[target], f"{backend}/{target}"
+
+
+def set_dnn_threads(threads: int):
+    """Set the OpenCV worker thread count (process-wide; 0 keeps the default)"""
+    if threads and threads > 0:
+        cv2.setNumThreads(int(threads))
+
+
+def make_face(x1: int, y1: int, x2: int, y2: int, confidence: float,
+              landmarks: Optional[List[List[int]]] = None) -> Dict:
+    """Build a face dictionary from a box in frame coordinates"""
+    face = {
+        'x1': x1, 'y1': y1, 'x2': x2, 'y2': y2,
+        'center_x': (x1 + x2) // 2,
+        'center_y': (y1 + y2) // 2,
+        'radius': max(x2 - x1, y2 - y1) // 2,
+        'confidence': confidence
+    }
+    if landmarks is not None:
+        face['landmarks'] = landmarks
+    return face
+
+
+def _download(url: str, path: str, log):
+    """Download a model file"""
+    log.info(f"Downloading {os.path.basename(path)}...")
+    urllib.request.urlretrieve(url, path)
+    log.info(f"Downloaded {os.path.basename(path)}")
+
+
+class DetectorBackend:
+    """
+    Base class for face detector backends.
+
+    Subclasses implement _load() and detect(). detect_batch() runs detect()
+    per crop unless a backend can batch crops into one forward pass.
+    """
+
+    name = ''
+    label = ''
+
+    def __init__(self, confidence_threshold: float = 0.5, models_dir: Optional[str] = None,
+                 dnn_backend: str = 'auto', dnn_target: str = 'auto',
+                 min_face_size: Tuple[int, int] = (0, 0), logger=None):
+        """
+        Initialize and load the detector.
+
+        Args:
+            confidence_threshold: Minimum confidence for DNN detections (0.0-1.0)
+            models_dir: Directory to store/load model files (default: ./models)
+            dnn_backend: OpenCV DNN backend name (see resolve_dnn_preference)
+            dnn_target: OpenCV DNN target name (see resolve_dnn_preference)
+            min_face_size: Minimum face size (width, height) in pixels
+            logger: Optional logger (default: module logger)
+        """
+        if models_dir is None:
+            models_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+        self.models_dir = models_dir
+        os.makedirs(self.models_dir, exist_ok=True)
+        self.confidence_threshold = confidence_threshold
+        self.dnn_backend = dnn_backend
+        self.dnn_target = dnn_target
+        self.min_face_size = tuple(min_face_size)
+        self.logger = logger if logger is not None else logging.getLogger("face_detectors")
+        self.device = 'cpu'
+        self.available = False
+
+        try:
+            self._load()
+            self.available = True
+            self.logger.debug(f"Face detector {self.describe()} initialized")
+        except Exception as e:
+            self.logger.error(f"Error initializing {self.label} face detector: {e}")
+
+    def describe(self) -> str:
+        """Human-readable backend and device"""
+        return f"{self.label} ({self.device})"
+
+    def _load(self):
+        """Load the model (raise on failure)"""
+        raise NotImplementedError
+
+    def detect(self, frame: np.ndarray) -> List[Dict]:
+        """
+        Detect faces in a frame.
+
+        Args:
+            frame: BGR or grayscale image
+
+        Returns:
+            List of face dictionaries in frame coordinates
+        """
+        raise NotImplementedError
+
+    def detect_batch(self, crops: Sequence[np.ndarray], rois, frame_w: int, frame_h: int) -> List[Dict]:
+        """
+        Detect faces in several crops of one frame.
+
+        Args:
+            crops: Image crops
+            rois: Per-crop regions (x1, y1, x2, y2) in frame coordinates
+            frame_w: Frame width
+            frame_h: Frame height
+
+        Returns:
+            Face dictionaries in frame coordinates, tagged with 'roi_index'
+        """
+        faces = []
+        for index, (crop, (rx1, ry1, _, _)) in enumerate(zip(crops, rois)):
+            for face in self.detect(crop):
+                shifted = make_face(
+                    min(face['x1'] + rx1, frame_w - 1), min(face['y1'] + ry1, frame_h - 1),
+                    min(face['x2'] + rx1, frame_w - 1), min(face['y2'] + ry1, frame_h - 1),
+                    face['confidence'],
+                    [[x + rx1, y + ry1] for x, y in face['landmarks']] if 'landmarks' in face else None
+                )
+                shifted['roi_index'] = index
+                faces.append(shifted)
+        return faces
+
+    def _big_enough(self, w: int, h: int) -> bool:
+        return w >= self.min_face_size[0] and h >= self.min_face_size[1]
+
+    @staticmethod
+    def _to_bgr(frame: np.ndarray) -> np.ndarray:
+        return cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR) if frame.ndim == 2 else frame
+
+    @staticmethod
+    def _to_gray(frame: np.ndarray) -> np.ndarray:
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+
+
+class SSDDetector(DetectorBackend):
+    """ResNet-10 SSD face detector (OpenCV DNN), batches ROI crops"""
+
+    name = 'ssd'
+    label = 'SSD'
+
+    input_size = (300, 300)
+    input_mean = [104, 117, 123]
+
+    def _load(self):
+        model_file = os.path.join(self.models_dir, SSD_MODEL_NAME)
+        config_file = os.path.join(self.models_dir, SSD_CONFIG_NAME)
+        if not os.path.exists(model_file) or not os.path.exists(config_file):
+            _download(SSD_MODEL_URL, model_file, self.logger)
+            _download(SSD_CONFIG_URL, config_file, self.logger)
+
+        self.net = cv2.dnn.readNet(model_file, config_file)
+        backend_id, target_id, self.device = resolve_dnn_preference(self.dnn_backend, self.dnn_target)
+        self.net.setPreferableBackend(backend_id)
+        self.net.setPreferableTarget(target_id)
+
+    def detect(self, frame: np.ndarray) -> List[Dict]:
+        h, w = frame.shape[:2]
+        return self.detect_batch([frame], [(0, 0, w, h)], w, h, tag_roi=False)
+
+    def detect_batch(self, crops, rois, frame_w, frame_h, tag_roi: bool = True) -> List[Dict]:
+        crops = [self._to_bgr(crop) for crop in crops]
+        blob = cv2.dnn.blobFromImages(crops, 1.0, self.input_size, self.input_mean, False, False)
+        self.net.setInput(blob)
+        detections = self.net.forward()
+        return self._parse_detections(detections, rois, frame_w, frame_h, tag_roi)
+
+    def _parse_detections(self, detections: np.ndarray, rois, w: int, h: int, tag_roi: bool) -> List[Dict]:
+        """
+        Convert raw SSD output into face dictionaries in frame coordinates.
+
+        Args:
+            detections: Network output of shape [1, 1, N, 7]
+            rois: Per-batch-image regions (x1, y1, x2, y2) in frame coordinates
+            w: Frame width
+            h: Frame height
+            tag_roi: Add the source 'roi_index' to each face
+
+        Returns:
+            List of face dictionaries
+        """
+        dets = detections.reshape(-1, 7)
+        dets = dets[dets[:, 2] > self.confidence_threshold]
+        if len(dets) == 0:
+            return []
+
+        # Map normalized boxes from their batch image back to the frame
+        roi_index = dets[:, 0].astype(np.int32)
+        roi_array = np.asarray(rois, dtype=np.float32)[roi_index]
+        origin = roi_array[:, [0, 1, 0, 1]]
+        size = (roi_array[:, 2:] - roi_array[:, :2])[:, [0, 1, 0, 1]]
+        boxes = (origin + dets[:, 3:7] * size).astype(np.int32)
+
+        # Make sure the coordinates are within the frame
+        boxes[:, [0, 2]] = np.clip(boxes[:, [0, 2]], 0, w - 1)
+        boxes[:, [1, 3]] = np.clip(boxes[:, [1, 3]], 0, h - 1)
+
+        # Keep valid faces only
+        valid = ((boxes[:, 2] > boxes[:, 0]) & (boxes[:, 3] > boxes[:, 1]) &
+                 (boxes[:, 2] - boxes[:, 0] >= self.min_face_size[0]) &
+                 (boxes[:, 3] - boxes[:, 1] >= self.min_face_size[1]))
+        boxes = boxes[valid]
+        confidences = dets[valid, 2]
+        roi_index = roi_index[valid]
+
+        faces = []
+        for (x1, y1, x2, y2), confidence, index in zip(boxes.tolist(), confidences.tolist(),
+                                                       roi_index.tolist()):
+            face = make_face(x1, y1, x2, y2, confidence)
+            if tag_roi:
+                face['roi_index'] = index
+            faces.append(face)
+        return faces
+
+
+class YuNetDetector(DetectorBackend):
+    """YuNet face detector (cv2.FaceDetectorYN) with five landmarks per face"""
+
+    name = 'yunet'
+    label = 'YuNet'
+
+    max_input_width = 640  # Larger frames are downscaled before detection
+    nms_threshold = 0.3
+    top_k = 50
+
+    def _load(self):
+        if not hasattr(cv2, 'FaceDetectorYN'):
+            raise RuntimeError(f"OpenCV {cv2.__version__} has no FaceDetectorYN")
+        model_file = os.path.join(self.models_dir, YUNET_MODEL_NAME)
+        if not os.path.exists(model_file):
+            _download(YUNET_MODEL_URL, model_file, self.logger)
+
+        backend_id, target_id, self.device = resolve_dnn_preference(self.dnn_backend, self.dnn_target)
+        self.net = cv2.FaceDetectorYN.create(model_file, "", (320, 320), self.confidence_threshold,
+                                             self.nms_threshold, self.top_k, backend_id, target_id)
+        self._input_size = (320, 320)
+
+    def detect(self, frame: np.ndarray) -> List[Dict]:
+        h, w = frame.shape[:2]
+        scale = min(1.0, self.max_input_width / float(w))
+        image = self._to_bgr(frame)
+        if scale < 1.0:
+            image = cv2.resize(image, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+        input_size = (image.shape[1], image.shape[0])
+        if input_size != self._input_size:
+            self.net.setInputSize(input_size)
+            self._input_size = input_size
+        self.net.setScoreThreshold(self.confidence_threshold)
+
+        _, detections = self.net.detect(image)
+        if detections is None:
+            return []
+
+        faces = []
+        for det in detections:
+            # x, y, w, h, five (x, y) landmarks (eyes, nose, mouth corners), score
+            x1, y1 = max(0, int(det[0] / scale)), max(0, int(det[1] / scale))
+            x2, y2 = min(w - 1, int((det[0] + det[2]) / scale)), min(h - 1, int((det[1] + det[3]) / scale))
+            if x2 <= x1 or y2 <= y1 or not self._big_enough(x2 - x1, y2 - y1):
+                continue
+            landmarks = (det[4:14].reshape(5, 2) / scale).astype(int).tolist()
+            faces.append(make_face(x1, y1, x2, y2, float(det[14]), landmarks))
+        return faces
+
+
+class HaarDetector(DetectorBackend):
+    """OpenCV Haar cascade on the equalized grayscale image (no confidence)"""
+
+    name = 'haar'
+    label = 'Haar cascade'
+
+    scale_factor = 1.1
+    min_neighbors = 5
+
+    def _load(self):
+        self.cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+        if self.cascade.empty():
+            raise RuntimeError("Haar cascade could not be loaded")
+
+    def detect(self, frame: np.ndarray) -> List[Dict]:
+        gray = cv2.equalizeHist(self._to_gray(frame))
+        boxes = self.cascade.detectMultiScale(gray, scaleFactor=self.scale_factor,
+                                              minNeighbors=self.min_neighbors,
+                                              minSize=self.min_face_size)
+        return [make_face(int(x), int(y), int(x + w), int(y + h), 1.0) for (x, y, w, h) in boxes]
+
+
+class DlibHogDetector(DetectorBackend):
+    """dlib HOG frontal face detector on the equalized grayscale image"""
+
+    name = 'dlib_hog'
+    label = 'dlib HOG'
+
+    upsample = 1  # Upsampling finds smaller faces at about 4x the cost
+
+    def _load(self):
+        if not DLIB_AVAILABLE:
+            raise RuntimeError("dlib is not installed")
+        self.detector = dlib.get_frontal_face_detector()
+
+    def detect(self, frame: np.ndarray) -> List[Dict]:
+        gray = cv2.equalizeHist(self._to_gray(frame))
+        h, w = gray.shape[:2]
+        faces = []
+        for rect in self.detector(gray, self.upsample):
+            x1, y1 = max(0, rect.left()), max(0, rect.top())
+            x2, y2 = min(w - 1, rect.right()), min(h - 1, rect.bottom())
+            if x2 > x1 and y2 > y1 and self._big_enough(rect.width(), rect.height()):
+                faces.append(make_face(x1, y1, x2, y2, 1.0))
+        return faces
+
+
+DETECTOR_BACKENDS = {
+    cls.name: cls for cls in (SSDDetector, YuNetDetector, HaarDetector, DlibHogDetector)
+}
+
+
+def create_detector(name: str, **kwargs) -> DetectorBackend:
+    """
+    Create a detector backend by name.
+
+    Args:
+        name: Backend name ('ssd', 'yunet', 'haar' or 'dlib_hog')
+        **kwargs: Passed to the backend (see DetectorBackend)
+
+    Returns:
+        Detector backend (check .available before use)
+
+    Raises:
+        ValueError: If the backend name is unknown
+    """
+    cls = DETECTOR_BACKENDS.get((name or '').lower())
+    if cls is None:
+        raise ValueError(f"Unknown face detector '{name}' (choose from {', '.join(DETECTOR_BACKENDS)})")
+    return cls(**kwargs)
+
+
+def _box_iou(a: Dict, b: Dict) -> float:
+    """Intersection over union of two face boxes"""
+    ix = max(0, min(a['x2'], b['x2']) - max(a['x1'], b['x1']))
+    iy = max(0, min(a['y2'], b['y2']) - max(a['y1'], b['y1']))
+    inter = ix * iy
+    union = ((a['x2'] - a['x1']) * (a['y2'] - a['y1']) +
+             (b['x2'] - b['x1']) * (b['y2'] - b['y1']) - inter)
+    return inter / union if union > 0 else 0.0
+
+
+def _count_matches(reference: List[Dict], faces: List[Dict], iou_threshold: float) -> int:
+    """Greedily match faces to reference faces by IoU"""
+    unmatched = list(faces)
+    matched = 0
+    for ref in reference:
+        best = max(unmatched, key=lambda face: _box_iou(ref, face), default=None)
+        if best is not None and _box_iou(ref, best) >= iou_threshold:
+            unmatched.remove(best)
+            matched += 1
+    return matched
+
+
+def cpu_signature() -> str:
+    """Identify this CPU and OpenCV build (benchmark results are per machine)"""
+    model = platform.processor() or platform.machine()
+    try:
+        with open('/proc/cpuinfo', 'r') as f:
+            for line in f:
+                if line.lower().startswith(('model name', 'hardware')):
+                    model = line.split(':', 1)[1].strip()
+                    break
+    except OSError:
+        pass
+    return f"{model} x{os.cpu_count()} / OpenCV {cv2.__version__}"
+
+
+def benchmark_detectors(frames: Sequence[np.ndarray], backends: Optional[Sequence[str]] = None,
+                        recall_floor: float = 0.9, reference: Optional[str] = None,
+                        iou_threshold: float = 0.4, **detector_kwargs) -> Dict:
+    """
+    Time detector backends on sample frames and pick the fastest accurate one.
+
+    Recall is measured against the faces found by a reference backend (by
+    default the first available of YuNet and SSD), matched by box IoU. The
+    fastest backend whose recall is at least recall_floor is chosen.
+
+    Args:
+        frames: Sample BGR frames (ideally with people in view)
+        backends: Backend names to try (default: all)
+        recall_floor: Minimum recall against the reference (0.0-1.0)
+        reference: Reference backend name (default: yunet, else ssd)
+        iou_threshold: Minimum IoU for a face to count as found
+        **detector_kwargs: Passed to every backend (see DetectorBackend)
+
+    Returns:
+        Dict with 'choice' (None if the reference found no faces), 'reference',
+        'recall_floor', 'frames', 'cpu', 'timestamp' and per-backend 'results'
+        ({'ms_per_frame', 'recall', 'faces'}, or {'error'})
+    """
+    backends = list(backends or DETECTOR_BACKENDS)
+    detectors = {}
+    results = {}
+    for name in backends:
+        detector = create_detector(name, **detector_kwargs)
+        if detector.available:
+            detectors[name] = detector
+        else:
+            results[name] = {'error': 'unavailable'}
+
+    if reference is None:
+        reference = next((name for name in ('yunet', 'ssd') if name in detectors), None)
+    result = {
+        'choice': None,
+        'reference': reference,
+        'recall_floor': recall_floor,
+        'frames': len(frames),
+        'cpu': cpu_signature(),
+        'timestamp': time.time(),
+        'results': results
+    }
+    if not frames or not detectors:
+        return result
+
+    detections = {}
+    for name, detector in detectors.items():
+        try:
+            detector.detect(frames[0])  # Warm-up (lazy allocations, OpenCL compilation)
+            start_time = time.perf_counter()
+            detections[name] = [detector.detect(frame) for frame in frames]
+            elapsed = time.perf_counter() - start_time
+        except Exception as e:
+            results[name] = {'error': str(e)}
+            continue
+        results[name] = {
+            'ms_per_frame': elapsed * 1000.0 / len(frames),
+            'faces': sum(len(faces) for faces in detections[name])
+        }
+
+    reference_faces = detections.get(reference)
+    total = sum(len(faces) for faces in reference_faces) if reference_faces else 0
+    if total == 0:
+        logger.warning("Detector benchmark: the reference detector found no faces - "
+                       "keeping the configured detector")
+        return result
+
+    for name, per_frame in detections.items():
+        matched = sum(_count_matches(ref, faces, iou_threshold)
+                      for ref, faces in zip(reference_faces, per_frame))
+        results[name]['recall'] = matched / total
+
+    qualified = [name for name in detections if results[name]['recall'] >= recall_floor]
+    if qualified:
+        result['choice'] = min(qualified, key=lambda name: results[name]['ms_per_frame'])
+    return result
+
+
+def format_benchmark(result: Dict) -> str:
+    """Format a benchmark result as a multi-line report"""
+    lines = [f"Detector benchmark on {result.get('cpu', '?')} ({result.get('frames', 0)} frames, "
+             f"reference {result.get('reference')}, recall floor {result.get('recall_floor', 0):.2f}):"]
+    for name, stats in result.get('results', {}).items():
+        if 'error' in stats:
+            lines.append(f"  - {name}: {stats['error']}")
+            continue
+        recall = stats.get('recall')
+        recall_text = f"recall {recall:.2f}" if recall is not None else "recall n/a"
+        marker = " <- chosen" if name == result.get('choice') else ""
+        lines.append(f"  - {name}: {stats['ms_per_frame']:.1f} ms/frame, {recall_text}, "
+                     f"{stats['faces']} faces{marker}")
+    return "\n".join(lines)
+
+
+def save_benchmark(result: Dict, models_dir: Optional[str] = None) -> str:
+    """Save a benchmark result for detector 'auto' (returns the file path)"""
+    if models_dir is None:
+        models_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+    os.makedirs(models_dir, exist_ok=True)
+    path = os.path.join(models_dir, BENCHMARK_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(result, f, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_benchmark(models_dir: Optional[str] = None) -> Optional[Dict]:
+    """Load the saved benchmark result if it was measured on this machine"""
+    if models_dir is None:
+        models_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+    try:
+        with open(os.path.join(models_dir, BENCHMARK_FILE), 'r') as f:
+            result = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if result.get('cpu') != cpu_signature():
+        logger.info("Saved detector benchmark is from another machine - ignoring it")
+        return None
+    return result
+
+
+def resolve_detector_name(name: str, default: str = 'ssd', models_dir: Optional[str] = None) -> str:
+    """
+    Resolve a configured detector name.
+
+    Args:
+        name: Backend name, or 'auto' for the saved benchmark choice
+        default: Backend used for 'auto' when there is no usable benchmark
+        models_dir: Directory holding the benchmark result
+
+    Returns:
+        Backend name
+    """
+    name = (name or 'auto').lower()
+    if name != 'auto':
+        return name
+    result = load_benchmark(models_dir)
+    if result and result.get('choice') in DETECTOR_BACKENDS:
+        return result['choice']
+    return default
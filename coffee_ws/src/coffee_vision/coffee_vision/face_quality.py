@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+
+"""
+Face crop quality scoring and publish gating for the camera nodes.
+
+All crops of a frame are scored in one batch (sharpness from a Laplacian
+variance, face size, and frontalness from the box aspect ratio), and a
+per-track gate only lets a crop through when it beats the track's previous
+best or a periodic refresh is due. Downstream recognition then receives a
+few good crops per person instead of every crop at camera rate.
+"""
+
+import time
+from typing import Dict, List, Optional, Sequence
+
+import cv2
+import numpy as np
+
+
+def score_face_crops(
+    crops: Sequence[np.ndarray],
+    boxes: Sequence[Sequence[float]],
+    sample_size: int = 64,
+    sharpness_scale: float = 500.0,
+    min_face_size: float = 30.0,
+    full_face_size: float = 120.0,
+    frontal_aspect: float = 0.85
+) -> np.ndarray:
+    """
+    Score face crops for recognition quality.
+
+    Args:
+        crops: Face crops (BGR or grayscale)
+        boxes: Face boxes (x1, y1, x2, y2) in frame pixels, one per crop
+        sample_size: Side of the square the crops are sampled to for sharpness
+        sharpness_scale: Laplacian variance that counts as fully sharp
+        min_face_size: Face size (smaller box side, pixels) scoring zero for size
+        full_face_size: Face size scoring one for size
+        frontal_aspect: Box width/height ratio of a frontal face
+
+    Returns:
+        Array of quality scores (0-100, higher is better), one per crop
+    """
+    count = len(crops)
+    if count == 0:
+        return np.empty(0, dtype=np.float32)
+
+    # Sample every crop to the same size so the Laplacian runs on one batch
+    gray = np.empty((count, sample_size, sample_size), dtype=np.float32)
+    for i, crop in enumerate(crops):
+        if crop.ndim == 3:
+            crop = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY)
+        gray[i] = cv2.resize(crop, (sample_size, sample_size), interpolation=cv2.INTER_AREA)
+
+    # Batched 4-neighbour Laplacian and its variance per crop
+    laplacian = (gray[:, :-2, 1:-1] + gray[:, 2:, 1:-1] + gray[:, 1:-1, :-2]
+                 + gray[:, 1:-1, 2:] - 4.0 * gray[:, 1:-1, 1:-1])
+    sharpness = np.clip(laplacian.reshape(count, -1).var(axis=1) / sharpness_scale, 0.0, 1.0)
+
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(count, 4)
+    widths = boxes[:, 2] - boxes[:, 0]
+    heights = boxes[:, 3] - boxes[:, 1]
+    size = np.clip((np.minimum(widths, heights) - min_face_size) / (full_face_size - min_face_size), 0.0, 1.0)
+
+    # Turned heads give narrower boxes than a frontal face
+    aspect = widths / np.maximum(heights, 1.0)
+    frontal = np.clip(1.0 - np.abs(aspect - frontal_aspect) / 0.5, 0.0, 1.0)
+
+    return 100.0 * (0.5 * sharpness + 0.3 * size + 0.2 * frontal)
+
+
+class FaceCropGate:
+    """
+    Decides which face crops are worth publishing, per track.
+
+    A crop passes when its track has no crop yet, when it beats the track's
+    best published quality by min_improvement, or when refresh_interval
+    has passed since the track's last published crop.
+    """
+
+    def __init__(self, refresh_interval: float = 2.0, min_improvement: float = 5.0,
+                 track_timeout: float = 5.0):
+        """
+        Initialize the gate.
+
+        Args:
+            refresh_interval: Seconds after which a track's crop is published regardless of quality
+            min_improvement: Quality points a crop must gain over the track's best
+            track_timeout: Seconds after which an unseen track's state is forgotten
+        """
+        self.refresh_interval = refresh_interval
+        self.min_improvement = min_improvement
+        self.track_timeout = track_timeout
+
+        self._tracks = {}  # track ID -> {'best': quality, 'published': time, 'seen': time}
+
+        # Statistics
+        self.published = 0
+        self.suppressed = 0
+
+    def select(self, track_ids: Sequence, qualities: Sequence[float], now: Optional[float] = None) -> List[bool]:
+        """
+        Decide which crops to publish and record them as published.
+
+        Args:
+            track_ids: Track ID of each crop
+            qualities: Quality score of each crop
+            now: Current time (default: time.time())
+
+        Returns:
+            List of booleans, True for crops that should be published
+        """
+        now = time.time() if now is None else now
+        selected = []
+        for track_id, quality in zip(track_ids, qualities):
+            state = self._tracks.get(track_id)
+            if state is None:
+                publish = True
+            else:
+                state['seen'] = now
+                publish = (quality >= state['best'] + self.min_improvement
+                           or now - state['published'] >= self.refresh_interval)
+
+            if publish:
+                # A refresh resets the baseline so later improvements get through
+                self._tracks[track_id] = {'best': float(quality), 'published': now, 'seen': now}
+                self.published += 1
+            else:
+                self.suppressed += 1
+            selected.append(publish)
+
+        # Forget tracks that have left the view
+        if len(self._tracks) > len(selected):
+            self._tracks = {
+                track_id: state for track_id, state in self._tracks.items()
+                if now - state['seen'] < self.track_timeout
+            }
+        return selected
+
+    def get_stats(self) -> Dict:
+        """Get gate statistics"""
+        return {
+            'published': self.published,
+            'suppressed': self.suppressed,
+            'tracks': len(self._tracks)
+        }
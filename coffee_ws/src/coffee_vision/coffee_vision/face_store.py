@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+
+"""
+Append-only sharded storage for face recognition samples.
+
+Each identity's face crops are stored as fixed-size raw records in their own
+shard file, and a small JSON manifest records the shape, dtype and live row
+range of every shard. Saving new samples appends just those records and
+rewrites the manifest; loading memory-maps the shards instead of
+deserializing every face. Samples dropped from the front of an identity are
+only marked dead in the manifest and reclaimed later by compaction.
+"""
+
+import os
+import json
+import logging
+from typing import Dict, List, Sequence
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger("face_store")
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+class FaceShardStore:
+    """
+    Per-identity shard files plus a manifest.
+
+    Features:
+    - Appending samples costs O(new samples), not O(database)
+    - Memory-mapped loading (faces are views into the shard files)
+    - Dropping the oldest samples is a manifest update
+    - Compaction rewrites a shard without its dead rows
+    - Records past the manifest's row count (torn appends) are ignored
+    """
+
+    def __init__(self, root_dir: str, compact_min_dead: int = 32):
+        """
+        Initialize the store.
+
+        Args:
+            root_dir: Directory holding the manifest and shard files
+            compact_min_dead: Compact a shard once it has at least this many
+                dead rows and more dead than live rows
+        """
+        self.root_dir = root_dir
+        self.manifest_path = os.path.join(root_dir, MANIFEST_NAME)
+        self.compact_min_dead = compact_min_dead
+        self.manifest = self._read_manifest()
+
+    def exists(self) -> bool:
+        """Whether the store has a manifest on disk"""
+        return os.path.isfile(self.manifest_path)
+
+    def reload(self):
+        """Discard uncommitted changes by re-reading the manifest"""
+        self.manifest = self._read_manifest()
+
+    def load(self) -> Dict[str, List[np.ndarray]]:
+        """
+        Load all identities.
+
+        Returns:
+            Dictionary of person ID -> list of face arrays (read-only views
+            into memory-mapped shard files)
+        """
+        self.reload()
+        face_db = {}
+        for person_id, entry in self.manifest['identities'].items():
+            rows = self._map_rows(entry)
+            face_db[person_id] = [np.asarray(rows[i]) for i in range(rows.shape[0])]
+        return face_db
+
+    def append(self, person_id: str, faces: Sequence[np.ndarray]):
+        """
+        Append samples to an identity's shard (creating it if needed).
+
+        The manifest is not written; call commit() after a batch of changes.
+
+        Args:
+            person_id: Identity the samples belong to
+            faces: Face arrays to append
+        """
+        if not faces:
+            return
+
+        entry = self.manifest['identities'].get(person_id)
+        if entry is None:
+            entry = {
+                'file': f"shard_{self.manifest['next_shard']}.bin",
+                'shape': list(faces[0].shape),
+                'dtype': faces[0].dtype.str,
+                'offset': 0,
+                'count': 0
+            }
+            self.manifest['next_shard'] += 1
+            self.manifest['identities'][person_id] = entry
+
+        shape = tuple(entry['shape'])
+        dtype = np.dtype(entry['dtype'])
+        records = np.empty((len(faces),) + shape, dtype=dtype)
+        for i, face in enumerate(faces):
+            if face.shape != shape:
+                face = cv2.resize(face, (shape[1], shape[0]))
+            records[i] = face
+
+        # Write at the end of the live rows, dropping anything a torn append left behind
+        os.makedirs(self.root_dir, exist_ok=True)
+        path = os.path.join(self.root_dir, entry['file'])
+        end = (entry['offset'] + entry['count']) * self._row_bytes(entry)
+        mode = 'r+b' if os.path.exists(path) else 'wb'
+        with open(path, mode) as f:
+            f.seek(end)
+            f.write(records.tobytes())
+            f.truncate()
+            f.flush()
+            os.fsync(f.fileno())
+        entry['count'] += len(faces)
+
+    def drop_oldest(self, person_id: str, count: int):
+        """
+        Mark an identity's oldest samples as dead (reclaimed by compaction).
+
+        Args:
+            person_id: Identity to drop samples from
+            count: Number of samples to drop
+        """
+        entry = self.manifest['identities'].get(person_id)
+        if entry is None or count <= 0:
+            return
+        count = min(count, entry['count'])
+        entry['offset'] += count
+        entry['count'] -= count
+
+    def remove(self, person_id: str):
+        """Remove an identity and its shard file"""
+        entry = self.manifest['identities'].pop(person_id, None)
+        if entry is not None:
+            self._unlink(entry['file'])
+
+    def clear(self):
+        """Remove every identity and write an empty manifest"""
+        for person_id in list(self.manifest['identities']):
+            self.remove(person_id)
+        self.commit()
+
+    def commit(self):
+        """Atomically write the manifest and compact shards with many dead rows"""
+        for person_id, entry in self.manifest['identities'].items():
+            if entry['offset'] >= max(self.compact_min_dead, entry['count']):
+                self._compact_entry(person_id, entry)
+        self._write_manifest()
+
+    def compact(self):
+        """Rewrite every shard that has dead rows and write the manifest"""
+        for person_id, entry in self.manifest['identities'].items():
+            if entry['offset'] > 0:
+                self._compact_entry(person_id, entry)
+        self._write_manifest()
+
+    def _compact_entry(self, person_id: str, entry: Dict):
+        """Rewrite one shard without its dead rows (under a new file name)"""
+        rows = self._map_rows(entry)
+        new_file = f"shard_{self.manifest['next_shard']}.bin"
+        new_path = os.path.join(self.root_dir, new_file)
+        with open(new_path, 'wb') as f:
+            f.write(np.ascontiguousarray(rows).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+        # Existing memory maps keep the old file's data until they are released
+        old_file = entry['file']
+        self.manifest['next_shard'] += 1
+        entry['file'] = new_file
+        entry['offset'] = 0
+        entry['count'] = rows.shape[0]
+        self._write_manifest()
+        self._unlink(old_file)
+        logger.info(f"Compacted face shard for person {person_id} ({entry['count']} samples)")
+
+    def _map_rows(self, entry: Dict) -> np.ndarray:
+        """Memory-map the live rows of a shard"""
+        shape = tuple(entry['shape'])
+        dtype = np.dtype(entry['dtype'])
+        path = os.path.join(self.root_dir, entry['file'])
+        if entry['count'] == 0 or not os.path.exists(path):
+            return np.empty((0,) + shape, dtype=dtype)
+
+        # Never map past the end of a truncated shard
+        available = os.path.getsize(path) // self._row_bytes(entry)
+        total = min(entry['offset'] + entry['count'], available)
+        if total < entry['offset'] + entry['count']:
+            logger.warning(f"Face shard {entry['file']} is truncated ({available} rows available)")
+        if total <= entry['offset']:
+            return np.empty((0,) + shape, dtype=dtype)
+
+        rows = np.memmap(path, dtype=dtype, mode='r', shape=(total,) + shape)
+        return rows[entry['offset']:]
+
+    @staticmethod
+    def _row_bytes(entry: Dict) -> int:
+        """Size in bytes of one record of a shard"""
+        return int(np.prod(entry['shape'])) * np.dtype(entry['dtype']).itemsize
+
+    def _read_manifest(self) -> Dict:
+        """Read the manifest, or return an empty one"""
+        if os.path.isfile(self.manifest_path):
+            try:
+                with open(self.manifest_path, 'r') as f:
+                    manifest = json.load(f)
+                if manifest.get('version') == MANIFEST_VERSION:
+                    return manifest
+                logger.error(f"Unsupported face store version in {self.manifest_path}")
+            except Exception as e:
+                logger.error(f"Error reading face store manifest: {e}")
+        return {'version': MANIFEST_VERSION, 'next_shard': 0, 'identities': {}}
+
+    def _write_manifest(self):
+        """Write the manifest to a temporary file and rename it into place"""
+        os.makedirs(self.root_dir, exist_ok=True)
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.manifest_path)
+
+    def _unlink(self, file_name: str):
+        """Delete a shard file if it exists"""
+        try:
+            os.remove(os.path.join(self.root_dir, file_name))
+        except FileNotFoundError:
+            pass
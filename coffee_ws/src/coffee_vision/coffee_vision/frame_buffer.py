@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+
+"""
+Frame ring buffer for the coffee vision pipeline.
+
+This module provides a preallocated N-slot ring of frames shared between the
+capture, processing and publishing threads. Every committed frame is tagged
+with a monotonic sequence number and its capture timestamp, so consumers can
+block until a newer frame exists instead of busy-polling a shared slot.
+
+Readers never take a lock to access frame data: they receive a view of the
+slot and can validate afterwards (seqlock style) that the writer has not
+recycled the slot while they were using it.
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class FramePacket:
+    """A committed frame together with its sequence number and capture time"""
+    sequence: int
+    timestamp: float
+    frame: np.ndarray
+
+
+class FrameRingBuffer:
+    """
+    Single-producer, multi-consumer ring buffer of preallocated frames.
+
+    Features:
+    - Preallocated slots reused in place (no per-frame allocation)
+    - Monotonic sequence numbers and capture timestamps per frame
+    - Blocking wait for "sequence > last seen" instead of polling
+    - Zero-copy reads with post-read validation
+    - Per-consumer counters for dropped and duplicated frames
+    """
+
+    # Slot sequence value while the writer is filling a slot
+    _WRITING = -1
+
+    def __init__(self, capacity: int = 4):
+        """
+        Initialize the ring buffer.
+
+        Args:
+            capacity: Number of frame slots (minimum 2)
+        """
+        self.capacity = max(2, int(capacity))
+
+        # Slot storage, allocated lazily once the frame shape is known
+        self._slots = [None] * self.capacity
+        self._slot_sequence = [0] * self.capacity
+        self._slot_timestamp = [0.0] * self.capacity
+
+        # Write state (single producer)
+        self._sequence = 0  # Last committed sequence number
+        self._pending_sequence = None
+
+        # Wake-up signalling for blocked consumers
+        self._cond = threading.Condition()
+        self._closed = False
+
+        # Statistics
+        self.frames_written = 0
+        self._consumers = {}  # consumer name -> counters
+
+    @property
+    def sequence(self) -> int:
+        """Sequence number of the most recently committed frame"""
+        return self._sequence
+
+    def begin_write(self, shape: Tuple[int, ...], dtype=np.uint8) -> np.ndarray:
+        """
+        Reserve the next slot for writing.
+
+        The slot is reallocated only if the frame shape or dtype changed
+        (e.g. after a quality switch). The caller fills the returned buffer
+        in place and then calls commit().
+
+        Args:
+            shape: Shape of the frame to be written
+            dtype: Frame dtype (default: uint8)
+
+        Returns:
+            Writable buffer for the next frame
+        """
+        sequence = self._sequence + 1
+        index = sequence % self.capacity
+
+        # Invalidate the slot before touching its contents so readers holding
+        # a view of the old frame can detect that it was recycled
+        self._slot_sequence[index] = self._WRITING
+
+        slot = self._slots[index]
+        if slot is None or slot.shape != tuple(shape) or slot.dtype != dtype:
+            slot = np.empty(shape, dtype=dtype)
+            self._slots[index] = slot
+
+        self._pending_sequence = sequence
+        return slot
+
+    def commit(self, timestamp: float) -> int:
+        """
+        Publish the slot reserved by begin_write() to consumers.
+
+        Args:
+            timestamp: Capture timestamp of the frame (seconds)
+
+        Returns:
+            Sequence number assigned to the frame
+        """
+        sequence = self._pending_sequence
+        if sequence is None:
+            raise RuntimeError("commit() called without begin_write()")
+
+        index = sequence % self.capacity
+        self._slot_timestamp[index] = timestamp
+        self._slot_sequence[index] = sequence
+        self._pending_sequence = None
+
+        with self._cond:
+            self._sequence = sequence
+            self.frames_written += 1
+            self._cond.notify_all()
+
+        return sequence
+
+    def abort_write(self):
+        """Abandon the slot reserved by begin_write() without publishing it"""
+        self._pending_sequence = None
+
+    def wait_for_next(
+        self,
+        last_sequence: int,
+        timeout: Optional[float] = None,
+        consumer: Optional[str] = None
+    ) -> Optional[FramePacket]:
+        """
+        Block until a frame newer than last_sequence is available.
+
+        Args:
+            last_sequence: Sequence number of the last frame the caller consumed
+            timeout: Maximum time to wait in seconds (None = wait forever)
+            consumer: Optional consumer name for drop statistics
+
+        Returns:
+            Newest FramePacket, or None on timeout or after close()
+        """
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self._closed or self._sequence > last_sequence,
+                timeout
+            )
+            if self._closed or self._sequence <= last_sequence:
+                return None
+            sequence = self._sequence
+
+            if consumer is not None:
+                stats = self._consumer_stats(consumer)
+                stats['read'] += 1
+                if last_sequence > 0:
+                    stats['dropped'] += sequence - last_sequence - 1
+                stats['last_sequence'] = sequence
+
+        return self._packet(sequence)
+
+    def latest(
+        self,
+        last_sequence: int = 0,
+        consumer: Optional[str] = None
+    ) -> Optional[FramePacket]:
+        """
+        Return the newest frame without blocking.
+
+        Args:
+            last_sequence: Sequence number of the last frame the caller consumed
+            consumer: Optional consumer name for duplicate statistics
+
+        Returns:
+            Newest FramePacket, or None if nothing has been committed yet
+        """
+        sequence = self._sequence
+        if sequence == 0:
+            return None
+
+        if consumer is not None:
+            with self._cond:
+                stats = self._consumer_stats(consumer)
+                stats['read'] += 1
+                if sequence <= last_sequence:
+                    stats['duplicated'] += 1
+                elif last_sequence > 0:
+                    stats['dropped'] += sequence - last_sequence - 1
+                stats['last_sequence'] = sequence
+
+        return self._packet(sequence)
+
+    def is_valid(self, packet: FramePacket) -> bool:
+        """
+        Check that a packet's slot has not been recycled by the writer.
+
+        Call this after finishing with a zero-copy frame view to confirm the
+        data that was read belongs to the packet's sequence number.
+        """
+        index = packet.sequence % self.capacity
+        return self._slot_sequence[index] == packet.sequence
+
+    def close(self):
+        """Wake all blocked consumers and stop serving frames"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def reopen(self):
+        """Resume serving frames after close() (sequence numbers keep growing)"""
+        with self._cond:
+            self._closed = False
+            self._consumers = {}
+
+    def get_stats(self) -> Dict:
+        """
+        Get buffer statistics.
+
+        Returns:
+            Dictionary with capacity, write count and per-consumer counters
+        """
+        with self._cond:
+            return {
+                'capacity': self.capacity,
+                'sequence': self._sequence,
+                'frames_written': self.frames_written,
+                'consumers': {
+                    name: dict(stats) for name, stats in self._consumers.items()
+                }
+            }
+
+    def _consumer_stats(self, consumer: str) -> Dict:
+        """Get (or create) the counters for a consumer"""
+        stats = self._consumers.get(consumer)
+        if stats is None:
+            stats = {'read': 0, 'dropped': 0, 'duplicated': 0, 'last_sequence': 0}
+            self._consumers[consumer] = stats
+        return stats
+
+    def _packet(self, sequence: int) -> Optional[FramePacket]:
+        """Build a packet for a committed sequence if its slot is still intact"""
+        index = sequence % self.capacity
+        frame = self._slots[index]
+        timestamp = self._slot_timestamp[index]
+        if frame is None or self._slot_sequence[index] != sequence:
+            return None
+        return FramePacket(sequence, timestamp, frame)
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+
+"""
+Compressed and preview frame streams for the camera nodes.
+
+Raw bgr8 frames at 1280x720 and 30 Hz are about 80 MB/s of DDS traffic,
+while most subscribers only need a preview. FrameStreamEncoder JPEG-encodes
+frames on a worker thread for a full-resolution compressed stream, and
+produces a downscaled, separately rate-limited preview stream. The publish
+thread hands frames over without waiting on the encoder: only the newest
+frame is kept, so a slow encode drops frames instead of adding latency.
+"""
+
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger("frame_streams")
+
+STREAM_COMPRESSED = 'compressed'
+STREAM_PREVIEW = 'preview'
+
+
+class FrameStreamEncoder:
+    """
+    Latest-wins JPEG encoder for the compressed and preview streams.
+
+    Features:
+    - Non-blocking submit() with a single pending slot (newer frames replace older)
+    - Full-resolution JPEG stream at the publish rate
+    - Downscaled preview stream with its own rate limit and JPEG quality
+    - Frames are only copied and encoded for streams that were requested
+    """
+
+    def __init__(self, publish_fn: Callable[[str, bytes, Any], None], jpeg_quality: int = 80,
+                 preview_width: int = 320, preview_rate: float = 5.0, preview_jpeg_quality: int = 70):
+        """
+        Initialize the encoder.
+
+        Args:
+            publish_fn: Called as publish_fn(stream, jpeg_bytes, stamp) on the
+                worker thread, with stream STREAM_COMPRESSED or STREAM_PREVIEW
+            jpeg_quality: JPEG quality of the full-resolution stream
+            preview_width: Width of preview frames in pixels (height keeps the aspect ratio)
+            preview_rate: Maximum preview frames per second (0 disables the preview)
+            preview_jpeg_quality: JPEG quality of the preview stream
+        """
+        self.publish_fn = publish_fn
+        self.jpeg_quality = jpeg_quality
+        self.preview_width = max(16, int(preview_width))
+        self.preview_rate = preview_rate
+        self.preview_jpeg_quality = preview_jpeg_quality
+
+        self._pending = None  # (full frame or None, preview frame or None, stamp, submit time, preview wanted)
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+        self._last_preview_time = 0.0
+
+        # Statistics
+        self.stats = {
+            'submitted': 0,
+            'dropped': 0,  # Pending frames replaced before they were encoded
+            'compressed_published': 0,
+            'preview_published': 0,
+            'compressed_bytes': 0,  # Size of the last compressed frame
+            'preview_bytes': 0,
+            'avg_encode_time': 0.0,
+            'avg_latency': 0.0  # Submit -> published (seconds)
+        }
+
+    def start(self):
+        """Start the encoder thread"""
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._encode_loop, name="frame_encoder", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        """Stop the encoder thread (a pending frame is discarded)"""
+        with self._cond:
+            self._running = False
+            self._pending = None
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def preview_due(self, now: Optional[float] = None) -> bool:
+        """Whether the preview rate limit allows another preview frame"""
+        if self.preview_rate <= 0:
+            return False
+        now = time.time() if now is None else now
+        return now - self._last_preview_time >= 1.0 / self.preview_rate
+
+    def submit(self, frame: np.ndarray, stamp: Any, compressed: bool = True, preview: bool = True) -> bool:
+        """
+        Hand a frame to the encoder. Never blocks on encoding.
+
+        The frame may be a reused buffer: it is copied (or downscaled) before
+        this returns, and only for the streams that will actually be encoded.
+
+        Args:
+            frame: BGR frame
+            stamp: Header stamp to publish the frame with
+            compressed: Encode the full-resolution compressed stream
+            preview: Encode a preview frame if the preview rate allows it
+
+        Returns:
+            True if anything was queued for encoding
+        """
+        now = time.time()
+        preview = preview and self.preview_due(now)
+        if frame is None or not (compressed or preview):
+            return False
+
+        full_frame = frame.copy() if compressed else None
+        preview_frame = None
+        if preview:
+            self._last_preview_time = now
+            if full_frame is None:
+                # Downscale here so only the small preview is kept
+                preview_frame = self._downscale(frame)
+
+        with self._cond:
+            if self._pending is not None:
+                self.stats['dropped'] += 1
+                # A replaced frame's preview is still owed - take it from the newer frame
+                if self._pending[4] and not preview:
+                    preview = True
+            self._pending = (full_frame, preview_frame, stamp, now, preview)
+            self.stats['submitted'] += 1
+            self._cond.notify_all()
+        return True
+
+    def get_stats(self) -> Dict:
+        """Get a copy of the encoder statistics"""
+        with self._cond:
+            stats = dict(self.stats)
+            stats['pending'] = self._pending is not None
+            return stats
+
+    def _downscale(self, frame: np.ndarray) -> np.ndarray:
+        """Resize a frame to the preview width, keeping the aspect ratio"""
+        height, width = frame.shape[:2]
+        if width <= self.preview_width:
+            return frame.copy()
+        preview_height = max(1, int(round(height * self.preview_width / width)))
+        return cv2.resize(frame, (self.preview_width, preview_height), interpolation=cv2.INTER_AREA)
+
+    def _encode(self, image: np.ndarray, quality: int) -> bytes:
+        """JPEG-encode an image"""
+        ok, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, int(quality)])
+        if not ok:
+            raise ValueError("Could not encode frame as JPEG")
+        return buffer.tobytes()
+
+    def _encode_loop(self):
+        """Encoder thread: encode and publish the newest pending frame"""
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending is not None or not self._running)
+                if not self._running:
+                    return
+                full_frame, preview_frame, stamp, submitted_at, preview = self._pending
+                self._pending = None
+
+            start_time = time.time()
+            try:
+                if full_frame is not None:
+                    data = self._encode(full_frame, self.jpeg_quality)
+                    self.publish_fn(STREAM_COMPRESSED, data, stamp)
+                    with self._cond:
+                        self.stats['compressed_published'] += 1
+                        self.stats['compressed_bytes'] = len(data)
+
+                if preview:
+                    if preview_frame is None:
+                        preview_frame = self._downscale(full_frame)
+                    data = self._encode(preview_frame, self.preview_jpeg_quality)
+                    self.publish_fn(STREAM_PREVIEW, data, stamp)
+                    with self._cond:
+                        self.stats['preview_published'] += 1
+                        self.stats['preview_bytes'] = len(data)
+            except Exception as e:
+                logger.error(f"Error encoding frame streams: {e}")
+
+            done = time.time()
+            with self._cond:
+                # Exponential moving averages
+                self.stats['avg_encode_time'] = 0.9 * self.stats['avg_encode_time'] + 0.1 * (done - start_time)
+                self.stats['avg_latency'] = 0.9 * self.stats['avg_latency'] + 0.1 * (done - submitted_at)
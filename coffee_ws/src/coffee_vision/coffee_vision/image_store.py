@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+
+"""
+Indexed on-disk image store with count and byte quotas.
+
+Stored face images are tracked in an insertion-ordered index (path, size,
+time) that is kept in memory and persisted as an append-only JSON-lines log.
+Enforcing retention evicts the oldest k files straight from the index
+instead of walking and sorting the whole directory tree.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+import collections
+from typing import Dict, Optional
+
+logger = logging.getLogger("image_store")
+
+
+class ImageStore:
+    """
+    Ordered index of stored images with retention limits.
+
+    Features:
+    - O(1) add and O(k) eviction of the k oldest images
+    - Count limit and total byte limit
+    - Index persisted as an append-only log, compacted when it grows
+    - One-time directory scan when no index exists yet
+    """
+
+    def __init__(self, root_dir: str, index_file: str, max_images: int = 1000,
+                 max_bytes: Optional[int] = None, extensions=('.jpg',)):
+        """
+        Initialize the store and load (or build) its index.
+
+        Args:
+            root_dir: Directory the images are stored under
+            index_file: Path of the persisted index log
+            max_images: Maximum number of images to keep
+            max_bytes: Maximum total size of the images in bytes (None = no limit)
+            extensions: File extensions indexed by the initial directory scan
+        """
+        self.root_dir = root_dir
+        self.index_file = index_file
+        self.max_images = max_images
+        self.max_bytes = max_bytes
+        self.extensions = tuple(extensions)
+
+        self._entries = collections.OrderedDict()  # relative path -> (size, timestamp)
+        self._total_bytes = 0
+        self._log_lines = 0
+        self._lock = threading.Lock()
+
+        # Statistics
+        self.evicted = 0
+
+        self._load_index()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def total_bytes(self) -> int:
+        """Total size of the indexed images in bytes"""
+        return self._total_bytes
+
+    def add(self, path: str, size: int, timestamp: Optional[float] = None) -> int:
+        """
+        Record a newly written image and enforce the retention limits.
+
+        Args:
+            path: Path of the image (under root_dir)
+            size: File size in bytes
+            timestamp: Time the image was written (default: now)
+
+        Returns:
+            Number of images evicted
+        """
+        key = self._key(path)
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= previous[0]  # Overwritten file
+            self._entries[key] = (size, timestamp)
+            self._total_bytes += size
+            self._append_log({'a': key, 's': size, 't': timestamp})
+            return self._enforce_locked()
+
+    def enforce_retention(self) -> int:
+        """
+        Evict the oldest images until the count and byte limits hold.
+
+        Returns:
+            Number of images evicted
+        """
+        with self._lock:
+            evicted = self._enforce_locked()
+            if self._log_lines > 2 * len(self._entries) + 100:
+                self._rewrite_index()
+            return evicted
+
+    def get_stats(self) -> Dict:
+        """Get store statistics"""
+        with self._lock:
+            return {
+                'images': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_images': self.max_images,
+                'max_bytes': self.max_bytes,
+                'evicted': self.evicted
+            }
+
+    def rebuild(self):
+        """Rebuild the index by scanning root_dir (oldest modification time first)"""
+        files = []
+        for root, dirs, names in os.walk(self.root_dir):
+            for name in names:
+                if name.endswith(self.extensions):
+                    full_path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(full_path)
+                    except OSError:
+                        continue
+                    files.append((stat.st_mtime, self._key(full_path), stat.st_size))
+        files.sort()
+
+        with self._lock:
+            self._entries = collections.OrderedDict(
+                (key, (size, mtime)) for mtime, key, size in files
+            )
+            self._total_bytes = sum(size for _, _, size in files)
+            self._rewrite_index()
+        logger.info(f"Indexed {len(files)} stored images under {self.root_dir}")
+
+    def _enforce_locked(self) -> int:
+        """Evict oldest entries while over a limit (caller holds the lock)"""
+        evicted = 0
+        while self._entries and (
+                len(self._entries) > self.max_images
+                or (self.max_bytes is not None and self._total_bytes > self.max_bytes)):
+            key, (size, _) = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                os.remove(os.path.join(self.root_dir, key))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Could not remove stored image {key}: {e}")
+            self._append_log({'d': key})
+            evicted += 1
+        self.evicted += evicted
+        return evicted
+
+    def _key(self, path: str) -> str:
+        """Index key of a path (relative to root_dir)"""
+        return os.path.relpath(os.path.abspath(path), os.path.abspath(self.root_dir))
+
+    def _load_index(self):
+        """Replay the index log, or scan the directory if there is none"""
+        if not os.path.isfile(self.index_file):
+            self.rebuild()
+            return
+
+        entries = collections.OrderedDict()
+        lines = 0
+        try:
+            with open(self.index_file, 'r') as f:
+                for line in f:
+                    lines += 1
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # Torn last line
+                    if 'a' in record:
+                        entries.pop(record['a'], None)
+                        entries[record['a']] = (record['s'], record['t'])
+                    elif 'd' in record:
+                        entries.pop(record['d'], None)
+        except Exception as e:
+            logger.error(f"Error reading image index {self.index_file}: {e}")
+            self.rebuild()
+            return
+
+        with self._lock:
+            self._entries = entries
+            self._total_bytes = sum(size for size, _ in entries.values())
+            self._log_lines = lines
+            if lines > 2 * len(entries) + 100:
+                self._rewrite_index()
+        logger.info(f"Loaded image index with {len(entries)} images ({self._total_bytes / 1e6:.1f} MB)")
+
+    def _append_log(self, record: Dict):
+        """Append one record to the index log (caller holds the lock)"""
+        try:
+            with open(self.index_file, 'a') as f:
+                f.write(json.dumps(record) + '\n')
+            self._log_lines += 1
+        except Exception as e:
+            logger.error(f"Error writing image index: {e}")
+
+    def _rewrite_index(self):
+        """Rewrite the index log with just the live entries (caller holds the lock)"""
+        try:
+            tmp_file = self.index_file + '.tmp'
+            with open(tmp_file, 'w') as f:
+                for key, (size, timestamp) in self._entries.items():
+                    f.write(json.dumps({'a': key, 's': size, 't': timestamp}) + '\n')
+            os.replace(tmp_file, self.index_file)
+            self._log_lines = len(self._entries)
+        except Exception as e:
+            logger.error(f"Error rewriting image index: {e}")
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+
+"""
+Write-behind image persistence for the coffee vision pipeline.
+
+Face images are saved for debugging and training, but encoding and writing
+a JPEG on a slow SD card can take tens of milliseconds. ImageWriter takes
+images on a bounded queue and writes them from a background thread, so the
+recognition path never waits on the disk.
+"""
+
+import os
+import time
+import logging
+import threading
+import collections
+from typing import Callable, Dict, Optional
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger("image_writer")
+
+
+class ImageWriter:
+    """
+    Bounded background image writer.
+
+    Features:
+    - Non-blocking submit() from any thread
+    - Bounded queue that drops the oldest pending image when full
+    - Files written in batches and synced together (one fsync pass per batch)
+    - Counters for queue depth, drops and write latency
+    """
+
+    def __init__(self, max_queue: int = 64, batch_size: int = 16, jpeg_quality: int = 90,
+                 on_write: Optional[Callable[[str, int], None]] = None):
+        """
+        Initialize the image writer.
+
+        Args:
+            max_queue: Maximum number of pending images before the oldest is dropped
+            batch_size: Maximum number of images written per fsync batch
+            jpeg_quality: JPEG quality for .jpg/.jpeg files
+            on_write: Optional callback(path, size_bytes) run on the writer
+                thread after each image is durably written
+        """
+        self.max_queue = max(1, max_queue)
+        self.batch_size = max(1, batch_size)
+        self.jpeg_quality = jpeg_quality
+        self.on_write = on_write
+
+        self._queue = collections.deque()
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+        self._writing = 0  # Images taken off the queue but not yet written
+
+        # Statistics
+        self.stats = {
+            'submitted': 0,
+            'written': 0,
+            'dropped': 0,
+            'failed': 0,
+            'queue_depth': 0,
+            'max_queue_depth': 0,
+            'batches': 0,
+            'last_latency': 0.0,  # Submit -> durable on disk (seconds)
+            'avg_latency': 0.0,
+            'max_latency': 0.0,
+            'avg_write_time': 0.0  # Encode + write + sync per image (seconds)
+        }
+
+    def start(self):
+        """Start the writer thread (started automatically by submit())"""
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._write_loop, daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """
+        Write the remaining images and stop the writer thread.
+
+        Args:
+            timeout: Maximum time to wait for pending writes in seconds
+        """
+        self.flush(timeout)
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def submit(self, path: str, image: np.ndarray) -> bool:
+        """
+        Queue an image to be written. Never blocks on the disk.
+
+        The caller must not modify the image afterwards (pass a copy if it
+        is a reused buffer).
+
+        Args:
+            path: Destination file path (the format follows the extension)
+            image: Image to write
+
+        Returns:
+            True if queued without dropping an older image
+        """
+        if image is None or image.size == 0:
+            return False
+
+        self.start()
+        dropped = False
+        with self._cond:
+            if len(self._queue) >= self.max_queue:
+                # Drop-oldest: the newest images are the most useful ones
+                self._queue.popleft()
+                self.stats['dropped'] += 1
+                dropped = True
+            self._queue.append((path, image, time.time()))
+            self.stats['submitted'] += 1
+            depth = len(self._queue)
+            self.stats['queue_depth'] = depth
+            self.stats['max_queue_depth'] = max(self.stats['max_queue_depth'], depth)
+            self._cond.notify_all()
+
+        if dropped:
+            logger.debug("Image write queue full, dropped the oldest pending image")
+        return not dropped
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until every queued image has been written.
+
+        Args:
+            timeout: Maximum time to wait in seconds (None = wait forever)
+
+        Returns:
+            True if the queue drained, False on timeout
+        """
+        with self._cond:
+            if self._thread is None:
+                return not self._queue
+            return self._cond.wait_for(lambda: not self._queue and self._writing == 0, timeout)
+
+    def get_stats(self) -> Dict:
+        """Get a copy of the writer statistics"""
+        with self._cond:
+            stats = dict(self.stats)
+            stats['queue_depth'] = len(self._queue)
+            return stats
+
+    def _write_loop(self):
+        """Writer thread: take batches off the queue and write them"""
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._queue or not self._running)
+                if not self._queue and not self._running:
+                    return
+                batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+                self._writing = len(batch)
+                self.stats['queue_depth'] = len(self._queue)
+
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                logger.error(f"Error in image writer: {e}")
+            finally:
+                with self._cond:
+                    self._writing = 0
+                    self._cond.notify_all()
+
+    def _write_batch(self, batch):
+        """Write a batch of images, then sync the files and their directories once"""
+        start_time = time.time()
+        written = []  # (path, size, submit time, file descriptor)
+        directories = set()
+
+        for path, image, submitted_at in batch:
+            try:
+                data = self._encode(path, image)
+                directory = os.path.dirname(path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+                try:
+                    # os.write may write fewer bytes than asked for
+                    view = memoryview(data)
+                    while view:
+                        view = view[os.write(fd, view):]
+                except Exception:
+                    os.close(fd)
+                    # Remove the truncated file so it is never indexed
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                    raise
+                written.append((path, len(data), submitted_at, fd))
+                directories.add(directory or '.')
+            except Exception as e:
+                logger.error(f"Error writing image {path}: {e}")
+                with self._cond:
+                    self.stats['failed'] += 1
+
+        # One sync pass for the whole batch; a failed sync must not leave the
+        # remaining files open or skip the batch statistics
+        synced = []
+        for entry in written:
+            path, _, _, fd = entry
+            try:
+                os.fsync(fd)
+                synced.append(entry)
+                continue
+            except OSError as e:
+                logger.error(f"Error syncing image {path}: {e}")
+                with self._cond:
+                    self.stats['failed'] += 1
+            finally:
+                try:
+                    os.close(fd)
+                except OSError as e:
+                    logger.error(f"Error closing image {path}: {e}")
+            # Not durable - remove it rather than leave a file the image index does not know
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        written = synced
+        for directory in directories:
+            try:
+                fd = os.open(directory, os.O_RDONLY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+            except OSError:
+                pass  # Directory sync is not supported everywhere
+
+        done = time.time()
+        with self._cond:
+            self.stats['batches'] += 1
+            for path, size, submitted_at, fd in written:
+                latency = done - submitted_at
+                self.stats['written'] += 1
+                self.stats['last_latency'] = latency
+                self.stats['max_latency'] = max(self.stats['max_latency'], latency)
+                # Exponential moving averages
+                self.stats['avg_latency'] = 0.9 * self.stats['avg_latency'] + 0.1 * latency
+            if written:
+                per_image = (done - start_time) / len(written)
+                self.stats['avg_write_time'] = 0.9 * self.stats['avg_write_time'] + 0.1 * per_image
+
+        if self.on_write is not None:
+            for path, size, submitted_at, fd in written:
+                try:
+                    self.on_write(path, size)
+                except Exception as e:
+                    logger.error(f"Error in image write callback: {e}")
+
+    def _encode(self, path: str, image: np.ndarray) -> bytes:
+        """Encode an image in the format given by the file extension"""
+        ext = os.path.splitext(path)[1].lower() or '.jpg'
+        params = []
+        if ext in ('.jpg', '.jpeg'):
+            params = [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality]
+        ok, buffer = cv2.imencode(ext, image, params)
+        if not ok:
+            raise ValueError(f"Could not encode image as {ext}")
+        return buffer.tobytes()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+
+"""
+Sampled process-memory monitor for the coffee vision nodes.
+
+Reading process memory through psutil on every admission check costs a
+Process object and several /proc reads per face. MemorySampler instead reads
+/proc/self/statm (and /proc/self/stat for CPU time) from a background thread
+on a fixed interval and keeps the latest value, the high-water marks and a
+bounded time series. Admission checks read the cached value for free.
+"""
+
+import os
+import time
+import logging
+import threading
+import collections
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger("memory_monitor")
+
+STATM_PATH = "/proc/self/statm"
+STAT_PATH = "/proc/self/stat"
+
+
+class MemorySampler:
+    """
+    Background sampler of the process's resident memory.
+
+    Features:
+    - Cached current RSS, readable from any thread without I/O
+    - Overall peak and a resettable peak (high-water marks)
+    - Bounded (timestamp, RSS MB) time series
+    - Process CPU usage from CPU time deltas between samples
+    """
+
+    def __init__(self, interval: float = 1.0, history_size: int = 600):
+        """
+        Initialize the sampler (call start() to begin sampling).
+
+        Args:
+            interval: Seconds between samples
+            history_size: Maximum number of samples kept in the time series
+        """
+        self.interval = interval
+        self.page_size = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+        self.clock_ticks = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+        self.available = os.path.isfile(STATM_PATH)
+
+        self.current_mb = 0.0
+        self.peak_mb = 0.0
+        self.window_peak_mb = 0.0  # Peak since the last reset_peak()
+        self.cpu_percent = 0.0
+        self.samples = 0
+        self.last_sample_time = 0.0
+
+        self._history = collections.deque(maxlen=max(1, history_size))
+        self._last_cpu = None  # (wall time, process CPU seconds)
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        if not self.available:
+            logger.warning(f"{STATM_PATH} not available, memory usage will read as 0 MB")
+
+    def start(self):
+        """Take a first sample and start the sampling thread"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._sample_loop, name="memory_sampler", daemon=True)
+        self.sample()
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        """Stop the sampling thread"""
+        self._stop_event.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout=timeout)
+        self._thread = None
+
+    def sample(self) -> float:
+        """
+        Read the current RSS now and record it.
+
+        Returns:
+            Resident memory in MB (0 if it cannot be read)
+        """
+        if not self.available:
+            return 0.0
+        try:
+            with open(STATM_PATH, 'r') as f:
+                resident_pages = int(f.read().split()[1])
+        except (OSError, ValueError, IndexError) as e:
+            logger.error(f"Error reading {STATM_PATH}: {e}")
+            return self.current_mb
+        memory_mb = resident_pages * self.page_size / (1024 * 1024)
+        now = time.time()
+        cpu_percent = self._sample_cpu(now)
+
+        with self._lock:
+            self.current_mb = memory_mb
+            self.peak_mb = max(self.peak_mb, memory_mb)
+            self.window_peak_mb = max(self.window_peak_mb, memory_mb)
+            if cpu_percent is not None:
+                self.cpu_percent = cpu_percent
+            self.samples += 1
+            self.last_sample_time = now
+            self._history.append((now, memory_mb))
+        return memory_mb
+
+    def reset_peak(self) -> float:
+        """
+        Start a new high-water mark window.
+
+        Returns:
+            Peak RSS in MB of the window that just ended
+        """
+        with self._lock:
+            peak = self.window_peak_mb
+            self.window_peak_mb = self.current_mb
+            return peak
+
+    def get_history(self, since: Optional[float] = None) -> List[Tuple[float, float]]:
+        """
+        Get the memory time series.
+
+        Args:
+            since: Only return samples taken after this time
+
+        Returns:
+            List of (timestamp, RSS MB) tuples, oldest first
+        """
+        with self._lock:
+            if since is None:
+                return list(self._history)
+            return [entry for entry in self._history if entry[0] > since]
+
+    def get_stats(self) -> Dict:
+        """Get the latest sampler values"""
+        with self._lock:
+            return {
+                'memory_mb': self.current_mb,
+                'peak_mb': self.peak_mb,
+                'window_peak_mb': self.window_peak_mb,
+                'cpu_percent': self.cpu_percent,
+                'samples': self.samples,
+                'last_sample_time': self.last_sample_time,
+                'interval': self.interval
+            }
+
+    def _sample_cpu(self, now: float) -> Optional[float]:
+        """Process CPU usage since the previous sample (None on the first sample)"""
+        try:
+            with open(STAT_PATH, 'r') as f:
+                # The command name may contain spaces - fields start after its ')'
+                fields = f.read().rsplit(')', 1)[1].split()
+            cpu_seconds = (int(fields[11]) + int(fields[12])) / self.clock_ticks  # utime + stime
+        except (OSError, ValueError, IndexError):
+            return None
+
+        previous = self._last_cpu
+        self._last_cpu = (now, cpu_seconds)
+        if previous is None or now <= previous[0]:
+            return None
+        return 100.0 * (cpu_seconds - previous[1]) / (now - previous[0])
+
+    def _sample_loop(self):
+        """Sampling thread: record a sample every interval"""
+        while not self._stop_event.wait(self.interval):
+            self.sample()
+
+
+_shared_sampler = None
+_shared_lock = threading.Lock()
+
+
+def get_memory_sampler(interval: float = 1.0) -> MemorySampler:
+    """
+    Get the process-wide memory sampler, starting it on first use.
+
+    Args:
+        interval: Sampling interval used if the sampler is created by this call
+
+    Returns:
+        The shared MemorySampler
+    """
+    global _shared_sampler
+    with _shared_lock:
+        if _shared_sampler is None:
+            _shared_sampler = MemorySampler(interval=interval)
+            _shared_sampler.start()
+        return _shared_sampler
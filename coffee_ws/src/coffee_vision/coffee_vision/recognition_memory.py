@@ -7,10 +7,19 @@ import time
 import json
 import pickle
 import threading
+import collections
+import contextlib
+from dataclasses import dataclass
 from datetime import datetime
+from types import MappingProxyType
+from typing import Any, Mapping, Optional
 import logging
 import hashlib
 
+from .face_embedding import FaceEmbedder, EmbeddingIndex, EmbeddingIndexView, SFACE_MATCH_THRESHOLD
+from .face_store import FaceShardStore
+from .face_detectors import create_detector, resolve_detector_name
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, 
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -33,18 +42,72 @@ except ImportError:
     DLIB_AVAILABLE = False
     logger.warning("dlib not available. Using OpenCV for face detection.")
 
+@dataclass(frozen=True)
+class RecognizerSnapshot:
+    """
+    One published generation of trained recognition models.
+
+    Snapshots are built by the training worker and swapped in atomically;
+    recognition only ever reads the current snapshot reference, so it never
+    waits on training. The label map and the Eigen/Fisher models of a
+    published snapshot are never modified. The primary (LBPH) model is
+    double-buffered: a retired generation's model is only brought up to date
+    for reuse after its last in-flight prediction has finished.
+    """
+    generation: int
+    recognizer: Optional['_RecognizerSlot']  # None for the embedding backend
+    eigen_recognizer: Any
+    fisher_recognizer: Any
+    label_map: Mapping[int, str]  # recognizer label -> person ID
+    trained_with_all_samples: bool  # True if no identity had enough samples
+    sample_count: int
+    build_time: float  # Seconds spent building this generation
+    built_at: float
+    embedding_index: Optional[EmbeddingIndexView] = None  # Embedding backend only
+
+
+class _RecognizerSlot:
+    """Primary recognizer model plus a count of in-flight predictions"""
+    
+    def __init__(self, model):
+        self.model = model
+        self.readers = 0
+
+
 class RecogniserBN:
     """
     Simplified version of RecognitionMemory's RecogniserBN class
     using OpenCV's face recognition instead of the original implementation.
+
+    Two recognizer backends are available:
+    - 'classic': LBPH (plus Eigenfaces/Fisherfaces when available)
+    - 'embedding': face embeddings from an ONNX model, matched against all
+      enrolled samples with one matrix-vector product
     """
     
-    def __init__(self):
+    def __init__(self, backend='classic', models_dir=None, detector=None,
+                 dnn_backend='auto', dnn_target='auto'):
+        """
+        Initialize the recognizer.
+
+        Args:
+            backend: Recognizer backend, 'classic' or 'embedding'
+            models_dir: Directory for the embedding model (default: package models dir)
+            detector: Face detector backend ('ssd', 'yunet', 'haar', 'dlib_hog', or
+                'auto' for the benchmarked choice; default: dlib HOG if available, else Haar)
+            dnn_backend: OpenCV DNN backend for network detectors
+            dnn_target: OpenCV DNN target for network detectors
+        """
         # Face recognition parameters
-        self.face_recognizer = None
         self.face_detector = None
+        self.shape_predictor = None
+        self._detector_lock = threading.Lock()  # Detectors are not safe to share between threads
+        self.recognizer_type = None
+        self.face_embedder = None
         self.face_db = {}  # id -> face encoding
-        self.init_face_recognition()
+        self.min_face_size = (60, 60)     # Minimum face size to detect
+        self.init_face_detection(detector, models_dir, dnn_backend, dnn_target)
+        self.init_face_recognition(backend, models_dir)
         
         # Recognition data
         self.identity_est = ""
@@ -57,7 +120,9 @@ class RecogniserBN:
         self.image_save_dir = "faces/"
         self.db_file = "db.csv"
         self.face_db_file = "faceDB"
+        self.model_file = None              # Saved model metadata (see saveModel)
         self.image_to_copy = None
+        self.image_writer = None  # Optional ImageWriter - face images are written inline without one
         
         # People database
         self.people = []
@@ -73,19 +138,91 @@ class RecogniserBN:
         # Face recognition thresholds - adjusted for better recognition
         self.recognition_threshold = 0.3  # Confidence threshold for recognition - lowered to recognize more faces
         self.new_face_threshold = 0.15    # Threshold to create a new face ID (must be below this)
-        self.min_face_size = (60, 60)     # Minimum face size to detect
+        self.embedding_match_similarity = SFACE_MATCH_THRESHOLD  # Cosine similarity mapped to recognition_threshold
+        self.top_k = 5                    # Candidates kept from an embedding search
+        self.top_candidates = []          # (person_id, confidence) of the last embedding search
         
         # Learning parameters
         self.min_samples_for_learning = 5   # Minimum number of samples to start robust learning
         self.max_samples_per_identity = 100 # Maximum samples to store per identity
         self.face_counts = {}               # Count of how many times each face has been recognized
+        
+        # Published model generation (swapped atomically by the training worker)
+        self._snapshot = None
+        self.generation = 0
+        self.generation_stats = collections.deque(maxlen=50)  # Recent generations
+        
+        # Incremental training state - LBPH is updated per sample, Eigen/Fisher
+        # and the full rebuild (needed to drop replaced samples) are deferred
+        self.stale_samples = 0              # Samples removed from the DB but still in LBPH
+        self.deferred_retrain_batch = 25    # Retrain deferred models after this many new samples
+        self.deferred_retrain_interval = 60.0  # ... or after this many seconds with pending samples
+        self._pending_updates = []          # (person_id, face) samples not yet in a generation
+        self._pending_backup_samples = 0    # Samples not yet in the Eigen/Fisher models
+        self._last_backup_train_time = 0.0
+        self._full_rebuild_requested = False
+        self._backup_retrain_requested = False
+        
+        # Spare primary model (the retired generation's) and the sample
+        # batches it still has to replay before it can be published again
+        self._spare_slot = None
+        self._spare_backlog = []
+        self._spare_training_set = None     # Training set of the last full build
+        
+        # Embedding backend - all enrolled embeddings, appended to by the training worker
+        self._embedding_index = None
+        
+        # Sharded face storage - changes since the last save (guarded by _db_lock)
+        self._face_store = None
+        self._unsaved_samples = {}          # person ID -> faces not yet on disk
+        self._unsaved_drops = {}            # person ID -> oldest samples removed since the last save
+        self.db_save_interval = 10.0        # Training worker saves unsaved samples this often (seconds)
+        self._last_db_save = 0.0
+        
+        # Saved model state - content hash of the face DB the published
+        # generation was trained on, and the last generation written to disk
+        self._model_db_hash = None
+        self._saved_generation = None
+        
+        # Threading - face_db and the pending queues are guarded by _db_lock
+        self.background_training = True     # False = build generations inline
+        self._db_lock = threading.RLock()
+        self._train_cond = threading.Condition(self._db_lock)
+        self._reader_cond = threading.Condition()
+        self._save_lock = threading.Lock()  # One saveModel at a time
+        self._training_thread = None
+        self._training_running = False
+        self._training_busy = False
     
-    def init_face_recognition(self):
-        """Initialize OpenCV face recognition"""
-        # First initialize face detector
+    def init_face_detection(self, detector=None, models_dir=None, dnn_backend='auto', dnn_target='auto'):
+        """
+        Initialize the face detector backend and, with dlib, the landmark predictor.
+
+        Args:
+            detector: Detector backend name, 'auto', or None for the default
+            models_dir: Directory for detector models (default: package models dir)
+            dnn_backend: OpenCV DNN backend for network detectors
+            dnn_target: OpenCV DNN target for network detectors
+        """
+        default_detector = 'dlib_hog' if DLIB_AVAILABLE else 'haar'
+        name = resolve_detector_name(detector or default_detector, default=default_detector,
+                                     models_dir=models_dir)
+        try:
+            self.face_detector = create_detector(name, models_dir=models_dir, min_face_size=self.min_face_size,
+                                                 dnn_backend=dnn_backend, dnn_target=dnn_target)
+            if not self.face_detector.available and name != default_detector:
+                logger.warning(f"Face detector '{name}' not available, using '{default_detector}'")
+                self.face_detector = create_detector(default_detector, models_dir=models_dir,
+                                                     min_face_size=self.min_face_size)
+            if self.face_detector.available:
+                logger.info(f"Using {self.face_detector.describe()} face detector")
+            else:
+                self.face_detector = None
+        except Exception as e:
+            logger.error(f"Error initializing face detector: {e}")
+            self.face_detector = None
+
         if DLIB_AVAILABLE:
-            # Use dlib's face detector (better quality)
-            self.face_detector = dlib.get_frontal_face_detector()
             try:
                 # Try to load dlib's shape predictor for face landmarks
                 model_path = os.path.join(os.path.dirname(__file__), 'shape_predictor_68_face_landmarks.dat')
@@ -98,31 +235,32 @@ class RecogniserBN:
             except Exception as e:
                 logger.error(f"Error loading dlib shape predictor: {e}")
                 self.shape_predictor = None
-        else:
-            # Use OpenCV's face detector as fallback
-            try:
-                self.face_detector = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-                logger.info("Using OpenCV Haar Cascade face detector")
-            except Exception as e:
-                logger.error(f"Error initializing OpenCV face detector: {e}")
-                
-        # Then initialize face recognition
+
+    def init_face_recognition(self, backend='classic', models_dir=None):
+        """Initialize OpenCV face recognition"""
+        if backend == 'embedding':
+            self.face_embedder = FaceEmbedder(models_dir)
+            if self.face_embedder.available:
+                self.recognizer_type = 'embedding'
+                self.use_multimodel = False
+                logger.info("Using embedding face recognizer")
+                return
+            logger.warning("Face embedding model not available, falling back to classic recognizer")
+            self.face_embedder = None
+        elif backend != 'classic':
+            logger.warning(f"Unknown recognizer backend '{backend}', using classic recognizer")
+        
         if FACE_RECOGNITION_AVAILABLE:
             try:
                 # LBPH is more robust for different lighting conditions
-                self.face_recognizer = cv2_face.LBPHFaceRecognizer_create(
-                    radius=1,          # Radius for local binary pattern
-                    neighbors=8,       # Number of neighbors
-                    grid_x=8,          # Grid size X
-                    grid_y=8,          # Grid size Y
-                    threshold=100.0    # Default threshold (we'll adjust this)
-                )
+                self.recognizer_type = 'lbph'
+                self._create_recognizer()
                 logger.info("Using OpenCV LBPH face recognizer")
                 
                 # Try to load Eigenfaces and Fisherfaces as backups
                 try:
-                    self.eigen_recognizer = cv2_face.EigenFaceRecognizer_create()
-                    self.fisher_recognizer = cv2_face.FisherFaceRecognizer_create()
+                    cv2_face.EigenFaceRecognizer_create()
+                    cv2_face.FisherFaceRecognizer_create()
                     logger.info("Loaded additional face recognizers")
                     self.use_multimodel = True
                 except:
@@ -138,9 +276,27 @@ class RecogniserBN:
     def fallback_recognizer_init(self):
         """Initialize a simple histogram-based face recognizer as fallback"""
         # We'll use a simple histogram comparison as fallback
-        self.face_recognizer = SimpleFaceRecognizer()
+        self.recognizer_type = 'simple'
         self.use_multimodel = False
     
+    def _create_recognizer(self):
+        """Create a new, untrained primary recognizer"""
+        if self.recognizer_type == 'lbph':
+            return cv2_face.LBPHFaceRecognizer_create(
+                radius=1,          # Radius for local binary pattern
+                neighbors=8,       # Number of neighbors
+                grid_x=8,          # Grid size X
+                grid_y=8,          # Grid size Y
+                threshold=100.0    # Default threshold (we'll adjust this)
+            )
+        return SimpleFaceRecognizer()
+    
+    @property
+    def label_map(self):
+        """Label map (recognizer label -> person ID) of the published generation"""
+        snapshot = self._snapshot
+        return snapshot.label_map if snapshot is not None else {}
+    
     def setFilePaths(self, recog_folder):
         """Set paths for database and image storage"""
         self.recog_folder = recog_folder
@@ -198,86 +354,767 @@ class RecogniserBN:
         # Load face recognition database
         self.loadFaceRecognitionDB()
     
+    def _get_face_store(self):
+        """Get the sharded store for the current face database path"""
+        root_dir = self.face_db_file + ".shards"
+        if self._face_store is None or self._face_store.root_dir != root_dir:
+            self._face_store = FaceShardStore(root_dir)
+        return self._face_store
+    
+    def faceDetectionDBExists(self, facedb=None):
+        """Check whether a face database (sharded or legacy pickle) exists"""
+        face_db_file = os.path.join(self.recog_folder, facedb) if facedb else self.face_db_file
+        return (os.path.isfile(os.path.join(face_db_file + ".shards", "manifest.json"))
+                or os.path.isfile(face_db_file))
+    
+    def _migrate_pickled_db(self, store):
+        """Load a legacy pickled face database and write it to the sharded store"""
+        logger.info(f"Migrating pickled face database {self.face_db_file} to {store.root_dir}")
+        with open(self.face_db_file, 'rb') as f:
+            face_db = pickle.load(f)
+        for person_id, samples in face_db.items():
+            store.append(person_id, samples)
+        store.commit()
+        return face_db
+    
     def loadFaceRecognitionDB(self):
         """Load face recognition database"""
-        if os.path.exists(self.face_db_file):
+        store = self._get_face_store()
+        if store.exists() or os.path.exists(self.face_db_file):
             try:
-                logger.info(f"Loading face database from {self.face_db_file}")
-                with open(self.face_db_file, 'rb') as f:
-                    self.face_db = pickle.load(f)
+                logger.info(f"Loading face database from {store.root_dir}")
+                if store.exists():
+                    # Samples are memory-mapped views into the shard files
+                    face_db = store.load()
+                else:
+                    face_db = self._migrate_pickled_db(store)
+                with self._db_lock:
+                    self.face_db = face_db
+                    self._unsaved_samples = {}
+                    self._unsaved_drops = {}
                     
-                # If we have labeled faces, train the recognizer
+                # If we have labeled faces, restore the saved model or train the
+                # recognizer. Wait for the first generation so known people are
+                # recognized right away.
                 if self.face_db:
-                    self._train_recognizer_from_db()
-                    logger.info(f"Face recognition model trained with {sum(len(faces) for faces in self.face_db.values())} faces")
+                    db_hash = self._face_db_hash(face_db)
+                    if self._snapshot is not None and db_hash == self._model_db_hash:
+                        logger.info("Face recognition model is up to date with the face database")
+                    elif not self._restore_saved_model(face_db, db_hash):
+                        self.request_full_rebuild()
+                        self.wait_for_training()
+                        self._model_db_hash = db_hash
+                        logger.info(f"Face recognition model trained with {sum(len(faces) for faces in self.face_db.values())} faces")
             except Exception as e:
                 logger.error(f"Error loading face recognition DB: {e}")
                 # Initialize empty database
-                self.face_db = {}
+                with self._db_lock:
+                    self.face_db = {}
         else:
             logger.info(f"No face database found at {self.face_db_file}, initializing empty DB")
-            self.face_db = {}
+            with self._db_lock:
+                self.face_db = {}
+    
+    def _face_db_hash(self, face_db):
+        """Content hash of a face database (identities and sample bytes, in order)"""
+        digest = hashlib.sha1()
+        for person_id in sorted(face_db):
+            digest.update(f"{person_id}\0{len(face_db[person_id])}\0".encode())
+            for face in face_db[person_id]:
+                digest.update(f"{face.shape}{face.dtype.str}".encode())
+                digest.update(np.ascontiguousarray(face).data)
+        return digest.hexdigest()
+    
+    def saveModel(self, model_file=None, timeout=5.0):
+        """
+        Save the published model generation next to a metadata file.
+
+        The metadata records the label map, training state and a content
+        hash of the face database, so loadFaceRecognitionDB can restore the
+        model instead of retraining when the database has not changed.
+        Nothing is written if the generation was already saved, or if
+        another save is still running.
+
+        Args:
+            model_file: Path of the metadata file; model files are written
+                beside it (default: the path given to loadModel/saveModel)
+            timeout: Maximum time to wait for queued training in seconds
+
+        Returns:
+            True if a model was saved
+        """
+        if model_file:
+            self.model_file = model_file
+        if not self.model_file:
+            return False
+        
+        # Saves take seconds; skip instead of queueing behind a running one
+        if not self._save_lock.acquire(blocking=False):
+            logger.debug("A model save is already running, skipping this one")
+            return False
+        try:
+            return self._save_model(timeout)
+        finally:
+            self._save_lock.release()
     
-    def _train_recognizer_from_db(self):
-        """Train face recognizer from the database"""
-        if not self.face_db:
+    def _save_model(self, timeout):
+        """Write the model files and metadata (caller holds _save_lock)"""
+        # Make sure the saved database and the model describe the same samples
+        self.saveFaceRecognitionDB()
+        self.flush_pending_training()
+        self.wait_for_training(timeout)
+        
+        with self._db_lock:
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.generation == self._saved_generation:
+                return False
+            if (self._training_busy or self._pending_updates
+                    or self._unsaved_samples or self._unsaved_drops):
+                logger.debug("Face database changed while saving the model, will save later")
+                return False
+            db_hash = self._face_db_hash(self.face_db)
+            stale = self.stale_samples
+            pending_backup = self._pending_backup_samples
+        
+        model_dir = os.path.dirname(self.model_file)
+        if model_dir:
+            os.makedirs(model_dir, exist_ok=True)
+        
+        # Every save writes new files so the metadata never points at a partial write
+        prefix = f"{self.model_file}.{snapshot.generation}-{int(snapshot.built_at * 1000)}"
+        files = {}
+        if snapshot.embedding_index is not None:
+            index = snapshot.embedding_index
+            files['embeddings'] = prefix + ".embeddings.npz"
+            np.savez(files['embeddings'], matrix=index.matrix, labels=index.labels,
+                     person_ids=np.array(index.person_ids, dtype=str))
+        elif self.recognizer_type == 'lbph':
+            files['recognizer'] = prefix + ".lbph.yml"
+            with self._reading() as current:
+                if current is not snapshot:
+                    logger.debug("Model generation changed while saving the model, will save later")
+                    return False
+                current.recognizer.model.write(files['recognizer'])
+        else:
+            logger.info(f"Saving the '{self.recognizer_type}' recognizer is not supported")
+            return False
+        
+        if snapshot.eigen_recognizer is not None:
+            files['eigen'] = prefix + ".eigen.yml"
+            files['fisher'] = prefix + ".fisher.yml"
+            snapshot.eigen_recognizer.write(files['eigen'])
+            snapshot.fisher_recognizer.write(files['fisher'])
+        
+        metadata = {
+            'version': 1,
+            'recognizer_type': self.recognizer_type,
+            'db_hash': db_hash,
+            'generation': snapshot.generation,
+            'label_map': {str(label): person_id for label, person_id in snapshot.label_map.items()},
+            'trained_with_all_samples': snapshot.trained_with_all_samples,
+            'sample_count': snapshot.sample_count,
+            'stale_samples': stale,
+            'pending_backup_samples': pending_backup,
+            'files': {name: os.path.basename(path) for name, path in files.items()}
+        }
+        previous = self._read_model_metadata()
+        tmp_file = self.model_file + ".tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(metadata, f, indent=2)
+        os.replace(tmp_file, self.model_file)
+        
+        # Remove the files of the previously saved generation
+        if previous:
+            for name in previous.get('files', {}).values():
+                if name not in metadata['files'].values():
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(os.path.join(model_dir, name))
+        
+        self._saved_generation = snapshot.generation
+        self._model_db_hash = db_hash
+        logger.info(f"Saved face recognition model generation {snapshot.generation} to {self.model_file}")
+        return True
+    
+    def loadModel(self, model_file):
+        """
+        Set the saved model to restore when the face database is loaded.
+
+        If a database is already loaded, the model is restored right away.
+
+        Args:
+            model_file: Path of the metadata file written by saveModel
+
+        Returns:
+            True if a model was restored
+        """
+        self.model_file = model_file
+        with self._db_lock:
+            face_db = {person_id: list(samples) for person_id, samples in self.face_db.items()}
+        if not face_db:
+            return False
+        return self._restore_saved_model(face_db, self._face_db_hash(face_db))
+    
+    def _read_model_metadata(self):
+        """Read the saved model metadata, or None if there is none"""
+        if not self.model_file or not os.path.isfile(self.model_file):
+            return None
+        try:
+            with open(self.model_file, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error(f"Error reading face model metadata: {e}")
+            return None
+    
+    def _restore_saved_model(self, face_db, db_hash):
+        """
+        Publish the saved model if it was trained on this face database.
+
+        Returns:
+            True if the saved model was restored
+        """
+        metadata = self._read_model_metadata()
+        if metadata is None:
+            return False
+        if metadata.get('version') != 1 or metadata.get('recognizer_type') != self.recognizer_type:
+            logger.info("Saved face model does not match the configured recognizer, retraining")
+            return False
+        if metadata.get('db_hash') != db_hash:
+            logger.info("Face database changed since the model was saved, retraining")
             return False
+        
+        start_time = time.time()
+        model_dir = os.path.dirname(self.model_file)
+        files = {name: os.path.join(model_dir, path) for name, path in metadata['files'].items()}
+        label_map = {int(label): person_id for label, person_id in metadata['label_map'].items()}
+        try:
+            recognizer = None
+            embedding_index = None
+            if 'embeddings' in files:
+                with np.load(files['embeddings']) as data:
+                    matrix = data['matrix']
+                    labels = data['labels']
+                    person_ids = [str(person_id) for person_id in data['person_ids']]
+                embedding_index = EmbeddingIndex(matrix.shape[1], capacity=max(256, 2 * len(matrix)))
+                for label, person_id in enumerate(person_ids):
+                    embedding_index.add(person_id, matrix[labels == label])
+            else:
+                recognizer = self._create_recognizer()
+                recognizer.read(files['recognizer'])
+            
+            eigen = fisher = None
+            if 'eigen' in files and self.use_multimodel:
+                eigen = cv2_face.EigenFaceRecognizer_create()
+                fisher = cv2_face.FisherFaceRecognizer_create()
+                eigen.read(files['eigen'])
+                fisher.read(files['fisher'])
+        except Exception as e:
+            logger.error(f"Error loading saved face model: {e}")
+            return False
+        
+        with self._db_lock:
+            self.stale_samples = metadata.get('stale_samples', 0)
+            self._pending_backup_samples = metadata.get('pending_backup_samples', 0)
+            self._last_backup_train_time = time.time()
+            self._spare_slot = None
+            self._spare_backlog = []
             
+            if embedding_index is not None:
+                self._embedding_index = embedding_index
+                self._publish_embedding_snapshot(embedding_index, 'restored', start_time)
+            else:
+                # The spare primary model is trained lazily from the restored label map
+                faces = []
+                labels = []
+                for label, person_id in label_map.items():
+                    for face in face_db.get(person_id, []):
+                        faces.append(face)
+                        labels.append(label)
+                self._spare_training_set = (faces, labels) if hasattr(recognizer, 'update') else None
+                self._publish_snapshot(_RecognizerSlot(recognizer), eigen, fisher, label_map,
+                                       metadata.get('trained_with_all_samples', False),
+                                       metadata.get('sample_count', len(faces)), 'restored', start_time)
+            self._model_db_hash = db_hash
+            self._saved_generation = self.generation
+        
+        logger.info(f"Restored saved face recognition model ({len(label_map)} people) "
+                    f"in {(time.time() - start_time) * 1000:.1f} ms")
+        return True
+    
+    def _collect_training_set(self, face_db):
+        """
+        Build the full training set from a copy of the face database.
+
+        Returns:
+            Tuple of (faces, labels, label_map, trained_with_all_samples)
+        """
+        faces = []
+        labels = []
+        label_map = {}
+        next_label = 0
+        
+        # Filter out identities with too few samples
+        filtered_face_db = {}
+        for person_id, encodings in face_db.items():
+            if len(encodings) >= self.min_samples_for_learning:
+                filtered_face_db[person_id] = encodings
+            else:
+                logger.debug(f"Skipping person {person_id} for training - only {len(encodings)} samples")
+        
+        # If we don't have any identities with enough samples, use all samples
+        all_samples = False
+        if not filtered_face_db and face_db:
+            logger.info("No identities have sufficient samples, using all available faces")
+            filtered_face_db = face_db
+            all_samples = True
+        
+        for person_id, encodings in filtered_face_db.items():
+            if encodings:
+                label_map[next_label] = person_id
+                for encoding in encodings:
+                    faces.append(encoding)
+                    labels.append(next_label)
+                next_label += 1
+        
+        return faces, labels, label_map, all_samples
+    
+    def _build_full_generation(self, face_db, start_time):
+        """Train every model from scratch on a copy of the face database"""
+        faces, labels, label_map, all_samples = self._collect_training_set(face_db)
+        if len(faces) < 2:  # Need at least 2 faces to train
+            return False
+        
+        # Train the main recognizer
+        logger.info(f"Training face recognizer with {len(faces)} faces from {len(label_map)} people")
+        recognizer = self._create_recognizer()
+        recognizer.train(faces, np.array(labels))
+        
+        # Train backup recognizers if available
+        eigen, fisher = self._train_backup_recognizers(faces, labels)
+        
+        # The spare primary model is trained lazily from the same set
+        self._spare_slot = None
+        self._spare_backlog = []
+        self._spare_training_set = (faces, labels) if hasattr(recognizer, 'update') else None
+        self._pending_backup_samples = 0
+        self._last_backup_train_time = time.time()
+        
+        self._publish_snapshot(_RecognizerSlot(recognizer), eigen, fisher, label_map,
+                               all_samples, len(faces), 'full', start_time)
+        return True
+    
+    def _build_incremental_generation(self, snapshot, face_db, updates, force_backup, start_time):
+        """
+        Publish a generation that adds new samples to the previous one.
+
+        LBPH is updated with just the new samples, so the cost does not depend
+        on the size of the database. The update goes into the spare model
+        (after it replays what it missed), never into the published one.
+        Eigenfaces/Fisherfaces cannot be updated and are rebuilt in batches.
+        """
+        label_map = dict(snapshot.label_map)
+        person_labels = {person_id: label for label, person_id in label_map.items()}
+        faces = []
+        labels = []
+        added_identities = set()
+        
+        for person_id, face in updates:
+            if person_id in added_identities:
+                continue  # All of this identity's samples were added below
+            label = person_labels.get(person_id)
+            if label is not None:
+                # Known identity - add just the new sample
+                faces.append(face)
+                labels.append(label)
+            elif len(face_db.get(person_id, [])) >= self.min_samples_for_learning:
+                # Identity just reached enough samples - add all of them under a new label
+                label = max(label_map, default=-1) + 1
+                samples = face_db[person_id]
+                faces.extend(samples)
+                labels.extend([label] * len(samples))
+                label_map[label] = person_id
+                person_labels[person_id] = label
+                added_identities.add(person_id)
+                logger.info(f"Added person {person_id} to recognizer with {len(samples)} samples")
+            # Otherwise not enough samples yet - a full retrain would skip this identity too
+        
+        recognizer = snapshot.recognizer
+        sample_count = snapshot.sample_count
+        if faces:
+            recognizer = self._take_spare_slot()
+            batches = self._spare_backlog + [(faces, labels)]
+            for batch_faces, batch_labels in batches:
+                recognizer.model.update(batch_faces, np.array(batch_labels))
+            
+            # The retired model becomes the spare and has to catch up on this batch
+            self._spare_slot = snapshot.recognizer
+            self._spare_backlog = [(faces, labels)]
+            self._pending_backup_samples += len(faces)
+            sample_count += len(faces)
+        
+        eigen = snapshot.eigen_recognizer
+        fisher = snapshot.fisher_recognizer
+        if self._pending_backup_samples > 0:
+            batch_full = self._pending_backup_samples >= self.deferred_retrain_batch
+            interval_elapsed = time.time() - self._last_backup_train_time > self.deferred_retrain_interval
+            if force_backup or batch_full or interval_elapsed:
+                logger.info(f"Retraining deferred face models with {self._pending_backup_samples} new samples")
+                backup_faces = []
+                backup_labels = []
+                for person_id, label in person_labels.items():
+                    for face in face_db.get(person_id, []):
+                        backup_faces.append(face)
+                        backup_labels.append(label)
+                eigen, fisher = self._train_backup_recognizers(backup_faces, backup_labels)
+                self._pending_backup_samples = 0
+                self._last_backup_train_time = time.time()
+        
+        if recognizer is snapshot.recognizer and eigen is snapshot.eigen_recognizer:
+            return False  # Nothing changed
+        
+        self._publish_snapshot(recognizer, eigen, fisher, label_map,
+                               False, sample_count, 'incremental', start_time)
+        return True
+    
+    def _build_full_embedding_generation(self, face_db, start_time):
+        """Embed every sample in the face database into a new embedding index"""
+        # Embeddings work from a single sample, so no identity is filtered out
+        sample_count = sum(len(samples) for samples in face_db.values())
+        if sample_count == 0:
+            return False
+        
+        logger.info(f"Embedding {sample_count} faces from {len(face_db)} people")
+        index = EmbeddingIndex(self.face_embedder.embedding_size, capacity=max(256, 2 * sample_count))
+        for person_id, samples in face_db.items():
+            if samples:
+                index.add(person_id, self.face_embedder.embed_batch(samples))
+        
+        self._embedding_index = index
+        self._publish_embedding_snapshot(index, 'full', start_time)
+        return True
+    
+    def _build_incremental_embedding_generation(self, updates, start_time):
+        """Append embeddings of just the new samples to the embedding index"""
+        if not updates:
+            return False
+        
+        index = self._embedding_index
+        for person_id, face in updates:
+            index.add(person_id, self.face_embedder.embed(face))
+        
+        self._publish_embedding_snapshot(index, 'incremental', start_time)
+        return True
+    
+    def _publish_embedding_snapshot(self, index, kind, start_time):
+        """Publish a view of the embedding index as a new generation"""
+        view = index.view()
+        label_map = dict(enumerate(view.person_ids))
+        self._publish_snapshot(None, None, None, label_map, False, len(view), kind, start_time,
+                               embedding_index=view)
+    
+    def _take_spare_slot(self):
+        """Get the spare primary model, ready to be updated"""
+        slot = self._spare_slot
+        if slot is None:
+            # First incremental step after a full build - train the second buffer
+            faces, labels = self._spare_training_set
+            model = self._create_recognizer()
+            model.train(faces, np.array(labels))
+            self._spare_training_set = None
+            return _RecognizerSlot(model)
+        
+        # Wait for predictions still running on the retired generation
+        with self._reader_cond:
+            self._reader_cond.wait_for(lambda: slot.readers == 0)
+        return slot
+    
+    def _train_backup_recognizers(self, faces, labels):
+        """
+        Train new Eigenfaces and Fisherfaces models (these do not support update()).
+
+        Returns:
+            Tuple of (eigen, fisher) models, or (None, None) if unavailable
+        """
+        if not (hasattr(self, 'use_multimodel') and self.use_multimodel and len(set(labels)) > 1):
+            return None, None
+        
+        try:
+            # Resize faces to 100x100 for Eigenfaces and Fisherfaces
+            resized_faces = [cv2.resize(face, (100, 100)) for face in faces]
+            eigen = cv2_face.EigenFaceRecognizer_create()
+            fisher = cv2_face.FisherFaceRecognizer_create()
+            eigen.train(resized_faces, np.array(labels))
+            fisher.train(resized_faces, np.array(labels))
+            return eigen, fisher
+        except Exception as e:
+            logger.error(f"Error training backup recognizers: {e}")
+            return None, None
+    
+    def _publish_snapshot(self, recognizer, eigen, fisher, label_map, all_samples, sample_count, kind, start_time,
+                          embedding_index=None):
+        """Swap in a new model generation and record how long it took to build"""
+        build_time = time.time() - start_time
+        snapshot = RecognizerSnapshot(
+            generation=self.generation + 1,
+            recognizer=recognizer,
+            eigen_recognizer=eigen,
+            fisher_recognizer=fisher,
+            label_map=MappingProxyType(dict(label_map)),
+            trained_with_all_samples=all_samples,
+            sample_count=sample_count,
+            build_time=build_time,
+            built_at=time.time(),
+            embedding_index=embedding_index
+        )
+        
+        # Single reference assignment - readers see either the old or the new generation
+        self._snapshot = snapshot
+        self.generation = snapshot.generation
+        self.generation_stats.append({
+            'generation': snapshot.generation,
+            'kind': kind,
+            'build_time': build_time,
+            'samples': sample_count,
+            'identities': len(label_map),
+            'built_at': snapshot.built_at
+        })
+        logger.info(f"Published recognizer generation {snapshot.generation} ({kind}, "
+                    f"{sample_count} samples) built in {build_time * 1000:.1f} ms")
+    
+    def _has_training_work(self):
+        """Check whether the training worker has anything queued"""
+        return bool(self._pending_updates or self._full_rebuild_requested or self._backup_retrain_requested)
+    
+    def _training_step(self):
+        """Build and publish the next generation from the queued training work"""
+        with self._db_lock:
+            updates = self._pending_updates
+            self._pending_updates = []
+            full_requested = self._full_rebuild_requested
+            self._full_rebuild_requested = False
+            backup_requested = self._backup_retrain_requested
+            self._backup_retrain_requested = False
+            stale = self.stale_samples
+            
+            # Train on a copy of the face set; the sample arrays themselves are never modified
+            face_db = {person_id: list(samples) for person_id, samples in self.face_db.items()}
+        
+        if not (updates or full_requested or backup_requested):
+            return False
+        
+        start_time = time.time()
+        snapshot = self._snapshot
+        
+        # Full rebuild while bootstrapping (no model yet, or trained on identities
+        # below min_samples_for_learning) and to drop replaced samples
+        need_full = (
+            full_requested or snapshot is None
+            or stale >= self.deferred_retrain_batch or (backup_requested and stale > 0)
+        )
+        embedding = self.recognizer_type == 'embedding'
+        if embedding:
+            need_full = need_full or self._embedding_index is None
+        else:
+            need_full = need_full or snapshot.trained_with_all_samples or (
+                self._spare_slot is None and self._spare_training_set is None)
+        
         try:
-            faces = []
-            labels = []
-            label_map = {}
-            next_label = 0
-            
-            # Filter out identities with too few samples
-            filtered_face_db = {}
-            for person_id, encodings in self.face_db.items():
-                if len(encodings) >= self.min_samples_for_learning:
-                    filtered_face_db[person_id] = encodings
+            if need_full:
+                if stale > 0:
+                    logger.info(f"Rebuilding face models to drop {stale} replaced samples")
+                if embedding:
+                    published = self._build_full_embedding_generation(face_db, start_time)
                 else:
-                    logger.debug(f"Skipping person {person_id} for training - only {len(encodings)} samples")
-            
-            # If we don't have any identities with enough samples, use all samples
-            if not filtered_face_db and self.face_db:
-                logger.info("No identities have sufficient samples, using all available faces")
-                filtered_face_db = self.face_db
-            
-            for person_id, encodings in filtered_face_db.items():
-                if encodings:
-                    label_map[next_label] = person_id
-                    for encoding in encodings:
-                        faces.append(encoding)
-                        labels.append(next_label)
-                    next_label += 1
-            
-            if faces and len(faces) >= 2:  # Need at least 2 faces to train
-                # Train the main recognizer
-                logger.info(f"Training face recognizer with {len(faces)} faces from {len(filtered_face_db)} people")
-                self.face_recognizer.train(faces, np.array(labels))
-                self.label_map = label_map
-                
-                # Train backup recognizers if available
-                if hasattr(self, 'use_multimodel') and self.use_multimodel and len(set(labels)) > 1:
-                    try:
-                        # Resize faces to 100x100 for Eigenfaces and Fisherfaces
-                        resized_faces = [cv2.resize(face, (100, 100)) for face in faces]
-                        self.eigen_recognizer.train(resized_faces, np.array(labels))
-                        self.fisher_recognizer.train(resized_faces, np.array(labels))
-                    except Exception as e:
-                        logger.error(f"Error training backup recognizers: {e}")
-                
-                return True
+                    published = self._build_full_generation(face_db, start_time)
+                if published:
+                    with self._db_lock:
+                        self.stale_samples = max(0, self.stale_samples - stale)
+                return published
+            
+            if embedding:
+                return self._build_incremental_embedding_generation(updates, start_time)
+            return self._build_incremental_generation(snapshot, face_db, updates, backup_requested, start_time)
         except Exception as e:
             logger.error(f"Error training face recognizer: {e}")
+            # The spare (or embedding index) may be half updated - rebuild everything next time
+            self._spare_slot = None
+            self._spare_training_set = None
+            self._embedding_index = None
+            with self._db_lock:
+                self._full_rebuild_requested = True
+            return False
+    
+    def _db_save_due(self):
+        """Check whether the training worker should save the face database now"""
+        return bool(self._unsaved_samples or self._unsaved_drops) and \
+            time.time() - self._last_db_save >= self.db_save_interval
+    
+    def _training_loop(self):
+        """Background worker that builds new model generations and saves new samples"""
+        while True:
+            with self._train_cond:
+                self._train_cond.wait_for(
+                    lambda: not self._training_running or self._has_training_work() or self._db_save_due(),
+                    timeout=min(self.deferred_retrain_interval, self.db_save_interval)
+                )
+                if not self._training_running:
+                    return
+                
+                # Periodically fold deferred samples into the Eigen/Fisher models
+                if (not self._has_training_work() and self._pending_backup_samples > 0
+                        and time.time() - self._last_backup_train_time > self.deferred_retrain_interval):
+                    self._backup_retrain_requested = True
+                
+                train = self._has_training_work()
+                save = self._db_save_due()
+                if not (train or save):
+                    continue
+                if train:
+                    self._training_busy = True
+            
+            if train:
+                try:
+                    self._training_step()
+                except Exception as e:
+                    logger.error(f"Error in training worker: {e}")
+                finally:
+                    with self._train_cond:
+                        self._training_busy = False
+                        self._train_cond.notify_all()
             
-        return False
+            # Disk syncs happen here rather than on the recognition threads
+            if save:
+                self.saveFaceRecognitionDB()
+    
+    def start_training_worker(self):
+        """Start the background training worker (started automatically on demand)"""
+        with self._train_cond:
+            if self._training_thread is not None and self._training_thread.is_alive():
+                return
+            self._training_running = True
+            self._training_thread = threading.Thread(target=self._training_loop, daemon=True)
+            self._training_thread.start()
+    
+    def stop_training_worker(self, timeout=2.0):
+        """Stop the background training worker"""
+        with self._train_cond:
+            self._training_running = False
+            self._train_cond.notify_all()
+        if self._training_thread is not None:
+            self._training_thread.join(timeout=timeout)
+        
+        # Save the samples the worker had not saved yet
+        if self._unsaved_samples or self._unsaved_drops:
+            self.saveFaceRecognitionDB()
+            self._training_thread = None
+    
+    def _schedule_training(self):
+        """Hand queued training work to the worker (or run it inline)"""
+        if not self.background_training:
+            self._training_step()
+            return
+        
+        self.start_training_worker()
+        with self._train_cond:
+            self._train_cond.notify_all()
+    
+    def wait_for_training(self, timeout=None):
+        """
+        Block until all queued training work has been published.
+
+        Args:
+            timeout: Maximum time to wait in seconds (None = wait forever)
+
+        Returns:
+            True if training is idle, False on timeout
+        """
+        if not self.background_training:
+            return True
+        with self._train_cond:
+            return self._train_cond.wait_for(
+                lambda: not self._training_busy and not self._has_training_work(),
+                timeout
+            )
+    
+    def request_full_rebuild(self):
+        """Schedule a rebuild of all models from the face database"""
+        with self._db_lock:
+            self._full_rebuild_requested = True
+        self._schedule_training()
+    
+    def flush_pending_training(self, force=False):
+        """
+        Hand samples queued with confirm_identity to the training worker.
+
+        The worker retrains Eigenfaces/Fisherfaces (and does a full rebuild
+        to drop replaced samples) once enough samples have accumulated, or
+        right away when force is set.
+
+        Args:
+            force: Retrain deferred models even if the batch is not full
+
+        Returns:
+            True if training work was scheduled
+        """
+        with self._db_lock:
+            if force:
+                self._backup_retrain_requested = True
+            if not self._has_training_work():
+                return False
+        
+        self._schedule_training()
+        return True
+    
+    def get_training_stats(self):
+        """
+        Get statistics about the published model generations.
+
+        Returns:
+            Dictionary with the current generation, its build time and recent history
+        """
+        snapshot = self._snapshot
+        with self._db_lock:
+            pending = len(self._pending_updates)
+        return {
+            'generation': self.generation,
+            'last_build_time': snapshot.build_time if snapshot is not None else 0.0,
+            'sample_count': snapshot.sample_count if snapshot is not None else 0,
+            'identities': len(snapshot.label_map) if snapshot is not None else 0,
+            'pending_samples': pending,
+            'pending_backup_samples': self._pending_backup_samples,
+            'stale_samples': self.stale_samples,
+            'training': self._training_busy,
+            'history': list(self.generation_stats)
+        }
     
     def saveFaceRecognitionDB(self):
-        """Save face recognition database"""
+        """Save face recognition database (appends only the samples changed since the last save)"""
         try:
-            with open(self.face_db_file, 'wb') as f:
-                pickle.dump(self.face_db, f)
-            logger.info(f"Saved face database to {self.face_db_file}")
+            with self._db_lock:
+                self._last_db_save = time.time()
+                samples = self._unsaved_samples
+                drops = self._unsaved_drops
+                self._unsaved_samples = {}
+                self._unsaved_drops = {}
+                
+                store = self._get_face_store()
+                try:
+                    # Appends first: drops count from the front of the saved + new samples
+                    for person_id, faces in samples.items():
+                        store.append(person_id, faces)
+                    for person_id, count in drops.items():
+                        store.drop_oldest(person_id, count)
+                    store.commit()
+                except Exception:
+                    # Nothing was committed - keep the changes for the next save
+                    store.reload()
+                    for person_id, faces in samples.items():
+                        self._unsaved_samples.setdefault(person_id, [])[:0] = faces
+                    for person_id, count in drops.items():
+                        self._unsaved_drops[person_id] = self._unsaved_drops.get(person_id, 0) + count
+                    raise
+            
+            added = sum(len(faces) for faces in samples.values())
+            logger.info(f"Saved {added} new face samples to {store.root_dir}")
             return True
         except Exception as e:
             logger.error(f"Error saving face recognition DB: {e}")
@@ -285,8 +1122,24 @@ class RecogniserBN:
     
     def resetFaceDetectionDB(self):
         """Reset face detection database"""
-        self.face_db = {}
-        self.saveFaceRecognitionDB()
+        with self._db_lock:
+            self.face_db = {}
+            self._pending_updates = []
+            self._full_rebuild_requested = False
+            self._backup_retrain_requested = False
+            self._pending_backup_samples = 0
+            self.stale_samples = 0
+            self._snapshot = None
+            self._spare_slot = None
+            self._spare_backlog = []
+            self._spare_training_set = None
+            self._embedding_index = None
+            self._unsaved_samples = {}
+            self._unsaved_drops = {}
+            try:
+                self._get_face_store().clear()
+            except Exception as e:
+                logger.error(f"Error clearing face database: {e}")
         logger.info("Face detection database reset")
     
     def setFaceDetectionDB(self, facedb=None):
@@ -302,8 +1155,8 @@ class RecogniserBN:
             self.loadFaceRecognitionDB()
     
     def detectFaces(self, image):
-        """Detect faces in image using the configured detector"""
-        if image is None:
+        """Detect faces in image using the configured detector backend"""
+        if image is None or self.face_detector is None:
             return []
             
         # Convert to grayscale if needed
@@ -312,83 +1165,74 @@ class RecogniserBN:
         else:
             gray = image
             
-        # Apply histogram equalization to improve detection in various lighting
+        # Apply histogram equalization to improve recognition in various lighting
         gray = cv2.equalizeHist(gray)
         
-        faces = []
+        try:
+            # Haar and HOG backends equalize internally, DNN backends want the original image
+            with self._detector_lock:
+                detections = self.face_detector.detect(image)
+        except Exception as e:
+            logger.error(f"Error in {self.face_detector.label} face detection: {e}")
+            return []
         
-        if DLIB_AVAILABLE and isinstance(self.face_detector, dlib.fhog_object_detector):
-            # Use dlib's detector
-            try:
-                # Detect faces
-                dlib_faces = self.face_detector(gray, 1)
-                
-                for rect in dlib_faces:
-                    # Convert dlib rectangle to OpenCV format
-                    x, y = rect.left(), rect.top()
-                    w, h = rect.width(), rect.height()
-                    
-                    # Skip faces smaller than minimum size
-                    if w < self.min_face_size[0] or h < self.min_face_size[1]:
-                        continue
-                        
-                    # Extract face ROI
-                    face_roi = gray[y:y+h, x:x+w]
-                    
-                    # Use shape predictor if available for better face alignment
-                    aligned_face = None
-                    if self.shape_predictor:
-                        try:
-                            # Get landmarks
-                            shape = self.shape_predictor(gray, rect)
-                            # Convert to numpy array
-                            landmarks = np.array([[p.x, p.y] for p in shape.parts()])
-                            # Use landmarks for alignment (simple version)
-                            aligned_face = self._align_face(gray, landmarks)
-                        except Exception as e:
-                            logger.warning(f"Error in face alignment: {e}")
-                    
-                    # If alignment failed, use the original face
-                    if aligned_face is None or aligned_face.size == 0:
-                        # Resize to standard size
-                        face_roi = cv2.resize(face_roi, (100, 100))
-                    else:
-                        face_roi = aligned_face
-                        
-                    # Store face
-                    faces.append(face_roi)
-            except Exception as e:
-                logger.error(f"Error in dlib face detection: {e}")
-                
-        elif isinstance(self.face_detector, cv2.CascadeClassifier):
-            # Use OpenCV's cascade classifier
-            try:
-                # Detect faces
-                opencv_faces = self.face_detector.detectMultiScale(
-                    gray,
-                    scaleFactor=1.1,
-                    minNeighbors=5,
-                    minSize=self.min_face_size
-                )
-                
-                for (x, y, w, h) in opencv_faces:
-                    # Extract face ROI
-                    face_roi = gray[y:y+h, x:x+w]
-                    # Resize to standard size
-                    face_roi = cv2.resize(face_roi, (100, 100))
-                    # Store face
-                    faces.append(face_roi)
-            except Exception as e:
-                logger.error(f"Error in OpenCV face detection: {e}")
+        faces = []
+        for detection in detections:
+            x1, y1, x2, y2 = detection['x1'], detection['y1'], detection['x2'], detection['y2']
+            
+            # Skip faces smaller than minimum size
+            if x2 - x1 < self.min_face_size[0] or y2 - y1 < self.min_face_size[1]:
+                continue
+            
+            faces.append(self._normalize_face(gray, (x1, y1, x2, y2), detection.get('landmarks')))
                 
         return faces
     
+    def _normalize_face(self, gray, box, landmarks=None):
+        """
+        Align (when landmarks are available) and resize a detected face.
+
+        Args:
+            gray: Equalized grayscale image
+            box: Face box (x1, y1, x2, y2) in image coordinates
+            landmarks: Optional five-point landmarks (eyes first) from the detector
+
+        Returns:
+            100x100 grayscale face crop
+        """
+        x1, y1, x2, y2 = box
+        aligned_face = None
+        try:
+            if landmarks is not None and len(landmarks) >= 2:
+                # Five-point landmarks: the first two are the eyes (image left first)
+                aligned_face = self._align_eyes(gray, np.array(landmarks[0]), np.array(landmarks[1]))
+            elif self.shape_predictor:
+                # Use shape predictor for better face alignment
+                with self._detector_lock:
+                    shape = self.shape_predictor(gray, dlib.rectangle(int(x1), int(y1), int(x2), int(y2)))
+                # Convert to numpy array
+                aligned_face = self._align_face(gray, np.array([[p.x, p.y] for p in shape.parts()]))
+        except Exception as e:
+            logger.warning(f"Error in face alignment: {e}")
+        
+        # If alignment failed, use the original face
+        if aligned_face is None or aligned_face.size == 0:
+            # Resize to standard size
+            aligned_face = cv2.resize(gray[y1:y2, x1:x2], (100, 100))
+        return aligned_face
+    
     def _align_face(self, image, landmarks, desired_size=100):
-        """Align face using facial landmarks"""
+        """Align face using 68-point facial landmarks"""
+        # Use eye centers for alignment
+        left_eye = np.mean(landmarks[36:42], axis=0)
+        right_eye = np.mean(landmarks[42:48], axis=0)
+        return self._align_eyes(image, left_eye, right_eye, desired_size)
+    
+    def _align_eyes(self, image, left_eye, right_eye, desired_size=100):
+        """Align face so the eyes are level (left_eye is the eye on the image left)"""
         try:
-            # Use eye centers for alignment
-            left_eye = np.mean(landmarks[36:42], axis=0).astype(int)
-            right_eye = np.mean(landmarks[42:48], axis=0).astype(int)
+            left_eye = np.asarray(left_eye).astype(int)
+            right_eye = np.asarray(right_eye).astype(int)
             
             # Calculate angle
             dx = right_eye[0] - left_eye[0]
@@ -396,10 +1240,10 @@ class RecogniserBN:
             angle = np.degrees(np.arctan2(dy, dx))
             
             # Get center of eyes
-            eye_center = ((left_eye[0] + right_eye[0]) // 2, (left_eye[1] + right_eye[1]) // 2)
+            eye_center = (int(left_eye[0] + right_eye[0]) // 2, int(left_eye[1] + right_eye[1]) // 2)
             
             # Get rotation matrix
-            M = cv2.getRotationMatrix2D(eye_center, angle, 1)
+            M = cv2.getRotationMatrix2D((float(eye_center[0]), float(eye_center[1])), float(angle), 1)
             
             # Apply rotation
             h, w = image.shape[:2]
@@ -426,17 +1270,34 @@ class RecogniserBN:
             logger.warning(f"Face alignment failed: {e}")
             return None
     
-    def extractFace(self, image_path):
-        """Extract face from image"""
+    def extract_face(self, image, face_box=None, landmarks=None, redetect=False):
+        """
+        Extract the first face from an in-memory image.
+
+        When the caller already knows where the face is (e.g. a crop from the
+        camera node, whose detector located it), the detector is skipped and
+        the face goes straight to alignment.
+
+        Args:
+            image: BGR or grayscale image as a numpy array
+            face_box: Known face box (x1, y1, x2, y2) in image coordinates
+            landmarks: Optional landmarks in image coordinates as (x, y) pairs,
+                eyes first; used for alignment with a known box
+            redetect: Run the face detector even though a box is given
+
+        Returns:
+            Normalized grayscale face crop, or None if no face was found
+        """
         try:
-            # Read image
-            img = cv2.imread(image_path)
-            if img is None:
-                logger.error(f"Could not read image: {image_path}")
+            if image is None or image.size == 0:
+                logger.error("Empty image passed for face extraction")
                 return None
             
+            if face_box is not None and not redetect:
+                return self._extract_known_face(image, face_box, landmarks)
+            
             # Detect faces
-            faces = self.detectFaces(img)
+            faces = self.detectFaces(image)
             
             if not faces:
                 logger.warning("No face detected in image")
@@ -449,62 +1310,105 @@ class RecogniserBN:
             logger.error(f"Error extracting face: {e}")
             return None
     
-    def recognisePerson(self):
-        """Recognize person from image"""
-        start_time = time.time()
+    def _extract_known_face(self, image, face_box, landmarks=None):
+        """Normalize a face at a known location, without running the detector"""
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if len(image.shape) == 3 else image
+        h, w = gray.shape[:2]
+        x1, y1 = max(0, int(face_box[0])), max(0, int(face_box[1]))
+        x2, y2 = min(w, int(face_box[2])), min(h, int(face_box[3]))
+        if x2 <= x1 or y2 <= y1:
+            logger.warning(f"Face box {tuple(face_box)} is outside the image")
+            return None
         
+        # Same preprocessing as detected faces, so samples stay comparable
+        return self._normalize_face(cv2.equalizeHist(gray), (x1, y1, x2, y2), landmarks)
+    
+    def extractFace(self, image_path):
+        """Extract face from image file (see extract_face for in-memory images)"""
+        try:
+            # Read image
+            img = cv2.imread(image_path)
+            if img is None:
+                logger.error(f"Could not read image: {image_path}")
+                return None
+            
+            return self.extract_face(img)
+            
+        except Exception as e:
+            logger.error(f"Error extracting face: {e}")
+            return None
+    
+    def recognisePerson(self):
+        """Recognize person from the image file set with setImageToCopy"""
         if not self.image_to_copy:
             logger.error("No image set for recognition")
             self.identity_est = "0"  # Unknown
             self.quality_estimate = 0.0
             return []
         
-        # Extract face from image
-        face = self.extractFace(self.image_to_copy)
-        if face is None:
-            logger.warning("No face detected in image")
+        image = cv2.imread(self.image_to_copy)
+        if image is None:
+            logger.error(f"Could not read image: {self.image_to_copy}")
             self.identity_est = "0"  # Unknown
             self.quality_estimate = 0.0
             return []
         
-        # If no faces in database or recognizer not initialized, return unknown
-        if not self.face_db or not hasattr(self, 'label_map'):
-            logger.warning("No face database or label map")
+        self.recognise(image)
+        return []  # Empty result list (we use identity_est and quality_estimate)
+    
+    def recognise(self, image, face_box=None, landmarks=None, redetect=False):
+        """
+        Recognize a person from an in-memory image.
+
+        Also updates identity_est and quality_estimate like recognisePerson.
+
+        Args:
+            image: BGR or grayscale image (numpy array) containing a face
+            face_box: Known face box (x1, y1, x2, y2) - skips face detection
+            landmarks: Optional landmarks for the known box (see extract_face)
+            redetect: Detect the face even though a box is given
+
+        Returns:
+            Tuple of (person_id, confidence); person_id is "0" if unknown
+        """
+        start_time = time.time()
+        
+        # Extract face from image
+        face = self.extract_face(image, face_box, landmarks, redetect)
+        if face is None:
             self.identity_est = "0"  # Unknown
             self.quality_estimate = 0.0
-            return []
+            return self.identity_est, self.quality_estimate
         
-        try:
-            # Get predictions from multiple models if available
-            predictions = []
-            
-            # Main recognizer prediction
-            label, confidence = self.face_recognizer.predict(face)
-            predictions.append((label, self._convert_confidence(confidence)))
+        # Use one model generation for the whole prediction, even if the
+        # training worker publishes a new one meanwhile
+        with self._reading() as snapshot:
+            # If no faces in database or recognizer not initialized, return unknown
+            if not self.face_db or snapshot is None or not snapshot.label_map:
+                logger.warning("No face database or label map")
+                self.identity_est = "0"  # Unknown
+                self.quality_estimate = 0.0
+                return self.identity_est, self.quality_estimate
             
-            # Backup recognizers if available
-            if hasattr(self, 'use_multimodel') and self.use_multimodel:
-                try:
-                    # Resize for Eigenfaces and Fisherfaces
-                    resized_face = cv2.resize(face, (100, 100))
-                    
-                    # Eigen recognizer
-                    eigen_label, eigen_confidence = self.eigen_recognizer.predict(resized_face)
-                    predictions.append((eigen_label, self._convert_confidence(eigen_confidence)))
-                    
-                    # Fisher recognizer 
-                    fisher_label, fisher_confidence = self.fisher_recognizer.predict(resized_face)
-                    predictions.append((fisher_label, self._convert_confidence(fisher_confidence)))
-                except Exception as e:
-                    logger.warning(f"Error using backup recognizers: {e}")
+            try:
+                predictions = self._predict(face, snapshot)
+            except Exception as e:
+                logger.error(f"Error in face recognition: {e}")
+                predictions = []
+        
+        try:
+            if not predictions:
+                self.identity_est = "0"  # Unknown
+                self.quality_estimate = 0.0
+                return self.identity_est, self.quality_estimate
             
             # Combine predictions (take the most confident prediction)
             best_label, best_confidence = max(predictions, key=lambda x: x[1])
             
             # Map label to person ID
-            if best_label in self.label_map and best_confidence >= self.recognition_threshold:
+            if best_label in snapshot.label_map and best_confidence >= self.recognition_threshold:
                 # Good match - use existing person
-                person_id = self.label_map[best_label]
+                person_id = snapshot.label_map[best_label]
                 self.identity_est = person_id
                 self.quality_estimate = best_confidence
                 
@@ -536,7 +1440,102 @@ class RecogniserBN:
             self.identity_est = "0"  # Unknown
             self.quality_estimate = 0.0
         
-        return []  # Empty result list (we use identity_est and quality_estimate)
+        return self.identity_est, self.quality_estimate
+    
+    def _predict(self, face, snapshot):
+        """
+        Get predictions for a face from every model of a generation.
+
+        Args:
+            face: Normalized grayscale face
+            snapshot: Generation from _reading()
+
+        Returns:
+            List of (label, confidence) predictions
+        """
+        if snapshot.embedding_index is not None:
+            # Embedding backend - score every enrolled sample at once
+            predictions = self._predict_embedding(face, snapshot.embedding_index)
+        else:
+            # Main recognizer prediction
+            label, confidence = snapshot.recognizer.model.predict(face)
+            predictions = [(label, self._convert_confidence(confidence))]
+        
+        # Backup recognizers if available
+        if hasattr(self, 'use_multimodel') and self.use_multimodel and snapshot.eigen_recognizer is not None:
+            try:
+                # Resize for Eigenfaces and Fisherfaces
+                resized_face = cv2.resize(face, (100, 100))
+                
+                # Eigen recognizer
+                eigen_label, eigen_confidence = snapshot.eigen_recognizer.predict(resized_face)
+                predictions.append((eigen_label, self._convert_confidence(eigen_confidence)))
+                
+                # Fisher recognizer 
+                fisher_label, fisher_confidence = snapshot.fisher_recognizer.predict(resized_face)
+                predictions.append((fisher_label, self._convert_confidence(fisher_confidence)))
+            except Exception as e:
+                logger.warning(f"Error using backup recognizers: {e}")
+        
+        return predictions
+    
+    @contextlib.contextmanager
+    def _reading(self):
+        """
+        Use the published generation, marking its primary model as in use.
+
+        The generation is read and its reader count raised under the same
+        lock the training worker checks before recycling a retired model,
+        so the worker can never update() a model that a reader just picked
+        up. Embedding generations have no primary model and are not counted.
+
+        Yields:
+            The published RecognizerSnapshot, or None if there is none yet
+        """
+        with self._reader_cond:
+            snapshot = self._snapshot
+            slot = snapshot.recognizer if snapshot is not None else None
+            if slot is not None:
+                slot.readers += 1
+        try:
+            yield snapshot
+        finally:
+            if slot is not None:
+                with self._reader_cond:
+                    slot.readers -= 1
+                    if slot.readers == 0:
+                        self._reader_cond.notify_all()
+    
+    def _predict_embedding(self, face, index):
+        """
+        Match a face against an embedding index.
+
+        Also stores the top-k candidates in top_candidates.
+
+        Returns:
+            List of (label, confidence) predictions, best first
+        """
+        embedding = self.face_embedder.embed(face)
+        # Labels of an embedding generation are positions in its person ID list
+        predictions = [(label, self._similarity_to_confidence(similarity))
+                       for label, similarity in index.search_labels(embedding, self.top_k)]
+        self.top_candidates = [(index.person_ids[label], confidence) for label, confidence in predictions]
+        return predictions
+    
+    def _similarity_to_confidence(self, similarity):
+        """
+        Convert an embedding cosine similarity to a normalized confidence (0-1).
+
+        The model's match threshold maps onto recognition_threshold, so the
+        existing recognition and new-face thresholds keep their meaning.
+        """
+        knee = self.embedding_match_similarity
+        if similarity <= 0:
+            return 0.0
+        if similarity < knee:
+            return similarity / knee * self.recognition_threshold
+        scaled = (similarity - knee) / (1 - knee)
+        return min(1.0, self.recognition_threshold + scaled * (1 - self.recognition_threshold))
     
     def _convert_confidence(self, raw_confidence):
         """Convert raw confidence score to normalized confidence (0-1, higher is better)"""
@@ -583,27 +1582,49 @@ class RecogniserBN:
             return False
     
     def confirmPersonIdentity(self, p_id=None, recog_results_from_file=None, isRobotLearning=True):
-        """Confirm identity of person and add face to database"""
+        """Confirm identity of person using the image file set with setImageToCopy"""
         if not self.image_to_copy:
             logger.error("No image set for identity confirmation")
             return False
         
+        image = cv2.imread(self.image_to_copy)
+        if image is None:
+            logger.error(f"Could not read image: {self.image_to_copy}")
+            return False
+        
+        return self.confirm_identity(image, p_id)
+    
+    def confirm_identity(self, image, person_id=None, commit=True, face_box=None, landmarks=None,
+                         redetect=False):
+        """
+        Confirm the identity of a person in an in-memory image and add the face to the database.
+
+        Args:
+            image: BGR or grayscale image (numpy array) containing a face
+            person_id: Person ID to assign (default: the last identity estimate)
+            commit: Schedule training, and let the training worker save the
+                sample to the database within db_save_interval. Pass False
+                when adding a batch of samples and call
+                flush_pending_training() and saveFaceRecognitionDB() once at
+                the end.
+            face_box: Known face box (x1, y1, x2, y2) - skips face detection
+            landmarks: Optional landmarks for the known box (see extract_face)
+            redetect: Detect the face even though a box is given
+
+        Returns:
+            True if the face was processed, False otherwise
+        """
         # Extract face
-        face = self.extractFace(self.image_to_copy)
+        face = self.extract_face(image, face_box, landmarks, redetect)
         if face is None:
             logger.error("No face detected for identity confirmation")
             return False
         
         try:
             # Add face to database
-            person_id = p_id if p_id else self.identity_est
+            person_id = person_id if person_id else self.identity_est
             logger.info(f"Confirming identity for person {person_id}")
             
-            # Initialize entry if not present
-            if person_id not in self.face_db:
-                self.face_db[person_id] = []
-                self.face_counts[person_id] = 0
-            
             # Calculate face hash for storage
             face_hash = hashlib.md5(face.tobytes()).hexdigest()
             
@@ -611,46 +1632,67 @@ class RecogniserBN:
             should_add = True
             max_samples = self.max_samples_per_identity
             
-            # Apply different sampling strategies based on how many samples we already have
-            current_count = len(self.face_db[person_id])
-            
-            if current_count >= max_samples:
-                # If we already have max samples, replace oldest one
-                # This keeps the model fresh with recent faces while maintaining a maximum size
-                self.face_db[person_id].pop(0)  # Remove oldest sample
-                logger.debug(f"Replaced oldest sample for person {person_id} (max {max_samples} reached)")
-            elif current_count > self.min_samples_for_learning:
-                # For faces we've seen many times, sample less frequently to avoid bias
-                sampling_factor = min(25, self.face_counts[person_id]) / 25.0
-                # Random sampling that decreases as we get more samples
-                import random
-                should_add = random.random() > sampling_factor
+            with self._db_lock:
+                # Initialize entry if not present
+                if person_id not in self.face_db:
+                    self.face_db[person_id] = []
+                    self.face_counts[person_id] = 0
+                
+                # Apply different sampling strategies based on how many samples we already have
+                current_count = len(self.face_db[person_id])
+                
+                if current_count >= max_samples:
+                    # If we already have max samples, replace oldest one
+                    # This keeps the model fresh with recent faces while maintaining a maximum size
+                    self.face_db[person_id].pop(0)  # Remove oldest sample
+                    self._unsaved_drops[person_id] = self._unsaved_drops.get(person_id, 0) + 1
+                    if person_id in self.label_map.values():
+                        self.stale_samples += 1  # Still in LBPH until the next full rebuild
+                    logger.debug(f"Replaced oldest sample for person {person_id} (max {max_samples} reached)")
+                elif current_count > self.min_samples_for_learning:
+                    # For faces we've seen many times, sample less frequently to avoid bias
+                    sampling_factor = min(25, self.face_counts.get(person_id, 0)) / 25.0
+                    # Random sampling that decreases as we get more samples
+                    import random
+                    should_add = random.random() > sampling_factor
+                    
+                    if not should_add:
+                        logger.debug(f"Skipped adding sample for well-known person {person_id}")
+                
+                if should_add:
+                    # Add face encoding
+                    self.face_db[person_id].append(face)
+                    self._unsaved_samples.setdefault(person_id, []).append(face)
+                    logger.debug(f"Added face sample #{len(self.face_db[person_id])} for person {person_id}")
                 
-                if not should_add:
-                    logger.debug(f"Skipped adding sample for well-known person {person_id}")
+                # Increment face count regardless of whether we added the sample
+                self.face_counts[person_id] = self.face_counts.get(person_id, 0) + 1
+                
+                # Queue the new sample for the training worker (incremental where possible)
+                if should_add or current_count < self.min_samples_for_learning:
+                    self._pending_updates.append((person_id, face))
             
             if should_add:
-                # Add face encoding
-                self.face_db[person_id].append(face)
-                logger.debug(f"Added face sample #{len(self.face_db[person_id])} for person {person_id}")
-                
                 # Save face image with a unique name
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 face_filename = f"face_{person_id}_{timestamp}_{face_hash[:8]}.jpg"
                 face_path = os.path.join(self.image_save_dir, face_filename)
                 
-                cv2.imwrite(face_path, face)
-                logger.info(f"Saved face image to {face_path}")
-            
-            # Increment face count regardless of whether we added the sample
-            self.face_counts[person_id] = self.face_counts.get(person_id, 0) + 1
-            
-            # Retrain recognizer with all faces if we added a sample or if we have few samples
-            if should_add or current_count < self.min_samples_for_learning:
-                self._train_recognizer_from_db()
+                if self.image_writer is not None:
+                    self.image_writer.submit(face_path, face)
+                    logger.debug(f"Queued face image {face_path}")
+                else:
+                    cv2.imwrite(face_path, face)
+                    logger.info(f"Saved face image to {face_path}")
             
-            # Save database
-            self.saveFaceRecognitionDB()
+            if commit:
+                # Hand the sample to the training worker, which also saves the
+                # database periodically (no disk syncs on the caller's thread)
+                self.flush_pending_training()
+                if self.background_training:
+                    self.start_training_worker()
+                else:
+                    self.saveFaceRecognitionDB()
             
             return True
         except Exception as e:
@@ -679,6 +1721,16 @@ class SimpleFaceRecognizer:
         self.trained = True
         logger.info(f"SimpleFaceRecognizer trained with {len(faces)} faces")
     
+    def update(self, faces, labels):
+        """Add face images to an already trained recognizer"""
+        for face in faces:
+            hist = cv2.calcHist([face], [0], None, [64], [0, 256])
+            hist = cv2.normalize(hist, hist).flatten()
+            self.faces.append(hist)
+        
+        self.labels.extend(labels.tolist() if isinstance(labels, np.ndarray) else labels)
+        self.trained = True
+    
     def predict(self, face):
         """Predict the label for a face"""
         if not self.trained or not self.faces:
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+
+"""
+Recognition work queue for the face recognition node.
+
+Face crops arrive at camera rate, usually many per second for the same
+person. RecognitionQueue keeps at most one pending crop per track - the
+best-quality one seen during a short collection window - and hands it to a
+small pool of worker threads. Tracks that were recognized with confidence
+are skipped until their identity expires, so recognition effort goes to
+new arrivals instead of faces that are already known.
+"""
+
+import time
+import logging
+import threading
+import collections
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger("recognition_queue")
+
+
+class RecognitionQueue:
+    """
+    Bounded, per-track deduplicating work queue with a worker pool.
+
+    Features:
+    - One pending crop per track; a better crop replaces a worse one
+    - Crops are collected for a window before being processed
+    - Bounded number of pending tracks (the oldest pending track is dropped)
+    - A track is never processed by two workers at once
+    - Confidently identified tracks are skipped until a TTL expires
+    """
+
+    def __init__(self, process_fn: Callable[[str, Any, float, Optional[Dict]], Optional[str]],
+                 quality_fn: Optional[Callable[[Any], float]] = None,
+                 num_workers: int = 2, window: float = 0.3, identity_ttl: float = 5.0,
+                 max_tracks: int = 16):
+        """
+        Initialize the recognition queue.
+
+        Args:
+            process_fn: Called as process_fn(track_id, face_img, timestamp, face_info)
+                on a worker thread, where face_info is the dict given to submit()
+                (or None); returns the identity if it was recognized with
+                confidence, otherwise None
+            quality_fn: Returns a quality score for a crop (higher is better);
+                without it the newest crop of a window is used
+            num_workers: Number of worker threads
+            window: Seconds to collect crops of a track before processing the best one
+            identity_ttl: Seconds to skip a track after a confident identification
+            max_tracks: Maximum number of tracks with a pending crop
+        """
+        self.process_fn = process_fn
+        self.quality_fn = quality_fn
+        self.num_workers = max(1, num_workers)
+        self.window = window
+        self.identity_ttl = identity_ttl
+        self.max_tracks = max(1, max_tracks)
+
+        self._pending = collections.OrderedDict()  # track ID -> pending entry, oldest first
+        self._in_flight = set()
+        self._identified = {}  # track ID -> (identity, expiry time)
+        self._cond = threading.Condition()
+        self._running = False
+        self._workers = []
+
+        # Statistics
+        self.stats = {
+            'submitted': 0,
+            'superseded': 0,     # Crops replaced by (or losing to) a better crop of the same track
+            'skipped_known': 0,  # Crops of tracks with an unexpired identity
+            'dropped': 0,        # Pending tracks evicted because the queue was full
+            'processed': 0,
+            'identified': 0,
+            'avg_process_time': 0.0
+        }
+
+    def start(self):
+        """Start the worker threads"""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            self._workers = [
+                threading.Thread(target=self._worker_loop, name=f"recognition_worker_{i}", daemon=True)
+                for i in range(self.num_workers)
+            ]
+        for worker in self._workers:
+            worker.start()
+
+    def stop(self, timeout: float = 2.0):
+        """Stop the worker threads (pending crops are discarded)"""
+        with self._cond:
+            self._running = False
+            self._pending.clear()
+            self._cond.notify_all()
+        for worker in self._workers:
+            worker.join(timeout=timeout)
+        self._workers = []
+
+    def submit(self, track_id: str, face_img: Any, timestamp: Optional[float] = None,
+               face_info: Optional[Dict] = None) -> bool:
+        """
+        Offer a face crop for recognition. Never blocks on recognition.
+
+        Args:
+            track_id: Track the crop belongs to
+            face_img: Face crop
+            timestamp: Capture time of the crop (default: now)
+            face_info: Optional data passed through to process_fn with the crop
+                (e.g. the face box inside the crop)
+
+        Returns:
+            True if the crop is now the pending crop of its track
+        """
+        now = time.time()
+        timestamp = now if timestamp is None else timestamp
+
+        with self._cond:
+            self.stats['submitted'] += 1
+            if len(self._identified) > 4 * self.max_tracks:
+                # Track IDs are not reused - forget expired identities
+                self._identified = {
+                    key: value for key, value in self._identified.items() if value[1] > now}
+            if self._is_identified(track_id, now):
+                self.stats['skipped_known'] += 1
+                return False
+
+        # Score outside the lock - quality metrics touch every pixel
+        quality = self.quality_fn(face_img) if self.quality_fn is not None else 0.0
+
+        with self._cond:
+            entry = self._pending.get(track_id)
+            if entry is not None:
+                self.stats['superseded'] += 1
+                if self.quality_fn is not None and entry['quality'] > quality:
+                    return False
+                entry.update(face_img=face_img, timestamp=timestamp, quality=quality, face_info=face_info)
+                return True
+
+            if len(self._pending) >= self.max_tracks:
+                self._pending.popitem(last=False)
+                self.stats['dropped'] += 1
+
+            self._pending[track_id] = {
+                'face_img': face_img,
+                'timestamp': timestamp,
+                'quality': quality,
+                'face_info': face_info,
+                'ready_at': now + self.window
+            }
+            self._cond.notify_all()
+            return True
+
+    def mark_identified(self, track_id: str, identity: str, ttl: Optional[float] = None):
+        """
+        Skip a track until its identity expires.
+
+        Args:
+            track_id: Track that was identified
+            identity: Recognized identity
+            ttl: Seconds to skip the track (default: identity_ttl)
+        """
+        ttl = self.identity_ttl if ttl is None else ttl
+        with self._cond:
+            self._identified[track_id] = (identity, time.time() + ttl)
+            self._pending.pop(track_id, None)
+
+    def forget(self, track_id: str):
+        """Drop any pending crop and identity of a track (e.g. when it is lost)"""
+        with self._cond:
+            self._pending.pop(track_id, None)
+            self._identified.pop(track_id, None)
+
+    def get_stats(self) -> Dict:
+        """Get a copy of the queue statistics"""
+        with self._cond:
+            stats = dict(self.stats)
+            stats['pending'] = len(self._pending)
+            stats['in_flight'] = len(self._in_flight)
+            stats['identified_tracks'] = sum(
+                1 for _, expiry in self._identified.values() if expiry > time.time())
+            return stats
+
+    def _is_identified(self, track_id: str, now: float) -> bool:
+        """Check for an unexpired identity (caller holds the lock)"""
+        identified = self._identified.get(track_id)
+        if identified is None:
+            return False
+        if identified[1] <= now:
+            del self._identified[track_id]
+            return False
+        return True
+
+    def _next_ready(self, now: float):
+        """
+        Find the oldest ready crop of a track that is not being processed.
+
+        Returns:
+            Tuple of (track ID, entry, seconds until the next crop is ready)
+        """
+        wait = None
+        for track_id, entry in self._pending.items():
+            if track_id in self._in_flight:
+                continue
+            if entry['ready_at'] <= now:
+                return track_id, entry, 0.0
+            delay = entry['ready_at'] - now
+            wait = delay if wait is None else min(wait, delay)
+        return None, None, wait
+
+    def _worker_loop(self):
+        """Worker thread: process the best pending crop of one track at a time"""
+        while True:
+            with self._cond:
+                while True:
+                    if not self._running:
+                        return
+                    track_id, entry, wait = self._next_ready(time.time())
+                    if track_id is not None:
+                        break
+                    self._cond.wait(timeout=wait)
+                del self._pending[track_id]
+                self._in_flight.add(track_id)
+
+            start_time = time.time()
+            identity = None
+            try:
+                identity = self.process_fn(track_id, entry['face_img'], entry['timestamp'], entry['face_info'])
+            except Exception as e:
+                logger.error(f"Error processing face for track {track_id}: {e}")
+            finally:
+                process_time = time.time() - start_time
+                with self._cond:
+                    self._in_flight.discard(track_id)
+                    self.stats['processed'] += 1
+                    self.stats['avg_process_time'] = (
+                        0.9 * self.stats['avg_process_time'] + 0.1 * process_time)
+                    if identity:
+                        self.stats['identified'] += 1
+                        self._identified[track_id] = (identity, time.time() + self.identity_ttl)
+                        self._pending.pop(track_id, None)
+                    self._cond.notify_all()
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+
+"""
+Shared-memory frame transport for vision nodes on the same host.
+
+The camera node writes frames into a POSIX shared-memory ring of fixed-size
+slots and publishes only a small SharedFrame message (segment name, slot
+index, sequence number and stamp). Same-host consumers attach to the segment
+and read the frame as a numpy view - no DDS serialization and no CvBridge
+conversion. The regular image topic stays available for remote consumers.
+
+Slots are guarded seqlock style: the writer clears a slot's sequence number
+before overwriting it and sets it once the frame is complete, so a reader
+can check after using a view that the slot was not recycled underneath it.
+This module has no ROS dependencies.
+"""
+
+import os
+import logging
+import itertools
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger("shm_frames")
+
+RING_MAGIC = 0x52465643  # 'CVFR'
+RING_VERSION = 1
+
+# Ring header: magic, version, slot count, slot size in bytes
+_RING_HEADER = np.dtype([('magic', '<u4'), ('version', '<u4'), ('slots', '<u4'), ('pad', '<u4'),
+                         ('slot_bytes', '<u8')])
+_RING_HEADER_SIZE = 64
+
+# Per-slot header: sequence (0 while being written), stamp and frame geometry
+_SLOT_HEADER = np.dtype([('sequence', '<u8'), ('stamp', '<f8'), ('height', '<u4'), ('width', '<u4'),
+                         ('channels', '<u4'), ('pad', '<u4')])
+
+
+@dataclass(frozen=True)
+class SharedFramePacket:
+    """A frame read from a shared-memory ring slot"""
+    slot: int
+    sequence: int
+    stamp: float
+    frame: np.ndarray
+
+
+def _data_offset(slots: int) -> int:
+    """Offset of the first slot's pixel data (64-byte aligned)"""
+    headers_end = _RING_HEADER_SIZE + slots * _SLOT_HEADER.itemsize
+    return (headers_end + 63) // 64 * 64
+
+
+# Segments created by writers in this process (they own the tracker registration)
+_owned_segments = set()
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attach to an existing segment without taking ownership of it"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        segment = shared_memory.SharedMemory(name=name)
+        if segment.name in _owned_segments:
+            return segment
+        # Older Pythons register attached segments with the resource tracker,
+        # which would unlink the writer's segment when this process exits
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(segment._name, 'shared_memory')
+        except Exception:
+            pass
+        return segment
+
+
+class _RingView:
+    """Numpy views of the headers and slots of a mapped ring segment"""
+
+    def __init__(self, segment: shared_memory.SharedMemory):
+        self.segment = segment
+        buffer = segment.buf
+        self.header = np.ndarray((), dtype=_RING_HEADER, buffer=buffer)
+        if int(self.header['magic']) != RING_MAGIC or int(self.header['version']) != RING_VERSION:
+            raise ValueError(f"Shared memory segment {segment.name} is not a version {RING_VERSION} frame ring")
+        self.slots = int(self.header['slots'])
+        self.slot_bytes = int(self.header['slot_bytes'])
+        self.slot_headers = np.ndarray((self.slots,), dtype=_SLOT_HEADER, buffer=buffer,
+                                       offset=_RING_HEADER_SIZE)
+        self.data = np.ndarray((self.slots, self.slot_bytes), dtype=np.uint8, buffer=buffer,
+                               offset=_data_offset(self.slots))
+
+    def frame_view(self, slot: int) -> np.ndarray:
+        """View of the frame currently stored in a slot"""
+        header = self.slot_headers[slot]
+        shape = (int(header['height']), int(header['width']), int(header['channels']))
+        size = shape[0] * shape[1] * shape[2]
+        frame = self.data[slot, :size].reshape(shape)
+        return frame[:, :, 0] if shape[2] == 1 else frame
+
+    def release(self):
+        """Drop the numpy views so the segment can be closed"""
+        self.header = self.slot_headers = self.data = None
+
+
+class SharedFrameWriter:
+    """
+    Single-producer shared-memory frame ring.
+
+    Features:
+    - Preallocated slots sized for the current frame size
+    - Segment recreated under a new name when frames outgrow the slots
+    - Monotonic sequence numbers, shared with readers through the slot headers
+    - Segment unlinked when the writer is closed
+    """
+
+    _instances = itertools.count()
+
+    def __init__(self, slots: int = 4, name_prefix: str = "coffee_frames"):
+        """
+        Initialize the writer (the segment is created on the first write).
+
+        Args:
+            slots: Number of frame slots in the ring (minimum 2)
+            name_prefix: Prefix of the shared memory segment names
+        """
+        self.slot_count = max(2, int(slots))
+        self.name_prefix = f"{name_prefix}_{os.getpid()}_{next(self._instances)}"
+        self.sequence = 0
+        self._generation = 0
+        self._segment = None
+        self._view = None
+
+    @property
+    def name(self) -> Optional[str]:
+        """Name of the current shared memory segment (None before the first write)"""
+        return self._segment.name if self._segment is not None else None
+
+    def write(self, frame: np.ndarray, stamp: float):
+        """
+        Copy a frame into the next slot.
+
+        Args:
+            frame: uint8 frame (H x W x C or H x W)
+            stamp: Frame timestamp in seconds
+
+        Returns:
+            Tuple of (segment name, slot index, sequence number)
+        """
+        if frame.dtype != np.uint8:
+            raise ValueError("Shared frame ring only carries uint8 frames")
+        if self._segment is None or frame.nbytes > self._view.slot_bytes:
+            self._create(frame.nbytes)
+
+        self.sequence += 1
+        slot = (self.sequence - 1) % self.slot_count
+        header = self._view.slot_headers[slot]
+        channels = frame.shape[2] if frame.ndim == 3 else 1
+
+        # Mark the slot as being written, fill it, then publish its sequence number
+        header['sequence'] = 0
+        self._view.data[slot, :frame.nbytes] = np.ascontiguousarray(frame).reshape(-1)
+        header['stamp'] = stamp
+        header['height'] = frame.shape[0]
+        header['width'] = frame.shape[1]
+        header['channels'] = channels
+        header['sequence'] = self.sequence
+        return self._segment.name, slot, self.sequence
+
+    def close(self):
+        """Close and unlink the shared memory segment"""
+        self._destroy()
+
+    def _create(self, slot_bytes: int):
+        """Create a new segment with slots of at least slot_bytes"""
+        self._destroy()
+        self._generation += 1
+        name = f"{self.name_prefix}_{self._generation}"
+        size = _data_offset(self.slot_count) + self.slot_count * slot_bytes
+        self._segment = shared_memory.SharedMemory(name=name, create=True, size=size)
+        _owned_segments.add(self._segment.name)
+
+        header = np.ndarray((), dtype=_RING_HEADER, buffer=self._segment.buf)
+        header['magic'] = RING_MAGIC
+        header['version'] = RING_VERSION
+        header['slots'] = self.slot_count
+        header['slot_bytes'] = slot_bytes
+        del header
+        self._view = _RingView(self._segment)
+        self._view.slot_headers['sequence'] = 0
+        logger.info(f"Created shared frame ring {name} ({self.slot_count} x {slot_bytes / 1e6:.1f} MB)")
+
+    def _destroy(self):
+        """Release the current segment"""
+        if self._segment is None:
+            return
+        self._view.release()
+        self._view = None
+        _owned_segments.discard(self._segment.name)
+        try:
+            self._segment.close()
+            self._segment.unlink()
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Error releasing shared frame ring {self._segment.name}: {e}")
+        self._segment = None
+
+
+class SharedFrameReader:
+    """
+    Reader for a shared-memory frame ring. Needs neither ROS nor CvBridge.
+
+    Features:
+    - Zero-copy reads (numpy views into the segment)
+    - Post-read validation against the slot's sequence number
+    - Optional copy into a reusable output buffer
+    - Transparent re-attach when the writer moves to a new segment
+    """
+
+    def __init__(self):
+        """Initialize the reader (segments are attached on first use)"""
+        self._segment = None
+        self._view = None
+
+        # Statistics
+        self.frames_read = 0
+        self.frames_stale = 0  # Slot recycled before (or while) it was read
+
+    @property
+    def name(self) -> Optional[str]:
+        """Name of the attached segment"""
+        return self._segment.name if self._segment is not None else None
+
+    def read(self, segment: str, slot: int, sequence: int) -> Optional[SharedFramePacket]:
+        """
+        Get a zero-copy view of a frame.
+
+        The view is only valid while the writer has not recycled the slot;
+        call is_valid() after using it, or use read_copy().
+
+        Args:
+            segment: Segment name from the SharedFrame message
+            slot: Slot index from the message
+            sequence: Sequence number from the message
+
+        Returns:
+            SharedFramePacket, or None if the slot already holds a newer frame
+
+        Raises:
+            FileNotFoundError: If the segment does not exist on this host
+        """
+        view = self._ensure_attached(segment)
+        if slot >= view.slots or int(view.slot_headers[slot]['sequence']) != sequence:
+            self.frames_stale += 1
+            return None
+        packet = SharedFramePacket(slot, sequence, float(view.slot_headers[slot]['stamp']),
+                                   view.frame_view(slot))
+        self.frames_read += 1
+        return packet
+
+    def read_copy(self, segment: str, slot: int, sequence: int,
+                  out: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """
+        Copy a frame out of the ring and validate the copy.
+
+        Args:
+            segment: Segment name from the SharedFrame message
+            slot: Slot index from the message
+            sequence: Sequence number from the message
+            out: Reusable output buffer (used if its shape and dtype match)
+
+        Returns:
+            Copy of the frame, or None if the slot was recycled
+        """
+        packet = self.read(segment, slot, sequence)
+        if packet is None:
+            return None
+        if out is None or out.shape != packet.frame.shape or out.dtype != packet.frame.dtype:
+            out = np.empty_like(packet.frame)
+        np.copyto(out, packet.frame)
+        if not self.is_valid(packet):
+            return None
+        return out
+
+    def is_valid(self, packet: SharedFramePacket) -> bool:
+        """
+        Check that a packet's slot was not recycled while it was in use.
+
+        Returns:
+            True if the frame data seen through the packet is intact
+        """
+        if self._view is None or int(self._view.slot_headers[packet.slot]['sequence']) != packet.sequence:
+            self.frames_stale += 1
+            return False
+        return True
+
+    def close(self):
+        """Detach from the segment (the writer owns and unlinks it)"""
+        if self._segment is None:
+            return
+        self._view.release()
+        self._view = None
+        try:
+            self._segment.close()
+        except BufferError:
+            # Views handed out by read() are still alive - leave the mapping to the GC
+            pass
+        self._segment = None
+
+    def _ensure_attached(self, segment: str) -> _RingView:
+        """Attach to the named segment, re-attaching if the writer moved"""
+        if self._segment is None or self._segment.name.lstrip('/') != segment.lstrip('/'):
+            self.close()
+            shm = _attach(segment)
+            try:
+                self._view = _RingView(shm)
+            except Exception:
+                shm.close()
+                raise
+            self._segment = shm
+        return self._view
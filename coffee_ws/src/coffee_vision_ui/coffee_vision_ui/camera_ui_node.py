@@ -31,7 +31,7 @@ from python_qt_binding.QtCore import QTimer
 from std_msgs.msg import String
 
 # Import our modular components
-from .ros_interface import CameraController, FrameReceiver
+from .ros_interface import CameraController, FrameReceiver, FaceReceiver
 from .widgets import CameraDisplay, ControlPanel
 
 
@@ -49,6 +49,12 @@ class CameraUINode(Node):
         self.get_logger().info('Camera UI Node starting...')
         self.get_logger().info('Connecting to camera_node via /coffee_bot/ topics')
         
+        # Read frames from camera_node's shared-memory ring when both run on this host
+        self.declare_parameter('use_shared_memory', True)
+        
+        # Video repaint rate cap (0 = display refresh rate); only the newest frame is shown
+        self.declare_parameter('max_display_fps', 0.0)
+        
         # Create Qt application
         self.app = QApplication(sys.argv)
         
@@ -73,7 +79,11 @@ class CameraUIWindow(QMainWindow):
         
         # Initialize ROS communication components
         self.camera_controller = CameraController(node)
-        self.frame_receiver = FrameReceiver(node, '/coffee_bot/camera/image_raw')
+        use_shm = node.get_parameter('use_shared_memory').value
+        self.frame_receiver = FrameReceiver(
+            node, '/coffee_bot/camera/image_raw',
+            shm_topic_name='/coffee_bot/camera/image_shm' if use_shm else None)
+        self.face_receiver = FaceReceiver(node, '/face_detection_data')
         
         # Initialize UI components
         self.camera_display = CameraDisplay()
@@ -114,12 +124,19 @@ class CameraUIWindow(QMainWindow):
     def setup_connections(self):
         """Set up signal/slot connections between components."""
         
-        # Frame receiver to camera display connections
-        self.frame_receiver.frame_ready.connect(self.camera_display.update_frame)
+        # Camera display pulls the newest frame from the receiver on each repaint
+        self.camera_display.set_frame_source(
+            self.frame_receiver.take_latest_frame,
+            self.node.get_parameter('max_display_fps').value,
+            frame_check=self.frame_receiver.confirm_frame)
         self.frame_receiver.performance_update.connect(self.camera_display.update_performance)
         self.frame_receiver.connection_lost.connect(self.camera_display.on_connection_lost)
         self.frame_receiver.connection_restored.connect(self.camera_display.on_connection_restored)
         
+        # Face metadata to camera display (drawn only when camera_node sends clean frames)
+        self.face_receiver.faces_ready.connect(self.camera_display.update_faces)
+        self.camera_controller.state_received.connect(self._apply_overlay_mode)
+        
         # Camera controller to control panel connections
         self.camera_controller.cameras_updated.connect(self.control_panel.update_camera_list)
         self.camera_controller.camera_status_updated.connect(self.control_panel.update_status)
@@ -135,6 +152,12 @@ class CameraUIWindow(QMainWindow):
         
         self.node.get_logger().info('Signal connections established between all components')
     
+    def _apply_overlay_mode(self, state_data):
+        """Draw overlays client-side when camera_node publishes clean frames"""
+        overlay_mode = state_data.get('overlay_mode', 'frame')
+        self.camera_display.set_overlay_enabled(overlay_mode == 'metadata')
+        self.node.get_logger().info(f'Camera overlay mode: {overlay_mode}')
+    
     def _query_camera_node_state(self):
         """Query camera_node for its current state instead of sending commands"""
         self.node.get_logger().info('Querying camera_node for current state')
@@ -160,6 +183,7 @@ class CameraUIWindow(QMainWindow):
     def closeEvent(self, event):
         """Handle window close event."""
         self.connection_timer.stop()
+        self.camera_display.repaint_timer.stop()
         self.node.get_logger().info('Camera UI window closed')
         event.accept()
 
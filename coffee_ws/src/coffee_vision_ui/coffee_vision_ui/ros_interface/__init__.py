@@ -6,6 +6,7 @@ It provides clean abstractions for:
 - Camera control commands (selection, quality, face detection)
 - Status updates from camera_node
 - Video frame reception and processing
+- Face metadata reception for client-side overlays
 - Diagnostic information exchange
 
 The module separates ROS communication concerns from UI logic.
@@ -13,5 +14,6 @@ The module separates ROS communication concerns from UI logic.
 
 from .camera_controller import CameraController
 from .frame_receiver import FrameReceiver
+from .face_receiver import FaceReceiver
 
-__all__ = ['CameraController', 'FrameReceiver'] 
\ No newline at end of file
+__all__ = ['CameraController', 'FrameReceiver', 'FaceReceiver'] 
\ No newline at end of file
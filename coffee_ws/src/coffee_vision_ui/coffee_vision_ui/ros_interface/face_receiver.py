@@ -0,0 +1,78 @@
+"""
+Face Receiver for Client-Side Overlays
+
+This module handles reception of face detection metadata from the
+camera_node via coffee_vision_msgs/FaceArray messages. It provides:
+
+- Face metadata reception from the face detection topic
+- Conversion to plain dictionaries for UI widgets
+- Frame size reporting so overlays can be scaled to the displayed frame
+
+When camera_node runs in metadata overlay mode it publishes clean frames,
+and the UI draws face boxes from these messages instead.
+"""
+
+from python_qt_binding.QtCore import QObject, pyqtSignal
+from coffee_vision_msgs.msg import FaceArray
+
+
+class FaceReceiver(QObject):
+    """
+    Receives FaceArray messages and converts them for UI overlays.
+
+    Signals:
+        faces_ready: Emitted with (faces, frame_width, frame_height) for
+            every FaceArray message, where faces is a list of dicts
+    """
+
+    # Qt signals for UI communication
+    faces_ready = pyqtSignal(list, int, int)  # faces, frame width, frame height
+
+    def __init__(self, node, topic_name='/face_detection_data'):
+        """
+        Initialize face receiver with ROS node.
+
+        Args:
+            node: ROS2 node instance for creating subscribers
+            topic_name: Name of the face detection topic (default: '/face_detection_data')
+        """
+        super().__init__()
+        self.node = node
+        self.message_count = 0
+
+        self.subscription = self.node.create_subscription(
+            FaceArray,
+            topic_name,
+            self._faces_callback,
+            10  # QoS queue size
+        )
+
+        self.node.get_logger().info(f"Face receiver initialized for topic: {topic_name}")
+
+    def _faces_callback(self, msg):
+        """
+        Process incoming FaceArray messages.
+
+        Args:
+            msg: FaceArray message with the faces of one frame
+        """
+        try:
+            faces = [
+                {
+                    'x1': face.x1,
+                    'y1': face.y1,
+                    'x2': face.x2,
+                    'y2': face.y2,
+                    'center_x': face.center_x,
+                    'center_y': face.center_y,
+                    'confidence': face.confidence,
+                    'track_id': face.track_id,
+                    'identity': face.identity
+                }
+                for face in msg.faces
+            ]
+            self.message_count += 1
+            self.faces_ready.emit(faces, msg.frame_width, msg.frame_height)
+
+        except Exception as e:
+            self.node.get_logger().error(f"Error processing face data: {e}")
@@ -5,19 +5,28 @@ This module handles reception and processing of video frames from the
 camera_node via ROS Image messages. It provides:
 
 - Video frame reception from ROS topics
-- Performance monitoring (FPS, latency)
+- Zero-copy frame reception from camera_node's shared-memory ring (same host)
+- Latest-wins frame hand-off to the display
+- Performance monitoring (FPS, latency, dropped frames)
 - Connection timeout detection
-- Frame format conversion for UI display
 
 The receiver abstracts ROS Image message handling and provides
-Qt signals for integration with UI components.
+Qt signals for integration with UI components. When a shared-memory index
+topic is given, frames are read straight from the ring, and the receiver
+falls back to the Image topic if the ring is not on this host.
+
+Frames are not pushed to the display one by one: the receiver keeps only the
+newest frame and the display takes it when it repaints, so a slow display
+skips frames instead of queueing them and falling behind.
 """
 
 import time
-import numpy as np
+import collections
 from python_qt_binding.QtCore import QObject, pyqtSignal
 from sensor_msgs.msg import Image
 from cv_bridge import CvBridge
+from coffee_vision_msgs.msg import SharedFrame
+from coffee_vision.shm_frames import SharedFrameReader
 
 
 class FrameReceiver(QObject):
@@ -26,46 +35,69 @@ class FrameReceiver(QObject):
     
     This class handles video frame reception from camera_node, performs
     performance monitoring, and emits Qt signals for UI integration.
+    The newest frame is collected with take_latest_frame() and confirmed
+    with confirm_frame() once the display has copied it.
     
     Signals:
-        frame_ready: Emitted when a new frame is ready for display
         connection_lost: Emitted when frame reception times out
         connection_restored: Emitted when frame reception resumes
         performance_update: Emitted with performance statistics
     """
     
     # Qt signals for UI communication
-    frame_ready = pyqtSignal(np.ndarray, float)  # frame, latency
     connection_lost = pyqtSignal()
     connection_restored = pyqtSignal()
     performance_update = pyqtSignal(dict)  # performance metrics dict
     
-    def __init__(self, node, topic_name='camera_frame'):
+    def __init__(self, node, topic_name='camera_frame', shm_topic_name=None):
         """
         Initialize frame receiver with ROS node.
         
         Args:
             node: ROS2 node instance for creating subscribers
             topic_name: Name of the video stream topic (default: 'camera_frame')
+            shm_topic_name: Name of the shared-memory frame index topic; if
+                given, frames are read from the shared-memory ring and
+                topic_name is only used as a fallback
         """
         super().__init__()
         self.node = node
         self.bridge = CvBridge()
+        self.topic_name = topic_name
+        self.shm_reader = SharedFrameReader() if shm_topic_name else None
+        self.shm_subscription = None
         
         # Performance tracking
         self.frame_count = 0
         self.start_time = time.time()
         self.last_frame_time = 0
         self.last_frame_received_time = 0
-        self.latency_history = []
         self.max_latency_samples = 100
+        self.latency_history = collections.deque(maxlen=self.max_latency_samples)
+        
+        # Latest-wins hand-off: (frame, latency, stamp time, shared-memory packet or None)
+        self._latest = None
+        self.frames_displayed = 0
+        self.frames_dropped = 0  # Replaced by a newer frame before the display took them
+        self.frames_stale = 0  # Shared-memory slot recycled before the display took it
+        self.display_times = collections.deque(maxlen=self.max_latency_samples)
+        self.display_latency_history = collections.deque(maxlen=self.max_latency_samples)
         
         # Connection monitoring
         self.frame_timeout_seconds = 2.0
         self.is_receiving_frames = False
         
         # Subscribe to video stream
-        self._setup_subscription(topic_name)
+        if shm_topic_name:
+            self.shm_subscription = self.node.create_subscription(
+                SharedFrame,
+                shm_topic_name,
+                self._shm_frame_callback,
+                1  # Only the newest frame matters
+            )
+            topic_name = shm_topic_name
+        else:
+            self._setup_subscription(topic_name)
         
         self.node.get_logger().info(f"Frame receiver initialized for topic: {topic_name}")
     
@@ -80,7 +112,7 @@ class FrameReceiver(QObject):
             Image,
             topic_name,
             self._frame_callback,
-            10  # QoS queue size
+            1  # Only the newest frame matters
         )
     
     def update_topic(self, new_topic_name):
@@ -101,6 +133,7 @@ class FrameReceiver(QObject):
         # Reset connection state
         self.is_receiving_frames = False
         self.last_frame_received_time = 0
+        self._latest = None
     
     def check_connection_timeout(self):
         """
@@ -129,12 +162,62 @@ class FrameReceiver(QObject):
         
         return self.is_receiving_frames
     
+    def take_latest_frame(self):
+        """
+        Take the newest received frame for display (latest-wins).
+        
+        Frames that arrived since the previous call and were replaced by a
+        newer one are counted as dropped. Shared-memory frames are returned
+        as zero-copy views: the display must copy the pixels right away and
+        then call confirm_frame() before showing the copy.
+        
+        Returns:
+            tuple: (frame, latency, packet) with the BGR frame, its latency in
+                seconds at display time and the shared-memory packet it is a
+                view of (None for topic frames), or None if no new frame arrived
+        """
+        if self._latest is None:
+            return None
+        frame, latency, msg_time, packet = self._latest
+        self._latest = None
+        
+        # Skip a frame whose ring slot was already recycled while it was waiting
+        if packet is not None and not self.shm_reader.is_valid(packet):
+            self.frames_stale += 1
+            return None
+        
+        if msg_time > 0:
+            latency = time.time() - msg_time
+        return frame, latency, packet
+    
+    def confirm_frame(self, packet, latency):
+        """
+        Check a taken frame after the display has copied its pixels.
+        
+        Args:
+            packet: Packet returned by take_latest_frame()
+            latency: Latency returned by take_latest_frame()
+        
+        Returns:
+            bool: True if the copy is intact and may be shown; False if the
+                shared-memory slot was recycled while it was being copied
+        """
+        if packet is not None and not self.shm_reader.is_valid(packet):
+            self.frames_stale += 1
+            return False
+        
+        self.frames_displayed += 1
+        self.display_times.append(time.time())
+        self.display_latency_history.append(latency)
+        return True
+    
     def get_performance_stats(self):
         """
         Get current performance statistics.
         
         Returns:
-            dict: Performance metrics including FPS, latency stats
+            dict: Performance metrics including receive and display FPS,
+                receive and display latency, and dropped frame counts
         """
         current_time = time.time()
         elapsed = current_time - self.start_time
@@ -147,12 +230,32 @@ class FrameReceiver(QObject):
         else:
             avg_latency = max_latency = min_latency = 0
         
+        if self.display_latency_history:
+            avg_display_latency = sum(self.display_latency_history) / len(self.display_latency_history)
+            max_display_latency = max(self.display_latency_history)
+        else:
+            avg_display_latency = max_display_latency = 0
+        
+        # Display rate over the recent window (falls to 0 when frames stop)
+        display_fps = 0.0
+        if len(self.display_times) >= 2 and current_time - self.display_times[-1] < self.frame_timeout_seconds:
+            span = self.display_times[-1] - self.display_times[0]
+            display_fps = (len(self.display_times) - 1) / span if span > 0 else 0.0
+        
+        not_shown = self.frames_dropped + self.frames_stale
         return {
             'fps': fps,
             'frame_count': self.frame_count,
             'avg_latency_ms': avg_latency * 1000,
             'max_latency_ms': max_latency * 1000,
             'min_latency_ms': min_latency * 1000,
+            'display_fps': display_fps,
+            'frames_displayed': self.frames_displayed,
+            'frames_dropped': self.frames_dropped,
+            'frames_stale': self.frames_stale,
+            'drop_rate': not_shown / self.frame_count if self.frame_count else 0.0,
+            'avg_display_latency_ms': avg_display_latency * 1000,
+            'max_display_latency_ms': max_display_latency * 1000,
             'is_connected': self.is_receiving_frames
         }
     
@@ -164,45 +267,84 @@ class FrameReceiver(QObject):
             msg: ROS Image message containing video frame
         """
         try:
-            current_time = time.time()
-            
-            # Calculate latency
-            msg_time = msg.header.stamp.sec + msg.header.stamp.nanosec * 1e-9
-            if msg_time == 0:
-                latency = 0.0
-            else:
-                latency = current_time - msg_time
-            
-            # Track latency statistics
-            self.latency_history.append(latency)
-            if len(self.latency_history) > self.max_latency_samples:
-                self.latency_history.pop(0)
-            
             # Convert ROS Image to OpenCV format
             frame = self.bridge.imgmsg_to_cv2(msg, desired_encoding='bgr8')
+            self._store_frame(frame, msg.header.stamp)
+        
+        except Exception as e:
+            self.node.get_logger().error(f"Error processing frame: {e}")
+    
+    def _shm_frame_callback(self, msg):
+        """
+        Read a frame from the shared-memory ring announced by a SharedFrame message.
+        
+        Args:
+            msg: SharedFrame message with the ring segment, slot and sequence
+        """
+        try:
+            packet = self.shm_reader.read(msg.segment, msg.slot, msg.sequence)
+            if packet is None:
+                return  # Slot already recycled by camera_node
             
-            # Update connection state
-            self.last_frame_received_time = current_time
-            if not self.is_receiving_frames:
-                self.is_receiving_frames = True
-                self.connection_restored.emit()
-                self.node.get_logger().info("Frame reception restored - connection established")
-            
-            # Track frame count
-            self.frame_count += 1
-            
-            # Emit frame for UI display
-            self.frame_ready.emit(frame, latency)
-            
-            # Emit performance update periodically
-            if self.frame_count % 30 == 0:  # Every 30 frames
-                stats = self.get_performance_stats()
-                self.performance_update.emit(stats)
-                
-                self.node.get_logger().debug(
-                    f"Frame stats - FPS: {stats['fps']:.1f}, "
-                    f"Avg Latency: {stats['avg_latency_ms']:.1f}ms"
-                )
+            # Keep the zero-copy view; it is validated again when the display takes it
+            self._store_frame(packet.frame, msg.header.stamp, packet)
         
+        except FileNotFoundError:
+            # The ring lives on another host - fall back to the Image topic
+            self.node.get_logger().warn(
+                f"Shared frame ring {msg.segment} not found on this host, "
+                f"falling back to topic: {self.topic_name}")
+            self.node.destroy_subscription(self.shm_subscription)
+            self.shm_subscription = None
+            self._setup_subscription(self.topic_name)
         except Exception as e:
-            self.node.get_logger().error(f"Error processing frame: {e}") 
\ No newline at end of file
+            self.node.get_logger().error(f"Error reading shared frame: {e}")
+    
+    def _store_frame(self, frame, stamp, packet=None):
+        """
+        Track latency and connection state, then keep a frame for display.
+        
+        Args:
+            frame: OpenCV frame (BGR format)
+            stamp: Header stamp of the frame message
+            packet: Shared-memory packet the frame is a view of (if any)
+        """
+        current_time = time.time()
+        
+        # Calculate latency
+        msg_time = stamp.sec + stamp.nanosec * 1e-9
+        if msg_time == 0:
+            latency = 0.0
+        else:
+            latency = current_time - msg_time
+        
+        # Track latency statistics
+        self.latency_history.append(latency)
+        
+        # Update connection state
+        self.last_frame_received_time = current_time
+        if not self.is_receiving_frames:
+            self.is_receiving_frames = True
+            self.connection_restored.emit()
+            self.node.get_logger().info("Frame reception restored - connection established")
+        
+        # Track frame count
+        self.frame_count += 1
+        
+        # Latest wins - a frame the display has not taken yet is dropped
+        if self._latest is not None:
+            self.frames_dropped += 1
+        self._latest = (frame, latency, msg_time, packet)
+        
+        # Emit performance update periodically
+        if self.frame_count % 30 == 0:  # Every 30 frames
+            stats = self.get_performance_stats()
+            self.performance_update.emit(stats)
+            
+            self.node.get_logger().debug(
+                f"Frame stats - FPS: {stats['fps']:.1f}, "
+                f"Avg Latency: {stats['avg_latency_ms']:.1f}ms, "
+                f"Displayed: {stats['display_fps']:.1f} FPS, "
+                f"Dropped: {stats['drop_rate'] * 100:.0f}%"
+            )
+ 
\ No newline at end of file
@@ -9,14 +9,21 @@ Features:
 - Performance metrics overlay
 - Connection status indication
 - Frame timeout visualization
-- Optimized rendering for real-time video
+- Client-side face overlays from face metadata
+- Optimized rendering for real-time video: BGR frames are wrapped in a
+  QImage without color conversion, and the widget repaints at most at the
+  display refresh rate with the newest frame only
 """
 
+import time
 import cv2
 import numpy as np
 from python_qt_binding.QtWidgets import QWidget, QVBoxLayout, QLabel
-from python_qt_binding.QtGui import QImage, QPixmap, QFont
-from python_qt_binding.QtCore import Qt, pyqtSlot
+from python_qt_binding.QtGui import QImage, QPixmap, QFont, QGuiApplication
+from python_qt_binding.QtCore import Qt, QTimer, pyqtSlot
+
+# Qt 5.14+ displays BGR buffers directly; older Qt swaps channels in QImage
+BGR_IMAGE_FORMAT = getattr(QImage, 'Format_BGR888', None)
 
 
 class CameraDisplay(QWidget):
@@ -28,8 +35,10 @@ class CameraDisplay(QWidget):
     
     Features:
     - Automatic frame scaling to fit widget size
-    - Performance metrics display (FPS, latency)
+    - Repaint timer at the display refresh rate (latest frame wins)
+    - Performance metrics display (FPS, latency, dropped frames)
     - Connection status visualization
+    - Face overlays drawn from face metadata (when the camera sends clean frames)
     - Error state handling
     """
     
@@ -42,11 +51,28 @@ class CameraDisplay(QWidget):
         """
         super().__init__(parent)
         
-        # Display state
-        self.current_frame = None
+        # Display state (shape and dtype only - frames may be views of shared memory)
+        self.current_frame_shape = None
+        self.current_frame_dtype = None
         self.is_connected = False
         self.performance_stats = {}
         
+        # Repaint scheduling: frames are pulled from a frame source (or the
+        # newest pushed frame) at most once per display refresh
+        self.frame_source = None
+        self.frame_check = None
+        self._pending_frame = None
+        self.max_display_fps = 0.0  # 0 = display refresh rate
+        self.repaint_timer = QTimer(self)
+        self.repaint_timer.timeout.connect(self._repaint)
+        
+        # Client-side overlay state
+        self.overlay_enabled = False
+        self.faces = []
+        self.faces_frame_size = (0, 0)  # Frame size the face coordinates refer to
+        self.faces_received_time = 0.0
+        self.face_timeout_seconds = 0.5  # Stop drawing faces that are no longer reported
+        
         self._setup_ui()
         self._setup_styling()
     
@@ -103,34 +129,100 @@ class CameraDisplay(QWidget):
             "}"
         )
     
+    def set_frame_source(self, frame_source, max_display_fps=0.0, frame_check=None):
+        """
+        Pull frames from a source at the display refresh rate.
+        
+        Args:
+            frame_source: Callable returning (frame, latency, token) for a new
+                frame, or None if nothing new arrived (e.g. FrameReceiver.take_latest_frame)
+            max_display_fps: Repaint rate cap; 0 uses the display refresh rate
+            frame_check: Callable (token, latency) -> bool called once the
+                pixels are copied; the frame is dropped if it returns False
+                (e.g. FrameReceiver.confirm_frame)
+        """
+        self.frame_source = frame_source
+        self.frame_check = frame_check
+        self.max_display_fps = max_display_fps
+        self._start_repaint_timer()
+    
+    def _start_repaint_timer(self):
+        """(Re)start the repaint timer at the display refresh rate."""
+        screen = self.screen() if hasattr(self, 'screen') else None
+        if screen is None:
+            screen = QGuiApplication.primaryScreen()
+        refresh_rate = screen.refreshRate() if screen is not None else 0.0
+        if refresh_rate <= 0:
+            refresh_rate = 60.0
+        if self.max_display_fps > 0:
+            refresh_rate = min(refresh_rate, self.max_display_fps)
+        self.repaint_timer.start(max(1, int(1000.0 / refresh_rate)))
+    
     @pyqtSlot(np.ndarray, float)
     def update_frame(self, frame, latency):
         """
-        Update display with new video frame.
+        Queue a video frame for the next repaint (latest frame wins).
         
         Args:
             frame: OpenCV frame (BGR format)
             latency: Frame latency in seconds
         """
+        if frame is None:
+            return
+        self._pending_frame = (frame, latency)
+        if not self.repaint_timer.isActive():
+            self._start_repaint_timer()
+    
+    def _repaint(self):
+        """Render the newest frame, if one arrived since the last repaint."""
+        if self._pending_frame is not None:
+            item, self._pending_frame = self._pending_frame, None
+        elif self.frame_source is not None:
+            item = self.frame_source()
+        else:
+            item = None
+        if item is not None:
+            self._render_frame(*item)
+    
+    def _render_frame(self, frame, latency, token=None):
+        """
+        Display a video frame.
+        
+        Args:
+            frame: OpenCV frame (BGR format); may be a view into a shared
+                buffer, so it is never drawn on or kept
+            latency: Frame latency in seconds
+            token: Frame source token, passed to frame_check after copying
+        """
         try:
-            if frame is None:
-                return
-            
-            # Store current frame
-            self.current_frame = frame
-            
-            # Convert BGR to RGB for Qt display
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            
             # Scale frame to fit label while preserving aspect ratio
-            scaled_frame = self._scale_frame_to_fit(rgb_frame)
+            scaled_frame = self._scale_frame_to_fit(frame)
+            
+            # Draw overlays on the scaled frame (cheaper than at full resolution)
+            if self.overlay_enabled:
+                if scaled_frame is frame:
+                    scaled_frame = frame.copy()
+                self._draw_face_overlay(scaled_frame, frame.shape[1], frame.shape[0])
             
-            # Convert to QPixmap and display
-            height, width, channel = scaled_frame.shape
-            bytes_per_line = 3 * width
-            q_image = QImage(scaled_frame.data, width, height, bytes_per_line, QImage.Format_RGB888)
+            # Wrap the BGR buffer in a QImage (no color conversion); the pixmap copies it
+            if scaled_frame.strides[1] != 3 or scaled_frame.strides[0] < 3 * scaled_frame.shape[1]:
+                scaled_frame = np.ascontiguousarray(scaled_frame)
+            height, width = scaled_frame.shape[:2]
+            bytes_per_line = scaled_frame.strides[0]
+            if BGR_IMAGE_FORMAT is not None:
+                q_image = QImage(scaled_frame.data, width, height, bytes_per_line, BGR_IMAGE_FORMAT)
+            else:
+                q_image = QImage(scaled_frame.data, width, height, bytes_per_line,
+                                 QImage.Format_RGB888).rgbSwapped()
             pixmap = QPixmap.fromImage(q_image)
             
+            # The pixels are copied now - drop the frame if its buffer was
+            # recycled while it was being read
+            if self.frame_check is not None and not self.frame_check(token, latency):
+                return
+            
+            self.current_frame_shape = frame.shape
+            self.current_frame_dtype = frame.dtype
             self.video_label.setPixmap(pixmap)
             
             # Update connection status
@@ -141,6 +233,32 @@ class CameraDisplay(QWidget):
         except Exception as e:
             self._show_error_state(f"Frame display error: {e}")
     
+    @pyqtSlot(list, int, int)
+    def update_faces(self, faces, frame_width, frame_height):
+        """
+        Update the faces drawn by the client-side overlay.
+        
+        Args:
+            faces: List of face dictionaries (x1, y1, x2, y2, confidence, track_id, identity)
+            frame_width: Width of the frame the coordinates refer to
+            frame_height: Height of the frame the coordinates refer to
+        """
+        self.faces = faces
+        self.faces_frame_size = (frame_width, frame_height)
+        self.faces_received_time = time.time()
+    
+    def set_overlay_enabled(self, enabled):
+        """
+        Enable or disable client-side face overlays.
+        
+        Enable this when camera_node publishes clean frames (metadata
+        overlay mode), otherwise the overlays would be drawn twice.
+        
+        Args:
+            enabled: True to draw overlays from face metadata
+        """
+        self.overlay_enabled = enabled
+    
     @pyqtSlot(dict)
     def update_performance(self, stats):
         """
@@ -194,6 +312,49 @@ class CameraDisplay(QWidget):
         
         return frame
     
+    def _draw_face_overlay(self, frame, source_width, source_height):
+        """
+        Draw face boxes, IDs and confidences onto a (scaled) BGR frame.
+        
+        Args:
+            frame: BGR frame to draw on (modified in place)
+            source_width: Width of the received frame before scaling
+            source_height: Height of the received frame before scaling
+        """
+        if not self.faces or time.time() - self.faces_received_time > self.face_timeout_seconds:
+            return
+        
+        # Face coordinates refer to the camera frame - map them to the displayed frame
+        faces_width, faces_height = self.faces_frame_size
+        if faces_width <= 0 or faces_height <= 0:
+            faces_width, faces_height = source_width, source_height
+        scale_x = frame.shape[1] / faces_width
+        scale_y = frame.shape[0] / faces_height
+        
+        recognized = 0
+        for face in self.faces:
+            x1, y1 = int(face['x1'] * scale_x), int(face['y1'] * scale_y)
+            x2, y2 = int(face['x2'] * scale_x), int(face['y2'] * scale_y)
+            identity = face.get('identity', '')
+            if identity:
+                recognized += 1
+                color = (0, 200, 255)  # Orange for recognized faces (BGR)
+                label = f"ID: {identity}"
+            else:
+                color = (0, 255, 0)  # Green for detected faces
+                label = f"Track {face['track_id']}" if face.get('track_id') else "Unknown"
+            
+            cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+            cv2.putText(frame, label, (x1, max(12, y1 - 8)),
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
+            cv2.putText(frame, f"Conf: {face.get('confidence', 0.0):.2f}", (x1, y2 + 16),
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
+        
+        summary = f"Faces: {len(self.faces)}"
+        if recognized:
+            summary += f" | Recognized: {recognized}"
+        cv2.putText(frame, summary, (10, 24), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
+    
     def _update_info_display(self):
         """Update the performance information display."""
         if not self.performance_stats:
@@ -206,9 +367,16 @@ class CameraDisplay(QWidget):
             f"Latency: {stats.get('avg_latency_ms', 0):.1f}ms | "
             f"Max: {stats.get('max_latency_ms', 0):.1f}ms"
         )
+        if 'display_fps' in stats:
+            info_text += (
+                f"\nShown: {stats['display_fps']:.1f} FPS | "
+                f"On screen: {stats.get('avg_display_latency_ms', 0):.1f}ms | "
+                f"Dropped: {stats.get('frames_dropped', 0) + stats.get('frames_stale', 0)} "
+                f"({stats.get('drop_rate', 0) * 100:.0f}%)"
+            )
         
-        if self.current_frame is not None:
-            height, width = self.current_frame.shape[:2]
+        if self.current_frame_shape is not None:
+            height, width = self.current_frame_shape[:2]
             info_text += f" | Size: {width}x{height}"
         
         self.info_label.setText(info_text)
@@ -282,14 +450,14 @@ class CameraDisplay(QWidget):
         Returns:
             dict: Frame information (size, format, etc.)
         """
-        if self.current_frame is None:
+        if self.current_frame_shape is None:
             return {}
         
-        height, width, channels = self.current_frame.shape
+        height, width, channels = self.current_frame_shape
         return {
             'width': width,
             'height': height,
             'channels': channels,
-            'dtype': str(self.current_frame.dtype),
-            'size_bytes': self.current_frame.nbytes
+            'dtype': str(self.current_frame_dtype),
+            'size_bytes': height * width * channels * self.current_frame_dtype.itemsize
         } 
\ No newline at end of file